@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de alertas por umbral sobre índices (bolsa.py) y divisas (valores.py).
+
+Los grupos registran reglas como "IPSA baja más de 2%" o "USD sobre 1000".
+En cada refresco los datos se descargan una sola vez, para todas las reglas:
+el costo de red no crece con la cantidad de reglas. La comparación contra
+los umbrales es vectorizada con numpy; armar las columnas y actualizar el
+estado siguen siendo recorridos en Python, lineales en la cantidad de reglas.
+Una regla solo dispara al pasar de "no cumple" a "cumple" (de-duplicación)
+y respeta su cooldown.
+
+Uso:
+    python alertas.py agregar <chat> <métrica> <'>'|'<'> <umbral>[%] [cooldown_min]
+    python alertas.py listar [chat]
+    python alertas.py borrar <chat> <id>
+    python alertas.py evaluar
+`evaluar` imprime un evento JSON por línea (NDJSON) por cada alerta disparada.
+
+Toda lectura-modificación-escritura de database/alertas.json se hace bajo un
+lock (bloqueo.py). `evaluar` descarga los datos fuera del lock y luego relee
+las reglas, para no pisar un !alerta agregado o borrado mientras tanto.
+"""
+import sys
+import io
+import os
+import json
+import time
+import asyncio
+import uuid
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+
+import bolsa
+import valores
+from bloqueo import bloqueo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+ALERTAS_PATH = PROJECT_ROOT / 'database' / 'alertas.json'
+
+COOLDOWN_DEFECTO = 60  # minutos
+
+# Códigos de campo y operador usados en los arreglos
+CAMPOS = ('valor', 'porcentaje')
+OPERADORES = ('>', '<')
+
+# Nombres cortos para los índices que publica investing.com (bolsa.ALIAS_INDICES)
+def normalizar_metrica(nombre):
+    return bolsa.clave_indice(nombre)
+
+
+# --- Persistencia ---
+
+def leer_alertas():
+    try:
+        datos = json.loads(ALERTAS_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        datos = {}
+    datos.setdefault('reglas', [])
+    datos.setdefault('estado', {})
+    return datos
+
+
+def guardar_alertas(datos):
+    ALERTAS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ALERTAS_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(datos, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.replace(tmp, ALERTAS_PATH)
+
+
+def agregar_regla(datos, chat, metrica, operador, umbral, cooldown=COOLDOWN_DEFECTO):
+    """
+    Registra una regla. Un umbral terminado en '%' compara la variación
+    porcentual del día; si no, el valor absoluto.
+    """
+    if operador not in OPERADORES:
+        raise ValueError(f"Operador inválido '{operador}'. Usa > o <.")
+    campo = 'porcentaje' if umbral.endswith('%') else 'valor'
+    regla = {
+        'id': uuid.uuid4().hex[:8],
+        'chat': chat,
+        'metrica': normalizar_metrica(metrica),
+        'campo': campo,
+        'operador': operador,
+        'umbral': float(umbral.rstrip('%').replace(',', '.')),
+        'cooldown': int(cooldown) * 60,
+    }
+    datos['reglas'].append(regla)
+    return regla
+
+
+def borrar_regla(datos, chat, regla_id):
+    """Borra la regla solo si pertenece al chat que lo pide."""
+    antes = len(datos['reglas'])
+    datos['reglas'] = [r for r in datos['reglas'] if not (r['id'] == regla_id and r['chat'] == chat)]
+    if len(datos['reglas']) == antes:
+        # Otro chat (o un id inexistente): el estado de disparo del dueño no se toca
+        return False
+    datos['estado'].pop(regla_id, None)
+    return True
+
+
+# --- Datos ---
+
+async def obtener_snapshot():
+    """
+    Descarga una vez índices y divisas y los deja como
+    {métrica: {'valor': float, 'porcentaje': float|None}}.
+    """
+    async with aiohttp.ClientSession() as session:
+        indices, divisas = await asyncio.gather(
+            bolsa.obtener_todos(),
+            valores.obtener_valores_divisas(session),
+        )
+
+    try:
+        # Ya que se descargaron, alimentan también el histórico de !grafico
+        bolsa.registrar_historial(indices)
+    except (OSError, TimeoutError):
+        pass
+
+    snapshot = {}
+    for indice in indices:
+        snapshot[normalizar_metrica(indice['nombre'])] = {
+            'valor': indice['ultimo'], 'porcentaje': indice['porcentaje'],
+        }
+    for nombre, valor in divisas.items():
+        if not valor:
+            continue
+        # '💵 USD (Google)' -> 'USD'
+        codigo = next((p for p in nombre.split() if p.isalpha() and p.isupper()), None)
+        try:
+            if codigo:
+                snapshot[codigo] = {'valor': float(valor), 'porcentaje': None}
+        except ValueError:
+            continue
+    return snapshot
+
+
+# --- Evaluación ---
+
+def _compilar(reglas):
+    """Convierte las reglas en columnas numpy (una fila por regla)."""
+    metricas = sorted({r['metrica'] for r in reglas})
+    posicion = {m: i for i, m in enumerate(metricas)}
+    columnas = {
+        # Índice dentro de la matriz (métrica, campo) aplanada
+        'celda': np.array([posicion[r['metrica']] * len(CAMPOS) + CAMPOS.index(r['campo']) for r in reglas], dtype=np.int64),
+        'mayor': np.array([r['operador'] == '>' for r in reglas], dtype=bool),
+        'umbral': np.array([r['umbral'] for r in reglas], dtype=np.float64),
+        'cooldown': np.array([r['cooldown'] for r in reglas], dtype=np.float64),
+    }
+    return metricas, columnas
+
+
+def evaluar(datos, snapshot, ahora=None):
+    """
+    Evalúa todas las reglas contra un mismo snapshot (sin volver a descargar)
+    y devuelve la lista de eventos disparados. Las comparaciones son una
+    operación numpy, pero leer el estado previo y escribir el nuevo recorre
+    las reglas en Python: el costo es lineal en la cantidad de reglas.
+    Actualiza `datos['estado']` en el lugar.
+    """
+    reglas = datos['reglas']
+    if not reglas:
+        return []
+    ahora = ahora if ahora is not None else time.time()
+    metricas, col = _compilar(reglas)
+
+    # Matriz aplanada de observaciones: NaN donde no hay dato
+    observado = np.full(len(metricas) * len(CAMPOS), np.nan)
+    for i, metrica in enumerate(metricas):
+        for j, campo in enumerate(CAMPOS):
+            valor = snapshot.get(metrica, {}).get(campo)
+            if valor is not None:
+                observado[i * len(CAMPOS) + j] = valor
+
+    estado = datos['estado']
+    activa_antes = np.array([estado.get(r['id'], {}).get('activa', False) for r in reglas], dtype=bool)
+    ultimo_disparo = np.array([estado.get(r['id'], {}).get('ultimo_disparo', 0.0) for r in reglas], dtype=np.float64)
+
+    valores_regla = observado[col['celda']]
+    with np.errstate(invalid='ignore'):
+        cumple = np.where(col['mayor'], valores_regla > col['umbral'], valores_regla < col['umbral'])
+    cumple &= ~np.isnan(valores_regla)
+
+    disparar = cumple & ~activa_antes & (ahora - ultimo_disparo >= col['cooldown'])
+
+    eventos = []
+    for i in np.flatnonzero(disparar):
+        regla = reglas[i]
+        eventos.append({
+            'tipo': 'alerta',
+            'id': regla['id'],
+            'chat': regla['chat'],
+            'metrica': regla['metrica'],
+            'campo': regla['campo'],
+            'operador': regla['operador'],
+            'umbral': regla['umbral'],
+            'observado': float(valores_regla[i]),
+            'timestamp': int(ahora),
+        })
+
+    for i, regla in enumerate(reglas):
+        previo = estado.get(regla['id'], {})
+        estado[regla['id']] = {
+            'activa': bool(cumple[i]),
+            'ultimo_disparo': ahora if disparar[i] else previo.get('ultimo_disparo', 0.0),
+        }
+    return eventos
+
+
+def formatear_evento(evento):
+    sufijo = '%' if evento['campo'] == 'porcentaje' else ''
+    return (f"🚨 *Alerta {evento['metrica']}*: {evento['observado']:.2f}{sufijo} "
+            f"({evento['operador']} {evento['umbral']:.2f}{sufijo})")
+
+
+# --- CLI ---
+
+def main(argv):
+    if not argv:
+        print(__doc__.strip())
+        return 1
+
+    comando, args = argv[0], argv[1:]
+
+    if comando == 'agregar':
+        if len(args) < 4:
+            print("Uso: alertas.py agregar <chat> <métrica> <'>'|'<'> <umbral>[%] [cooldown_min]", file=sys.stderr)
+            return 1
+        with bloqueo(ALERTAS_PATH):
+            datos = leer_alertas()
+            try:
+                regla = agregar_regla(datos, *args[:5])
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            guardar_alertas(datos)
+        print(json.dumps(regla, ensure_ascii=False))
+    elif comando == 'listar':
+        reglas = [r for r in leer_alertas()['reglas'] if not args or r['chat'] == args[0]]
+        print(json.dumps(reglas, ensure_ascii=False))
+    elif comando == 'borrar':
+        if len(args) < 2:
+            print("Uso: alertas.py borrar <chat> <id>", file=sys.stderr)
+            return 1
+        with bloqueo(ALERTAS_PATH):
+            datos = leer_alertas()
+            if not borrar_regla(datos, args[0], args[1]):
+                print("Error: alerta no encontrada.", file=sys.stderr)
+                return 1
+            guardar_alertas(datos)
+        print(json.dumps({'borrada': args[1]}))
+    elif comando == 'evaluar':
+        if not leer_alertas()['reglas']:
+            return 0
+        # La descarga toma segundos: se hace sin el lock y se evalúa sobre las reglas frescas
+        snapshot = asyncio.run(obtener_snapshot())
+        with bloqueo(ALERTAS_PATH):
+            datos = leer_alertas()
+            eventos = evaluar(datos, snapshot)
+            guardar_alertas(datos)
+        for evento in eventos:
+            evento['mensaje'] = formatear_evento(evento)
+            print(json.dumps(evento, ensure_ascii=False))
+    else:
+        print(f"Comando desconocido: {comando}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    sys.exit(main(sys.argv[1:]))
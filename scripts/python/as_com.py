@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Scraper único de chile.as.com con caché de páginas compartido.
+
+Todas las consultas de AS (tabla de la liga, jornada, clasificatorias)
+pasan por `obtener_html`, que guarda cada página en temp/as_com/ durante su
+TTL. Si varios comandos piden la misma página a la vez, solo uno la
+descarga y el resto espera el archivo. La descarga se intenta primero con
+requests y solo se recurre a Playwright cuando la página llega sin el
+contenido esperado (renderizado por JavaScript).
+
+Los extractores devuelven listas/diccionarios simples; el formato de salida
+queda en cada script (tabla.py, proxpar.py, clasi.py, tclasi.py).
+"""
+import os
+import time
+import hashlib
+from pathlib import Path
+
+import requests
+from bs4 import BeautifulSoup
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+CACHE_DIR = PROJECT_ROOT / 'temp' / 'as_com'
+
+URL_TABLA = 'https://chile.as.com/resultados/futbol/chile/clasificacion/?omnil=mpal'
+URL_JORNADA = 'https://chile.as.com/resultados/futbol/chile/jornada/'
+URL_CALENDARIO_CLASIFICATORIAS = 'https://chile.as.com/resultados/futbol/clasificacion_mundial_sudamerica/calendario/?omnil=mpal'
+URL_TABLA_CLASIFICATORIAS = 'https://chile.as.com/resultados/futbol/clasificacion_mundial_sudamerica/clasificacion/'
+
+TTL_DEFECTO = 5 * 60        # 5 minutos
+TTL_EN_VIVO = 60            # páginas con marcadores en juego
+REQUEST_TIMEOUT = 10
+ESPERA_LOCK = 45            # lo que tarda como máximo una descarga con navegador
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36'
+}
+
+
+# --- Descarga y caché ---
+
+def _ruta(url):
+    return CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.html"
+
+
+def _leer_vigente(ruta, ttl):
+    try:
+        if time.time() - ruta.stat().st_mtime < ttl:
+            return ruta.read_text(encoding='utf-8')
+    except OSError:
+        pass
+    return None
+
+
+def _descargar_con_navegador(url, selector):
+    # Import diferido: Playwright solo se carga si requests no basta
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=['--no-sandbox', '--disable-dev-shm-usage'])
+        try:
+            page = browser.new_context(user_agent=HEADERS['User-Agent']).new_page()
+            page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            page.wait_for_selector(selector, timeout=20000)
+            return page.content()
+        finally:
+            browser.close()
+
+
+def _descargar(url, selector):
+    try:
+        response = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        html = response.text
+        if BeautifulSoup(html, 'html.parser').select_one(selector):
+            return html
+    except requests.RequestException:
+        pass
+    return _descargar_con_navegador(url, selector)
+
+
+def obtener_html(url, selector, ttl=TTL_DEFECTO):
+    """
+    HTML de la página, desde el caché si tiene menos de `ttl` segundos.
+    `selector` es el CSS que debe existir para considerar válida la página.
+    """
+    ruta = _ruta(url)
+    html = _leer_vigente(ruta, ttl)
+    if html is not None:
+        return html
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    lock = ruta.with_suffix('.lock')
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        # Otro proceso ya la está descargando: se espera su resultado
+        limite = time.monotonic() + ESPERA_LOCK
+        while lock.exists() and time.monotonic() < limite:
+            time.sleep(0.2)
+        html = _leer_vigente(ruta, ttl)
+        if html is not None:
+            return html
+        lock.unlink(missing_ok=True)  # Lock abandonado
+        return obtener_html(url, selector, ttl)
+
+    try:
+        html = _descargar(url, selector)
+        tmp = ruta.with_suffix('.tmp')
+        tmp.write_text(html, encoding='utf-8')
+        os.replace(tmp, ruta)
+        return html
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+def _sopa(url, selector, ttl=TTL_DEFECTO):
+    return BeautifulSoup(obtener_html(url, selector, ttl), 'html.parser')
+
+
+def _texto(tag):
+    return " ".join(tag.text.split()) if tag else ""
+
+
+# --- Extractores ---
+
+def tabla_posiciones(url=URL_TABLA):
+    """
+    Tabla de posiciones: [{'posicion', 'equipo', 'puntos'}]. Soporta el
+    diseño actual (table.a_tb) y el antiguo (table.tabla-datos).
+    """
+    soup = _sopa(url, 'table.a_tb, table.tabla-datos')
+    tabla = soup.find('table', class_='a_tb') or soup.find('table', class_='tabla-datos')
+    if not tabla or not tabla.find('tbody'):
+        return []
+
+    filas = []
+    for i, fila in enumerate(tabla.find('tbody').find_all('tr'), start=1):
+        puntos = fila.find('td', class_='--bd') or fila.find('td', class_='destacado')
+        th = fila.find('th', scope='row')
+        # Nombre largo ('_hidden-xs'), luego el nombre corto y la abreviatura
+        nombre = None
+        if th:
+            nombre = th.find('span', class_='_hidden-xs') or th.find('span', class_='a_tb_n') or th.find('abbr')
+        nombre = nombre or fila.find('span', class_='a_tb_n') or fila.find('span', class_='nombre-equipo')
+        posicion = fila.find('span', class_='a_tb_ps')
+        if nombre and puntos:
+            filas.append({
+                'posicion': int(_texto(posicion)) if posicion and _texto(posicion).isdigit() else i,
+                'equipo': _texto(nombre),
+                'puntos': _texto(puntos),
+            })
+    return filas
+
+
+def jornada(url=URL_JORNADA):
+    """
+    Jornada actual de la liga: {'titulo', 'dias': [{'titulo', 'partidos'}]}.
+    Cada partido: {'local', 'visitante', 'estado', 'hora', 'marcador', 'minuto'}
+    con estado 'programado', 'en_vivo' o 'finalizado'.
+    """
+    soup = _sopa(url, 'div.a_sd', ttl=TTL_EN_VIVO)
+    resultado = {'titulo': _texto(soup.find('h1', class_='a_hd_t')), 'dias': []}
+
+    for bloque in soup.find_all('div', class_='a_sd'):
+        dia = {'titulo': _texto(bloque.find('h2', class_='a_sd_t')), 'partidos': []}
+        for item in bloque.find_all('li', class_='a_sc_l_it'):
+            equipos = item.find_all('div', class_='a_sc_tm')
+            if len(equipos) < 2:
+                continue
+            local = _texto(equipos[0].find('span', class_='a_sc_tn'))
+            visitante = _texto(equipos[-1].find('span', class_='a_sc_tn'))
+            hora = item.find('div', class_='a_sc_hr')
+            marcador = item.find('div', class_='a_sc_gl')
+            estado = _texto(item.find('div', class_='a_sc_st'))
+
+            if hora:
+                partido = {'estado': 'programado', 'hora': _texto(hora), 'marcador': None, 'minuto': None}
+            elif marcador:
+                finalizado = estado == 'Finalizado'
+                partido = {'estado': 'finalizado' if finalizado else 'en_vivo', 'hora': None,
+                           'marcador': _texto(marcador), 'minuto': None if finalizado else estado}
+            else:
+                continue
+            dia['partidos'].append({'local': local, 'visitante': visitante, **partido})
+        resultado['dias'].append(dia)
+    return resultado
+
+
+def calendario_clasificatorias(url=URL_CALENDARIO_CLASIFICATORIAS):
+    """Jornadas de clasificatorias: [{'fecha', 'numero', 'partidos': [{'local', 'resultado', 'visitante'}]}]."""
+    soup = _sopa(url, '.cont-modulo.resultados')
+    jornadas = []
+    for bloque in soup.select('.cont-modulo.resultados'):
+        fecha = bloque.select_one('h2 span')
+        titulo = bloque.select_one('h2 a')
+        partidos = []
+        for fila in bloque.select('tbody tr'):
+            celdas = [fila.select_one(c) for c in ('.col-equipo-local', '.col-resultado', '.col-equipo-visitante')]
+            if all(celdas):
+                partidos.append(dict(zip(('local', 'resultado', 'visitante'), map(_texto, celdas))))
+        jornadas.append({
+            'fecha': _texto(fecha),
+            'numero': _texto(titulo).split()[-1] if _texto(titulo) else "",
+            'partidos': partidos,
+        })
+    return jornadas
+
+
+def tabla_clasificatorias(url=URL_TABLA_CLASIFICATORIAS):
+    """Tabla de clasificatorias sudamericanas (mismo formato que tabla_posiciones)."""
+    return tabla_posiciones(url)
@@ -1,9 +1,28 @@
 # banner.py
+"""
+Banners de texto con la tipografía de una franquicia.
+
+Cada fuente se carga una sola vez por (archivo, tamaño), el tamaño que cabe
+en el ancho se busca por bisección en vez de ir bajando de 5 en 5, y el
+borde se dibuja en una sola pasada con stroke_width. El PNG terminado se
+cachea por (estilo, texto) con `graficos.obtener_grafico` (memoria + disco),
+así que un banner repetido no se vuelve a dibujar. Los banners van a su propio
+directorio (temp/banners), acotado a MAX_BANNERS_DISCO archivos con poda LRU:
+el texto es libre, así que no deben desplazar a los gráficos del caché común.
+
+El PNG se entrega por stdout, sin archivos temporales.
+
+Uso:
+    python banner.py <estilo> <texto...> [--raw]
+Por defecto imprime el PNG en base64; con --raw escribe los bytes en stdout.
+"""
 import sys
+import base64
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
-import textwrap
 import os # Importamos os
-from datetime import datetime # Importamos datetime
+
+from graficos import PROJECT_ROOT, obtener_grafico, _a_png
 
 # --- CONFIGURACIÓN DE ESTILOS (CORREGIDA CON TUS NOMBRES DE ARCHIVO) ---
 ESTILOS = {
@@ -24,58 +43,80 @@ script_dir = os.path.dirname(os.path.abspath(__file__)) # Directorio del script
 project_root = os.path.dirname(os.path.dirname(script_dir)) # Sube dos niveles para llegar a la raíz del proyecto
 RUTA_FUENTES = os.path.join(project_root, "assets", "fonts") + os.sep # Ruta correcta: C:\bots\Telegram Bot\assets\fonts\
 
-def crear_banner(estilo, texto_principal):
-    try:
-        config = ESTILOS.get(estilo.lower())
-        if not config:
-            disponibles = ", ".join(ESTILOS.keys())
-            print(f"Estilo no encontrado. Disponibles: {disponibles}", file=sys.stderr)
-            sys.exit(1)
-
-        # --- Configuración de la imagen ---
-        ancho_img, alto_img = 1200, 400
-        img = Image.new("RGBA", (ancho_img, alto_img), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # --- Configuración de la fuente ---
-        ruta_fuente = RUTA_FUENTES + config["fuente"]
-        tamaño_fuente = 150
-        font = ImageFont.truetype(ruta_fuente, tamaño_fuente)
-
-        while font.getbbox(texto_principal.upper())[2] > ancho_img * 0.9 and tamaño_fuente > 20:
-            tamaño_fuente -= 5
-            font = ImageFont.truetype(ruta_fuente, tamaño_fuente)
-
-        # --- Función para dibujar texto con borde ---
-        def dibujar_texto_con_borde(pos, texto, fuente, draw, relleno, borde):
-            x, y = pos
-            grosor_borde = int(tamaño_fuente / 30)
-            draw.text((x-grosor_borde, y-grosor_borde), texto, font=fuente, fill=borde)
-            draw.text((x+grosor_borde, y-grosor_borde), texto, font=fuente, fill=borde)
-            draw.text((x-grosor_borde, y+grosor_borde), texto, font=fuente, fill=borde)
-            draw.text((x+grosor_borde, y+grosor_borde), texto, font=fuente, fill=borde)
-            draw.text(pos, texto, font=fuente, fill=relleno)
-
-        # --- Posicionar y dibujar ---
-        bbox = draw.textbbox((0, 0), texto_principal.upper(), font=font)
-        ancho_texto = bbox[2] - bbox[0]
-        alto_texto = bbox[3] - bbox[1]
-        x_texto = (ancho_img - ancho_texto) / 2
-        y_texto = (alto_img - alto_texto) / 2
-        
-        dibujar_texto_con_borde((x_texto, y_texto), texto_principal.upper(), font, draw, config["color_relleno"], config["color_borde"])
-        
-        # --- Guardar imagen ---
-        ruta_salida = os.path.join(os.path.expanduser("~"), "AppData", "Local", "Temp", f"banner_temp_{datetime.now().timestamp()}.png")
-        img.save(ruta_salida, "PNG")
-        print(ruta_salida)
+ANCHO_IMG, ALTO_IMG = 1200, 400
+TAMANO_MAXIMO = 150
+TAMANO_MINIMO = 20
+# Subir al cambiar el dibujo, para no servir banners viejos desde el caché
+VERSION_RENDER = 2
+BANNERS_DIR = PROJECT_ROOT / 'temp' / 'banners'
+MAX_BANNERS_DISCO = 200
+
+
+@lru_cache(maxsize=64)
+def obtener_fuente(archivo, tamano):
+    """Carga y parsea el TTF una sola vez por (archivo, tamaño)."""
+    return ImageFont.truetype(RUTA_FUENTES + archivo, tamano)
+
+
+def tamano_que_cabe(archivo, texto, ancho_maximo):
+    """Mayor tamaño de fuente con el que el texto cabe en el ancho (bisección)."""
+    bajo, alto = TAMANO_MINIMO, TAMANO_MAXIMO
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if obtener_fuente(archivo, medio).getbbox(texto)[2] <= ancho_maximo:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
 
+def dibujar_banner(config, texto):
+    """PNG (bytes) del banner con el texto ya en mayúsculas."""
+    img = Image.new("RGBA", (ANCHO_IMG, ALTO_IMG), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    tamano = tamano_que_cabe(config["fuente"], texto, ANCHO_IMG * 0.9)
+    font = obtener_fuente(config["fuente"], tamano)
+    grosor_borde = int(tamano / 30)
+
+    # --- Posicionar y dibujar (relleno y borde en una sola pasada) ---
+    bbox = draw.textbbox((0, 0), texto, font=font, stroke_width=grosor_borde)
+    x_texto = (ANCHO_IMG - (bbox[2] - bbox[0])) / 2 - bbox[0]
+    y_texto = (ALTO_IMG - (bbox[3] - bbox[1])) / 2 - bbox[1]
+    draw.text((x_texto, y_texto), texto, font=font, fill=config["color_relleno"],
+              stroke_width=grosor_borde, stroke_fill=config["color_borde"])
+    return _a_png(img)
+
+
+def banner_png(estilo, texto_principal):
+    """PNG del banner, cacheado por (estilo, texto)."""
+    config = ESTILOS.get(estilo.lower())
+    if not config:
+        disponibles = ", ".join(ESTILOS.keys())
+        raise ValueError(f"Estilo no encontrado. Disponibles: {disponibles}")
+
+    texto = texto_principal.upper()
+    return obtener_grafico(f"banner:{estilo.lower()}", texto, VERSION_RENDER,
+                           lambda: dibujar_banner(config, texto), tipo='banner',
+                           directorio=BANNERS_DIR, maximo=MAX_BANNERS_DISCO)
+
+
+def crear_banner(estilo, texto_principal, raw=False):
+    try:
+        png = banner_png(estilo, texto_principal)
     except Exception as e:
         print(f"Error creando banner: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if raw:
+        sys.stdout.buffer.write(png)
+    else:
+        sys.stdout.write(base64.b64encode(png).decode('ascii'))
+
 if __name__ == "__main__":
-    estilo_arg = sys.argv[1]
+    args = [a for a in sys.argv[1:] if a != '--raw']
+    if len(args) < 2:
+        print("Uso: python banner.py <estilo> <texto> [--raw]", file=sys.stderr)
+        sys.exit(1)
     # Unimos todos los argumentos después del estilo para formar el texto completo
-    texto_arg = " ".join(sys.argv[2:])
-    crear_banner(estilo_arg, texto_arg)
\ No newline at end of file
+    crear_banner(args[0], " ".join(args[1:]), raw='--raw' in sys.argv)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precios de combustibles por comuna desde un dataset local de estaciones.
+
+`actualizar` (programado desde el bot) descarga el listado de estaciones de
+la fuente configurada y guarda en temp/bencina/:
+
+    indice.json       estaciones normalizadas + índice comuna -> combustible ->
+                      estaciones ordenadas por precio
+    coordenadas.npz   lat/lng en radianes de cada estación (mismo orden)
+
+Las consultas solo leen esos archivos: la más barata por combustible en una
+comuna es tomar los primeros elementos de una lista ya ordenada, y la
+búsqueda por cercanía es un haversine vectorizado con numpy.
+
+La fuente es la API de la CNE (token en CNE_TOKEN) y se puede reemplazar con
+BENCINA_FUENTE, que acepta otra URL o la ruta de un JSON local con el mismo
+formato (útil para pruebas sin red).
+
+Uso:
+    python bencina.py <comuna> [--json]
+    python bencina.py cerca <lat> <lng> [combustible] [--json]
+    python bencina.py actualizar
+"""
+import sys
+import io
+import os
+import json
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+import comunas
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DATA_DIR = PROJECT_ROOT / 'temp' / 'bencina'
+INDICE_PATH = DATA_DIR / 'indice.json'
+COORDENADAS_PATH = DATA_DIR / 'coordenadas.npz'
+
+CNE_URL = 'https://api.cne.cl/v3/combustibles/vehicular/estaciones'
+REQUEST_TIMEOUT = 60
+MAS_BARATAS = 3
+CERCANAS_DEFECTO = 5
+RADIO_TIERRA_KM = 6371.0
+
+# Nombre canónico -> fragmentos con que aparece en la fuente
+COMBUSTIBLES = {
+    '93': ('93',),
+    '95': ('95',),
+    '97': ('97',),
+    'diesel': ('diesel', 'petroleo'),
+    'glp': ('glp', 'gas licuado'),
+    'kerosene': ('kerosene', 'parafina'),
+}
+NOMBRES_COMBUSTIBLE = {
+    '93': 'Gasolina 93', '95': 'Gasolina 95', '97': 'Gasolina 97',
+    'diesel': 'Diésel', 'glp': 'GLP vehicular', 'kerosene': 'Kerosene',
+}
+
+
+# --- Fuente ---
+
+def descargar_fuente():
+    """Lista cruda de estaciones desde BENCINA_FUENTE (URL o archivo) o la API de la CNE."""
+    fuente = os.environ.get('BENCINA_FUENTE')
+    if fuente and not fuente.startswith(('http://', 'https://')):
+        datos = json.loads(Path(fuente).read_text(encoding='utf-8'))
+    else:
+        params = {'token': os.environ['CNE_TOKEN']} if not fuente and os.environ.get('CNE_TOKEN') else None
+        response = requests.get(fuente or CNE_URL, params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        datos = response.json()
+    # La CNE envuelve la lista en {"data": [...]}; un JSON local puede traer la lista directa
+    return datos.get('data', []) if isinstance(datos, dict) else datos
+
+
+def _combustible(nombre):
+    nombre = comunas.normalizar(nombre)
+    for canonico, fragmentos in COMBUSTIBLES.items():
+        if any(f in nombre for f in fragmentos):
+            return canonico
+    return None
+
+
+def _numero(valor):
+    try:
+        return float(str(valor).replace(',', '.'))
+    except (TypeError, ValueError):
+        return None
+
+
+def normalizar_estacion(e):
+    """Reduce un registro de la fuente a {id, marca, direccion, comuna, lat, lng, precios}."""
+    ubicacion = e.get('ubicacion') or {}
+    direccion = e.get('direccion') or ' '.join(
+        str(p) for p in (e.get('direccion_calle'), e.get('direccion_numero')) if p)
+    distribuidor = e.get('distribuidor')
+    marca = distribuidor.get('nombre') if isinstance(distribuidor, dict) else distribuidor
+
+    precios = {}
+    for nombre, dato in (e.get('precios') or {}).items():
+        precio = _numero(dato.get('precio') if isinstance(dato, dict) else dato)
+        combustible = _combustible(nombre)
+        if combustible and precio and precio > 0:
+            precios[combustible] = min(precio, precios.get(combustible, precio))
+
+    return {
+        'id': str(e.get('codigo') or e.get('id') or ''),
+        'marca': marca or e.get('razon_social') or 'Estación',
+        'direccion': direccion or 'Sin dirección',
+        'comuna': (e.get('nombre_comuna') or e.get('comuna') or '').strip(),
+        'lat': _numero(ubicacion.get('latitud', e.get('latitud'))),
+        'lng': _numero(ubicacion.get('longitud', e.get('longitud'))),
+        'precios': precios,
+    }
+
+
+# --- Índice ---
+
+def construir_indice(crudas):
+    estaciones = [e for e in map(normalizar_estacion, crudas) if e['comuna'] and e['precios']]
+    por_comuna = {}
+    for i, estacion in enumerate(estaciones):
+        comuna = por_comuna.setdefault(comunas.normalizar(estacion['comuna']),
+                                       {'nombre': estacion['comuna'], 'por_combustible': {}})
+        for combustible in estacion['precios']:
+            comuna['por_combustible'].setdefault(combustible, []).append(i)
+
+    # Cada lista queda ordenada por precio: la consulta solo toma los primeros
+    for comuna in por_comuna.values():
+        for combustible, ids in comuna['por_combustible'].items():
+            ids.sort(key=lambda i: estaciones[i]['precios'][combustible])
+    return {'actualizado': time.time(), 'estaciones': estaciones, 'comunas': por_comuna}
+
+
+def _guardar_coordenadas(indice):
+    lat = np.array([e['lat'] if e['lat'] else np.nan for e in indice['estaciones']], dtype=np.float64)
+    lng = np.array([e['lng'] if e['lng'] else np.nan for e in indice['estaciones']], dtype=np.float64)
+    tmp = DATA_DIR / f'coordenadas.{os.getpid()}.tmp.npz'
+    lat, lng = np.radians(lat), np.radians(lng)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    np.savez(tmp, lat=lat, lng=lng, actualizado=np.float64(indice['actualizado']))
+    os.replace(tmp, COORDENADAS_PATH)
+    return lat, lng
+
+
+def actualizar():
+    """Descarga la fuente y reemplaza índice y coordenadas de forma atómica."""
+    indice = construir_indice(descargar_fuente())
+    if not indice['estaciones']:
+        raise ValueError("La fuente no devolvió estaciones con precios.")
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = INDICE_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(indice, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, INDICE_PATH)
+    _guardar_coordenadas(indice)
+    return indice
+
+
+def cargar_indice():
+    """Índice local. A diferencia de farmacias no se descarga en línea: la fuente es lenta."""
+    try:
+        return json.loads(INDICE_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        raise LookupError("Todavía no hay datos de precios; se están descargando en segundo plano.")
+
+
+def _cargar_coordenadas(indice):
+    try:
+        with np.load(COORDENADAS_PATH) as datos:
+            if float(datos['actualizado']) == indice['actualizado']:
+                return datos['lat'], datos['lng']
+    except (OSError, KeyError, ValueError):
+        pass
+    return _guardar_coordenadas(indice)
+
+
+# --- Consultas ---
+
+def mas_baratas(comuna_busqueda, n=MAS_BARATAS):
+    """{'comuna', 'combustibles': {combustible: [estaciones]}} con las n más baratas por combustible."""
+    indice = cargar_indice()
+    encontrada = comunas.indice(c['nombre'] for c in indice['comunas'].values()).buscar(comuna_busqueda)
+    if not encontrada:
+        raise LookupError(f'No encontré estaciones para la comuna "{comuna_busqueda}".')
+
+    comuna = indice['comunas'][comunas.normalizar(encontrada)]
+    return {
+        'comuna': comuna['nombre'],
+        'actualizado': indice['actualizado'],
+        'combustibles': {
+            combustible: [{**indice['estaciones'][i], 'precio': indice['estaciones'][i]['precios'][combustible]}
+                          for i in comuna['por_combustible'][combustible][:n]]
+            for combustible in COMBUSTIBLES if combustible in comuna['por_combustible']
+        },
+    }
+
+
+def cercanas(lat, lng, combustible=None, n=CERCANAS_DEFECTO):
+    """Estaciones más cercanas (opcionalmente solo las que venden `combustible`)."""
+    indice = cargar_indice()
+    lat_r, lng_r = _cargar_coordenadas(indice)
+    lat0, lng0 = np.radians(lat), np.radians(lng)
+
+    a = np.sin((lat_r - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lat_r) * np.sin((lng_r - lng0) / 2) ** 2
+    distancias = 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    distancias = np.where(np.isnan(distancias), np.inf, distancias)
+    if combustible:
+        vende = np.array([combustible in e['precios'] for e in indice['estaciones']])
+        distancias = np.where(vende, distancias, np.inf)
+
+    n = min(n, len(distancias))
+    if n == 0:
+        return []
+    orden = np.argpartition(distancias, n - 1)[:n]
+    orden = orden[np.argsort(distancias[orden])]
+    return [{**indice['estaciones'][i], 'distancia_km': round(float(distancias[i]), 2)}
+            for i in orden if np.isfinite(distancias[i])]
+
+
+# --- Formato ---
+
+def _precio(valor):
+    return f"${valor:,.0f}".replace(",", ".")
+
+
+def _md(texto):
+    """Escapa el Markdown de Telegram en los datos de la CNE (marcas, direcciones, comunas)."""
+    return re.sub(r'([_*`\[])', r'\\\1', str(texto))
+
+
+def formatear_comuna(resultado):
+    lineas = [f"⛽ *Bencina más barata en {_md(resultado['comuna'])}*"]
+    for combustible, estaciones in resultado['combustibles'].items():
+        lineas.append(f"\n*{NOMBRES_COMBUSTIBLE[combustible]}*")
+        for e in estaciones:
+            lineas.append(f"{_precio(e['precio'])} — {_md(e['marca'])}, {_md(e['direccion'])}")
+    lineas.append(f"\n_Actualizado: {time.strftime('%d-%m-%Y %H:%M', time.localtime(resultado['actualizado']))}_")
+    return "\n".join(lineas)
+
+
+def formatear_cercanas(estaciones, combustible=None):
+    titulo = f" con {NOMBRES_COMBUSTIBLE[combustible]}" if combustible else ""
+    lineas = [f"⛽ *Estaciones más cercanas{titulo}*\n"]
+    for e in estaciones:
+        precios = ", ".join(f"{c}: {_precio(p)}" for c, p in e['precios'].items()
+                            if not combustible or c == combustible)
+        lineas.append(f"*{_md(e['marca'])}* _({e['distancia_km']:.1f} km, {_md(e['comuna'])})_\n"
+                      f"📍 {_md(e['direccion'])}\n💲 {precios}\n")
+    return "\n".join(lineas).strip()
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    como_json = '--json' in sys.argv
+    args = [a for a in sys.argv[1:] if a != '--json']
+    if not args:
+        print("Debes especificar una comuna. Ejemplo: `!bencina santiago`")
+        sys.exit(1)
+
+    try:
+        if args[0] == 'actualizar':
+            indice = actualizar()
+            print(json.dumps({'estaciones': len(indice['estaciones']), 'comunas': len(indice['comunas'])}))
+        elif args[0] == 'cerca' and len(args) >= 3:
+            combustible = _combustible(args[3]) if len(args) > 3 else None
+            estaciones = cercanas(float(args[1]), float(args[2]), combustible)
+            if como_json:
+                print(json.dumps(estaciones, ensure_ascii=False))
+            else:
+                print(formatear_cercanas(estaciones, combustible) if estaciones else "No encontré estaciones cercanas.")
+        else:
+            resultado = mas_baratas(' '.join(args))
+            print(json.dumps(resultado, ensure_ascii=False) if como_json else formatear_comuna(resultado))
+    except LookupError as e:
+        print(f"❌ {e.args[0]}")
+        sys.exit(1)
+    except (requests.RequestException, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
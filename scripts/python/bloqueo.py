@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Bloqueo entre procesos para archivos que se leen, modifican y reescriben.
+
+Usa el mismo mecanismo que as_com.py: un archivo `<ruta>.lock` creado con
+O_CREAT | O_EXCL, que es atómico en cualquier sistema de archivos local. Un
+lock más viejo que ABANDONO segundos se considera de un proceso muerto y se
+libera.
+
+    with bloqueo(RUTA):
+        datos = leer()
+        ...
+        guardar(datos)
+"""
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ESPERA = 15      # segundos máximos esperando el lock
+ABANDONO = 120   # un lock con esta antigüedad se da por abandonado
+
+
+@contextmanager
+def bloqueo(ruta, espera=ESPERA):
+    lock = Path(f"{ruta}.lock")
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    limite = time.monotonic() + espera
+    while True:
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > ABANDONO:
+                    lock.unlink(missing_ok=True)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > limite:
+                raise TimeoutError(f"No se pudo obtener el bloqueo de {Path(ruta).name}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        lock.unlink(missing_ok=True)
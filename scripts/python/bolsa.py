@@ -1,21 +1,41 @@
 # -*- coding: utf-8 -*-
-import requests
-from bs4 import BeautifulSoup
+"""
+Índices bursátiles desde investing.com.
+
+Cada consulta guarda además el último valor del día de cada índice en
+temp/bolsa_hist.json (a lo más MAX_DIAS_HISTORIAL días por índice), que es
+la serie que dibuja `!grafico <índice>` (graficos.py).
+
+Uso:
+    python bolsa.py          -> texto para el chat
+    python bolsa.py --json   -> lista de índices
+"""
+import asyncio
+import aiohttp
+from bs4 import BeautifulSoup, SoupStrainer
 import sys
+import os
+import json
+import codecs
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
 
-# --- Configuración de Codificación ---
-try:
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
-except AttributeError:
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
-except Exception as e:
-    print(f"Advertencia: No se pudo configurar la codificación UTF-8: {e}", file=sys.stderr)
+from bloqueo import bloqueo
 
 # --- Constantes ---
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+HISTORIAL_PATH = PROJECT_ROOT / 'temp' / 'bolsa_hist.json'
+MAX_DIAS_HISTORIAL = 400
+ZONA_HORARIA_CHILE = ZoneInfo('America/Santiago')
+# Nombres cortos de los índices (los mismos que usan las alertas y los gráficos)
+ALIAS_INDICES = {
+    'S&P CLX IPSA': 'IPSA',
+    'S&P CLX IGPA': 'IGPA',
+    'US 30': 'DOW',
+    'US 500': 'SP500',
+    'US TECH 100': 'NASDAQ',
+}
 URLS = {
     "Chile": "https://es.investing.com/indices/chile-indices",  # Chile primero
     "Global": "https://es.investing.com/indices/indices-cfds"
@@ -42,56 +62,134 @@ BANDERAS_PAISES = {
 }
 
 # --- Funciones ---
-def obtener_datos(url):
-    """Extrae datos de índices bursátiles desde una URL específica."""
+def parsear_numero(texto):
+    """
+    Convierte un número en formato español ("1.234,56", "+0,85%", "-12,3")
+    a float. Devuelve None si el texto no es numérico.
+    """
+    limpio = texto.strip().replace('%', '').replace('\xa0', '').replace(' ', '')
+    if not limpio or limpio in ('-', '—'):
+        return None
+    limpio = limpio.replace('.', '').replace(',', '.')
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"Error al obtener la página {url}: {e}", file=sys.stderr)
+        return float(limpio)
+    except ValueError:
+        return None
+
+def parsear_html(html, mercado):
+    """Extrae los registros numéricos de la tabla de índices de una página."""
+    # Solo se construye el árbol de las tablas; el resto del documento se descarta
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("table"))
+    tabla = soup.find("table", {"data-test": "indices-cfds"}) or \
+            soup.find("table", class_="common-table") or \
+            soup.find("table")
+
+    if not tabla:
+        print(f"Error: No se encontró la tabla de índices de {mercado}.", file=sys.stderr)
         return []
 
+    cuerpo = tabla.find("tbody") or tabla
+    indices = []
+    for fila in cuerpo.find_all("tr", recursive=False):
+        columnas = fila.find_all("td", recursive=False)
+        if len(columnas) < 7:
+            continue
+        try:
+            nombre_tag = columnas[1].find('a')
+            nombre = (nombre_tag or columnas[1]).get_text(strip=True)
+            ultimo, maximo, minimo, variacion, porcentaje = (
+                parsear_numero(c.get_text()) for c in columnas[2:7]
+            )
+            if ultimo is None:
+                continue
+
+            pais = PAISES_INDICES.get(nombre)
+            indices.append({
+                "mercado": mercado,
+                "nombre": nombre,
+                "pais": pais,
+                "bandera": BANDERAS_PAISES.get(pais, "") if pais else "",
+                "ultimo": ultimo,
+                "maximo": maximo,
+                "minimo": minimo,
+                "variacion": variacion,
+                "porcentaje": porcentaje,
+            })
+        except Exception as e:
+            print(f"Advertencia: Error procesando fila de {mercado}: {e}", file=sys.stderr)
+            continue
+
+    return indices
+
+async def obtener_datos(session, mercado, url):
+    """Descarga y parsea una página de índices bursátiles."""
     try:
-        soup = BeautifulSoup(response.text, "html.parser")
-        tabla = soup.find("table", {"data-test": "indices-cfds"}) or \
-                soup.find("table", class_="common-table") or \
-                soup.find("table")
-
-        if not tabla:
-            print(f"Error: No se encontró la tabla de índices en {url}.", file=sys.stderr)
-            return []
-
-        indices = []
-        filas_a_procesar = tabla.find("tbody").find_all("tr") if tabla.find("tbody") else tabla.find_all("tr")
-
-        for fila in filas_a_procesar:
-            columnas = fila.find_all("td")
-            if len(columnas) >= 7:
-                try:
-                    nombre_tag = columnas[1].find('a')
-                    nombre = nombre_tag.text.strip() if nombre_tag else columnas[1].text.strip()
+        async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=15)) as response:
+            response.raise_for_status()
+            html = await response.text()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error al obtener la página {url}: {e}", file=sys.stderr)
+        return []
 
-                    ultimo, maximo, minimo, variacion, porcentaje_variacion = (
-                        columnas[2].text.strip(), columnas[3].text.strip(),
-                        columnas[4].text.strip(), columnas[5].text.strip(),
-                        columnas[6].text.strip()
-                    )
+    try:
+        return parsear_html(html, mercado)
+    except Exception as e:
+        print(f"Error durante el parseo del HTML en {url}: {e}", file=sys.stderr)
+        return []
 
-                    pais = PAISES_INDICES.get(nombre)
-                    bandera = BANDERAS_PAISES.get(pais, "") if pais else ""
-                    nombre_formateado = f"{bandera} {nombre}" if bandera else nombre
+async def obtener_todos():
+    """Descarga todas las páginas en paralelo sobre una misma sesión (pool de conexiones)."""
+    connector = aiohttp.TCPConnector(limit_per_host=len(URLS))
+    async with aiohttp.ClientSession(connector=connector) as session:
+        resultados = await asyncio.gather(*(obtener_datos(session, m, u) for m, u in URLS.items()))
+    # Mantiene el orden de URLS (Chile primero)
+    return [indice for grupo in resultados for indice in grupo]
 
-                    indices.append((nombre_formateado, ultimo, maximo, minimo, variacion, porcentaje_variacion))
+def clave_indice(nombre):
+    """'S&P CLX IPSA' / 'ipsa' -> 'IPSA'."""
+    nombre = nombre.strip().upper()
+    return ALIAS_INDICES.get(nombre, nombre)
 
-                except Exception as e:
-                    print(f"Advertencia: Error procesando fila en {url}: {e}", file=sys.stderr)
-                    continue
+# --- Histórico diario ---
 
-        return indices
+def leer_historial():
+    try:
+        return json.loads(HISTORIAL_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
 
-    except Exception as e:
-        print(f"Error durante el parseo del HTML en {url}: {e}", file=sys.stderr)
-        return []
+def registrar_historial(indices):
+    """Guarda el último valor del día de cada índice: {clave: {'YYYY-MM-DD': valor}}."""
+    if not indices:
+        return
+    hoy = datetime.now(ZONA_HORARIA_CHILE).strftime('%Y-%m-%d')
+    with bloqueo(HISTORIAL_PATH):
+        historial = leer_historial()
+        for indice in indices:
+            serie = historial.setdefault(clave_indice(indice['nombre']), {})
+            serie[hoy] = indice['ultimo']
+            for dia in sorted(serie)[:-MAX_DIAS_HISTORIAL]:
+                del serie[dia]
+        HISTORIAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = HISTORIAL_PATH.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(historial, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, HISTORIAL_PATH)
+
+def serie_historica(nombre, dias):
+    """(clave, [(día, valor), ...]) de los últimos `dias` días registrados del índice."""
+    clave = clave_indice(nombre)
+    historial = leer_historial()
+    if clave not in historial:
+        disponibles = ', '.join(sorted(historial)) or 'ninguno todavía'
+        raise LookupError(f"Índice desconocido '{nombre}'. Con histórico: {disponibles}")
+    desde = (datetime.now(ZONA_HORARIA_CHILE) - timedelta(days=dias)).strftime('%Y-%m-%d')
+    return clave, sorted((dia, valor) for dia, valor in historial[clave].items() if dia >= desde)
+
+def formatear_numero(valor, signo=False):
+    if valor is None:
+        return "-"
+    texto = "{:+,.2f}".format(valor) if signo else "{:,.2f}".format(valor)
+    return texto.replace(",", "X").replace(".", ",").replace("X", ".")
 
 def formatear_para_whatsapp(indices):
     """Genera el mensaje formateado para WhatsApp."""
@@ -99,23 +197,36 @@ def formatear_para_whatsapp(indices):
         return "❌ No se pudieron obtener los datos de los índices bursátiles en este momento."
 
     mensaje_partes = ["📊 *Índices Bursátiles Principales*\n"]
-    for nombre, ultimo, maximo, minimo, variacion, porcentaje in indices:
+    for indice in indices:
+        nombre = f"{indice['bandera']} {indice['nombre']}" if indice['bandera'] else indice['nombre']
+        porcentaje = indice['porcentaje']
         mensaje_partes.append(
             f"*{nombre}*\n"
-            f"  Último: {ultimo}\n"
-            f"  Máx.: {maximo}\n"
-            f"  Mín.: {minimo}\n"
-            f"  Var.: {variacion}\n"
-            f"  % Var.: {porcentaje}\n"
+            f"  Último: {formatear_numero(indice['ultimo'])}\n"
+            f"  Máx.: {formatear_numero(indice['maximo'])}\n"
+            f"  Mín.: {formatear_numero(indice['minimo'])}\n"
+            f"  Var.: {formatear_numero(indice['variacion'], signo=True)}\n"
+            f"  % Var.: {formatear_numero(porcentaje, signo=True) + '%' if porcentaje is not None else '-'}\n"
         )
     return "\n".join(mensaje_partes).strip()
 
 # --- Ejecución Principal ---
 if __name__ == "__main__":
-    indices_obtenidos = []
-    for nombre, url in URLS.items():
-        print(f"Obteniendo datos de {nombre}...")
-        indices_obtenidos.extend(obtener_datos(url))
+    # --- Configuración de Codificación ---
+    # Solo al ejecutarse como script, para que alertas.py pueda importar este módulo
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-    mensaje_whatsapp = formatear_para_whatsapp(indices_obtenidos)
-    print(mensaje_whatsapp)  # Imprime solo el resultado final
+    indices_obtenidos = asyncio.run(obtener_todos())
+    try:
+        registrar_historial(indices_obtenidos)
+    except (OSError, TimeoutError) as e:
+        print(f"Advertencia: no se pudo guardar el histórico: {e}", file=sys.stderr)
+
+    if '--json' in sys.argv:
+        print(json.dumps(indices_obtenidos, ensure_ascii=False))
+    else:
+        print(formatear_para_whatsapp(indices_obtenidos))
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Caché local de imágenes direccionado por contenido.
+
+Cada imagen remota (NASA APOD, XKCD, cócteles...) se descarga una sola vez,
+se re-codifica a una variante apta para Telegram (máx. 1280 px, JPEG) y se
+guarda como temp/media/<sha256>.jpg. Un índice mapea URL -> hash y, una vez
+subida, URL -> file_id de Telegram para reenviarla sin volver a subirla.
+El directorio tiene un presupuesto de disco con expulsión LRU.
+
+Cada lectura-modificación-escritura del índice se hace bajo un lock
+(bloqueo.py); las descargas ocurren fuera de él.
+
+Uso:
+    python cache_media.py obtener <url>            -> {"ruta", "hash", "file_id"}
+    python cache_media.py file_id <url> <file_id>  -> registra el file_id de Telegram
+"""
+import sys
+import io
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+import requests
+from PIL import Image
+
+from bloqueo import bloqueo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+MEDIA_DIR = PROJECT_ROOT / 'temp' / 'media'
+INDICE_PATH = MEDIA_DIR / 'indice.json'
+
+LADO_MAXIMO = 1280
+CALIDAD_JPEG = 85
+PRESUPUESTO_BYTES = 200 * 1024 * 1024  # 200 MB
+REQUEST_TIMEOUT = 15
+MAX_DESCARGA = 30 * 1024 * 1024
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+# --- Índice ---
+
+def leer_indice():
+    try:
+        indice = json.loads(INDICE_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        indice = {}
+    indice.setdefault('urls', {})      # url -> hash
+    indice.setdefault('archivos', {})  # hash -> {bytes, ultimo_uso, file_id}
+    return indice
+
+
+def guardar_indice(indice):
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = INDICE_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(indice, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, INDICE_PATH)
+
+
+def _ruta(huella):
+    return MEDIA_DIR / f"{huella}.jpg"
+
+
+# --- Procesamiento ---
+
+def variante_telegram(datos):
+    """Re-codifica la imagen a JPEG con el lado mayor limitado a LADO_MAXIMO."""
+    with Image.open(io.BytesIO(datos)) as img:
+        img.thumbnail((LADO_MAXIMO, LADO_MAXIMO))
+        if img.mode not in ('RGB', 'L'):
+            fondo = Image.new('RGB', img.size, (255, 255, 255))
+            fondo.paste(img.convert('RGBA'), mask=img.convert('RGBA').split()[-1])
+            img = fondo
+        salida = io.BytesIO()
+        img.convert('RGB').save(salida, 'JPEG', quality=CALIDAD_JPEG, optimize=True)
+    return salida.getvalue()
+
+
+def descargar(url):
+    response = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT, stream=True)
+    response.raise_for_status()
+    partes, total = [], 0
+    for bloque in response.iter_content(64 * 1024):
+        total += len(bloque)
+        if total > MAX_DESCARGA:
+            raise ValueError(f"La imagen supera {MAX_DESCARGA // (1024 * 1024)} MB")
+        partes.append(bloque)
+    return b''.join(partes)
+
+
+def _expulsar(indice, conservar):
+    """Borra los archivos usados hace más tiempo hasta respetar el presupuesto."""
+    total = sum(a['bytes'] for a in indice['archivos'].values())
+    if total <= PRESUPUESTO_BYTES:
+        return
+    for huella, info in sorted(indice['archivos'].items(), key=lambda kv: kv[1]['ultimo_uso']):
+        if total <= PRESUPUESTO_BYTES:
+            break
+        if huella == conservar:
+            continue
+        # Si ya tiene file_id se puede seguir reenviando sin el archivo local
+        _ruta(huella).unlink(missing_ok=True)
+        total -= info['bytes']
+        if info.get('file_id'):
+            info['bytes'] = 0
+        else:
+            del indice['archivos'][huella]
+            indice['urls'] = {u: h for u, h in indice['urls'].items() if h != huella}
+
+
+def obtener(url):
+    """
+    Devuelve {'ruta', 'hash', 'file_id'} para la URL. Solo descarga si la URL
+    no se ha visto antes o si su archivo fue expulsado y no tiene file_id.
+    """
+    indice = leer_indice()
+    huella = indice['urls'].get(url)
+    info = indice['archivos'].get(huella) if huella else None
+
+    tamano = None
+    if info is None or (not info.get('file_id') and not _ruta(huella).exists()):
+        # Descarga fuera del lock: puede tardar segundos
+        original = descargar(url)
+        # El hash es del contenido original: la misma imagen en otra URL se reutiliza
+        huella = hashlib.sha256(original).hexdigest()
+        if not _ruta(huella).exists():
+            variante = variante_telegram(original)
+            MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = _ruta(huella).with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_bytes(variante)
+            os.replace(tmp, _ruta(huella))
+        tamano = _ruta(huella).stat().st_size
+
+    with bloqueo(INDICE_PATH):
+        indice = leer_indice()
+        info = indice['archivos'].setdefault(huella, {'bytes': 0})
+        if tamano is not None:
+            info['bytes'] = tamano
+        indice['urls'][url] = huella
+        info['ultimo_uso'] = time.time()
+        _expulsar(indice, huella)
+        guardar_indice(indice)
+
+    ruta = _ruta(huella)
+    return {
+        'ruta': str(ruta) if ruta.exists() else None,
+        'hash': huella,
+        'file_id': info.get('file_id'),
+    }
+
+
+def registrar_file_id(url, file_id):
+    with bloqueo(INDICE_PATH):
+        indice = leer_indice()
+        huella = indice['urls'].get(url)
+        if not huella or huella not in indice['archivos']:
+            return False
+        indice['archivos'][huella]['file_id'] = file_id
+        guardar_indice(indice)
+    return True
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    if len(sys.argv) < 3:
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(1)
+
+    comando = sys.argv[1]
+    try:
+        if comando == 'obtener':
+            print(json.dumps(obtener(sys.argv[2])))
+        elif comando == 'file_id' and len(sys.argv) >= 4:
+            print(json.dumps({'registrado': registrar_file_id(sys.argv[2], sys.argv[3])}))
+        else:
+            print(__doc__.strip(), file=sys.stderr)
+            sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Cola persistente de contenido pre-descargado para !random.
+
+`llenar` consulta las fuentes de random_info.py en segundo plano y guarda
+hasta COLA_MAXIMA ítems ya formateados por categoría. `sacar` entrega uno al
+instante sin tocar la red, evitando repetir la categoría anterior y contenido
+ya servido recientemente. Los ítems del día (efeméride, foto de la NASA)
+vencen a medianoche (hora de Chile), y mientras las fuentes estén caídas se
+sigue sirviendo lo que haya en la cola.
+
+Los términos geek vienen de un dataset local (datasets_locales.py) y no se
+encolan: `sacar` los lee directamente con su cursor sin repetición. Así
+siguen apareciendo aunque las demás colas estén llenas.
+
+`sacar` no importa random_info.py (Playwright, bs4, requests); solo `llenar`
+lo hace. El llenado consulta las categorías en paralelo, salta las fuentes
+que random_info marca como no saludables y registra cada resultado en sus
+estadísticas.
+
+Uso:
+    python cola_random.py sacar [chat] -> imprime un ítem JSON (código 1 si la cola está vacía)
+    python cola_random.py llenar       -> completa la cola (pensado para correr en segundo plano)
+"""
+import sys
+import io
+import os
+import json
+import time
+import random
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import datasets_locales
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+COLA_PATH = PROJECT_ROOT / 'temp' / 'random_queue.json'
+LOCK_PATH = COLA_PATH.with_suffix('.lock')
+LLENADO_LOCK_PATH = COLA_PATH.with_suffix('.fill.lock')
+
+COLA_MAXIMA = 4              # ítems por categoría
+SERVIDOS_RECORDADOS = 100    # hashes de ítems ya entregados
+VIGENCIA_DEFECTO = 3 * 24 * 60 * 60
+LOCK_VENCIDO = 120           # segundos tras los que un lock se considera abandonado
+ZONA_HORARIA_CHILE = ZoneInfo('America/Santiago')
+
+# Categoría -> (nombre de la función en random_info, ¿vence a medianoche?)
+CATEGORIAS = {
+    'efemeride': ('get_efemeride', True),
+    'dato': ('get_fun_fact', False),
+    'nasa': ('get_nasa_apod', True),
+    'frase': ('get_quote_of_the_day', False),
+    'cine': ('get_cartelera_cine', True),
+    'chiste': ('get_geek_joke', False),
+    'trago': ('get_trago_del_dia', False),
+    'xkcd': ('get_xkcd_comic', False),
+}
+# Categorías servidas desde datasets locales, sin cola ni red
+CATEGORIAS_LOCALES = ('geek',)
+
+
+# --- Persistencia ---
+
+class _Lock:
+    """Lock de archivo portable (O_EXCL) para secciones críticas cortas."""
+
+    def __init__(self, ruta, espera=5.0):
+        self.ruta, self.espera = ruta, espera
+        self.tomado = False
+
+    def __enter__(self):
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        limite = time.monotonic() + self.espera
+        while True:
+            try:
+                os.close(os.open(self.ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                self.tomado = True
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - self.ruta.stat().st_mtime > LOCK_VENCIDO:
+                        self.ruta.unlink(missing_ok=True)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > limite:
+                    return self
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        if self.tomado:
+            self.ruta.unlink(missing_ok=True)
+
+
+def _leer():
+    try:
+        datos = json.loads(COLA_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        datos = {}
+    datos.setdefault('colas', {})
+    datos.setdefault('servidos', [])
+    datos.setdefault('ultima_categoria', None)
+    return datos
+
+
+def _escribir(datos):
+    COLA_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = COLA_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(datos, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, COLA_PATH)
+
+
+def _huella(item):
+    return hashlib.sha1((item.get('caption', '') + item.get('media_url', '')).encode('utf-8')).hexdigest()[:16]
+
+
+def _vencimiento(a_medianoche):
+    if a_medianoche:
+        manana = datetime.now(ZONA_HORARIA_CHILE).date() + timedelta(days=1)
+        return datetime.combine(manana, datetime.min.time(), tzinfo=ZONA_HORARIA_CHILE).timestamp()
+    return time.time() + VIGENCIA_DEFECTO
+
+
+def _purgar(datos, ahora):
+    for categoria, items in datos['colas'].items():
+        datos['colas'][categoria] = [i for i in items if i['expira'] > ahora]
+
+
+# --- Operaciones ---
+
+def termino_geek(chat='global'):
+    """Término geek del dataset local, sin repetir hasta completar el ciclo del chat."""
+    try:
+        termino = datasets_locales.elegir('terminos', chat)
+    except (OSError, ValueError, LookupError):
+        return None
+    if not termino:
+        return None
+    return {
+        "type": "text",
+        "caption": f"💻 *Término Geek: {termino.get('termino', 'Término')}*\n\n{termino.get('definicion', 'Sin definición')}"
+    }
+
+
+def sacar(chat='global'):
+    """Saca un ítem de una categoría al azar (distinta de la anterior si se puede)."""
+    with _Lock(LOCK_PATH):
+        datos = _leer()
+        _purgar(datos, time.time())
+        disponibles = [c for c, items in datos['colas'].items() if items] + list(CATEGORIAS_LOCALES)
+        distintas = [c for c in disponibles if c != datos['ultima_categoria']] or disponibles
+        categoria = random.choice(distintas)
+        if categoria in CATEGORIAS_LOCALES:
+            item = termino_geek(chat)
+            if not item:
+                _escribir(datos)
+                return None
+        else:
+            entrada = datos['colas'][categoria].pop(0)
+            item = entrada['item']
+            datos['servidos'] = (datos['servidos'] + [entrada['huella']])[-SERVIDOS_RECORDADOS:]
+        datos['ultima_categoria'] = categoria
+        _escribir(datos)
+    return item
+
+
+def _llenar_categoria(random_info, funcion, a_medianoche, faltan, conocidas, stats):
+    """Ítems nuevos de una categoría; cada descarga pasa por run_hedged (plazo y estadísticas)."""
+    nuevos = []
+    intentos = faltan * 2
+    while faltan > 0 and intentos > 0:
+        intentos -= 1
+        item = random_info.run_hedged([funcion], stats, parallel=1)
+        if not item:
+            break  # Fuente caída: se seguirá sirviendo lo que haya
+        huella = _huella(item)
+        if huella in conocidas:
+            continue
+        conocidas.add(huella)
+        nuevos.append({'item': item, 'huella': huella, 'expira': _vencimiento(a_medianoche)})
+        faltan -= 1
+    return nuevos
+
+
+def llenar():
+    """
+    Completa cada categoría hasta COLA_MAXIMA. Las descargas se hacen fuera
+    del lock de la cola, una categoría por hilo; solo la mezcla final lo
+    toma. Un segundo lock evita que corran dos llenados a la vez.
+    """
+    with _Lock(LLENADO_LOCK_PATH, espera=0) as lock:
+        if not lock.tomado:
+            return 0
+
+        # Import diferido: random_info carga Playwright, bs4 y requests
+        import random_info
+
+        datos = _leer()
+        _purgar(datos, time.time())
+        conocidas = set(datos['servidos'])
+        for items in datos['colas'].values():
+            conocidas.update(i['huella'] for i in items)
+
+        stats = random_info.read_source_stats()
+        tareas = {}
+        with ThreadPoolExecutor(max_workers=len(CATEGORIAS)) as pool:
+            for categoria, (nombre_funcion, a_medianoche) in CATEGORIAS.items():
+                en_cola = len(datos['colas'].get(categoria, []))
+                # Los ítems diarios solo tienen un valor útil por día
+                faltan = (1 if a_medianoche else COLA_MAXIMA) - en_cola
+                if faltan <= 0 or not random_info.is_healthy(stats, nombre_funcion):
+                    continue
+                funcion = getattr(random_info, nombre_funcion)
+                tareas[categoria] = pool.submit(_llenar_categoria, random_info, funcion,
+                                                a_medianoche, faltan, conocidas, stats)
+        nuevos = {categoria: tarea.result() for categoria, tarea in tareas.items()}
+        random_info.write_source_stats(stats)
+
+        with _Lock(LOCK_PATH):
+            actual = _leer()
+            _purgar(actual, time.time())
+            for categoria, items in nuevos.items():
+                cola = actual['colas'].setdefault(categoria, [])
+                cola.extend(items)
+                del cola[COLA_MAXIMA:]
+            _escribir(actual)
+    return sum(len(items) for items in nuevos.values())
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    comando = sys.argv[1] if len(sys.argv) > 1 else 'sacar'
+    if comando == 'llenar':
+        print(json.dumps({'agregados': llenar()}))
+    else:
+        item = sacar(sys.argv[2] if len(sys.argv) > 2 else 'global')
+        if not item:
+            sys.exit(1)
+        print(json.dumps(item, ensure_ascii=False))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Búsqueda de comunas tolerante a errores de tipeo.
+
+Los nombres se normalizan (sin tildes, minúsculas, abreviaturas comunes
+expandidas: "pte alto" -> "puente alto", "stgo" -> "santiago") y se indexan
+por trigramas una sola vez por proceso. Una consulta solo compara contra las
+comunas que comparten algún trigrama con ella y las ordena por coeficiente
+de Dice, así que con cientos de comunas sigue tomando microsegundos.
+
+Lo usan todos los comandos que reciben una comuna (farmacias.py, bencina.py).
+
+Uso:
+    python comunas.py <consulta> <comuna> [<comuna> ...]
+"""
+import sys
+import io
+import json
+from collections import Counter
+from functools import lru_cache
+
+from unidecode import unidecode
+
+SIMILITUD_MINIMA = 0.45
+MARGEN_AMBIGUEDAD = 0.08   # si el segundo candidato queda así de cerca, no se elige ninguno
+MAX_SUGERENCIAS = 3
+
+# Abreviaturas por palabra que la gente usa al escribir comunas
+ABREVIATURAS = {
+    'pte': 'puente',
+    'stgo': 'santiago',
+    'sgo': 'santiago',
+    'sta': 'santa',
+    'sto': 'santo',
+    'sn': 'san',
+    'pto': 'puerto',
+    'gral': 'general',
+    'est': 'estacion',
+    'qta': 'quinta',
+    'pdre': 'padre',
+}
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes ni puntuación y con las abreviaturas expandidas."""
+    limpio = ''.join(c if c.isalnum() else ' ' for c in unidecode(texto or '').lower())
+    return ' '.join(ABREVIATURAS.get(palabra, palabra) for palabra in limpio.split())
+
+
+def trigramas(texto):
+    """Trigramas del texto con relleno, para que los bordes de palabra cuenten."""
+    relleno = f"  {texto} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceComunas:
+    """Índice invertido trigrama -> comunas para búsquedas aproximadas."""
+
+    def __init__(self, nombres):
+        self.nombres = list(dict.fromkeys(nombres))
+        self.normalizados = [normalizar(n) for n in self.nombres]
+        self.exactos = {}
+        for i, clave in enumerate(self.normalizados):
+            self.exactos.setdefault(clave, i)
+        self.tamanos = []
+        self.postings = {}
+        for i, clave in enumerate(self.normalizados):
+            grams = trigramas(clave)
+            self.tamanos.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+
+    def candidatos(self, consulta, limite=MAX_SUGERENCIAS, minimo=SIMILITUD_MINIMA):
+        """[(nombre original, similitud)] ordenados de mayor a menor similitud."""
+        clave = normalizar(consulta)
+        if not clave:
+            return []
+        if clave in self.exactos:
+            return [(self.nombres[self.exactos[clave]], 1.0)]
+
+        grams = trigramas(clave)
+        compartidos = Counter()
+        for gram in grams:
+            compartidos.update(self.postings.get(gram, ()))
+
+        puntajes = []
+        for i, comunes in compartidos.items():
+            dice = 2 * comunes / (len(grams) + self.tamanos[i])
+            # "stgo centro" -> "santiago": la comuna contenida completa en la consulta también cuenta
+            if (' ' + self.normalizados[i] + ' ') in (' ' + clave + ' '):
+                dice = max(dice, 0.9)
+            if dice >= minimo:
+                puntajes.append((dice, -len(self.normalizados[i]), i))
+        puntajes.sort(reverse=True)
+        return [(self.nombres[i], round(dice, 3)) for dice, _, i in puntajes[:limite]]
+
+    def buscar(self, consulta):
+        """
+        Mejor comuna para la consulta, o None si ninguna se parece lo suficiente
+        o si la consulta es ambigua (p. ej. "san" se parece igual a varias).
+        """
+        resultado = self.candidatos(consulta, limite=2)
+        if not resultado:
+            return None
+        if len(resultado) > 1 and resultado[0][1] < 1.0 and resultado[0][1] - resultado[1][1] < MARGEN_AMBIGUEDAD:
+            return None
+        return resultado[0][0]
+
+
+@lru_cache(maxsize=8)
+def _indice_cacheado(nombres):
+    return IndiceComunas(nombres)
+
+
+def indice(nombres):
+    """Índice para una lista de nombres; se construye una vez por proceso y lista."""
+    return _indice_cacheado(tuple(nombres))
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    if len(sys.argv) < 3:
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(indice(sys.argv[2:]).candidatos(sys.argv[1]), ensure_ascii=False))
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Capa de acceso a los datasets JSON locales (por ahora, los términos geek).
+
+Cada JSON se compila a un binario indexado en temp/datasets/<nombre>.bin:
+
+    cabecera  '<4sIIqQ'  magia, versión, cantidad, mtime_ns y tamaño del origen
+    offsets   (cantidad + 1) x uint32
+    datos     registros JSON compactos concatenados
+
+El binario solo se reconstruye cuando cambia el mtime o el tamaño del JSON de
+origen. Leer el ítem i es O(1): dos offsets y la decodificación de ese único
+registro, sin cargar el archivo completo.
+
+La selección recorre por chat una permutación pseudoaleatoria de range(n),
+de modo que los ítems no se repiten hasta completar el ciclo. La permutación
+es una red de Feistel con claves derivadas de la semilla del ciclo, sobre el
+menor dominio de 2^(2k) >= n, con "cycle walking" para quedarse en range(n):
+calcular la posición p es O(1) (en promedio menos de 4 evaluaciones) y no hay
+que construir ni guardar la lista. El cursor de cada chat es la semilla y la
+posición.
+
+casos.json y playlist_local.json no se compilan: los casos se agregan y
+listan en orden desde Node (no hay selección al azar) y la playlist no tiene
+consumidor.
+
+Uso:
+    python datasets_locales.py elegir <dataset> [chat]
+    python datasets_locales.py compilar [dataset]
+"""
+import sys
+import io
+import os
+import json
+import mmap
+import random
+import hashlib
+import struct
+from pathlib import Path
+
+from bloqueo import bloqueo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DATASETS_DIR = PROJECT_ROOT / 'temp' / 'datasets'
+CURSORES_PATH = DATASETS_DIR / 'cursores.json'
+
+DATASETS = {
+    'terminos': PROJECT_ROOT / 'src' / 'data' / 'terminos_geek.json',
+}
+
+MAGIA = b'BDS1'
+VERSION = 1
+CABECERA = struct.Struct('<4sIIqQ')
+OFFSET = struct.Struct('<I')
+RONDAS_FEISTEL = 4
+VERSION_CURSOR = 2   # subir si cambia la forma de recorrer la permutación
+
+
+# --- Compilación ---
+
+def _ruta_binario(nombre):
+    return DATASETS_DIR / f"{nombre}.bin"
+
+
+def compilar(nombre):
+    """Convierte el JSON de origen al formato binario indexado."""
+    origen = DATASETS[nombre]
+    info = origen.stat()
+    items = json.loads(origen.read_text(encoding='utf-8'))
+    registros = [json.dumps(item, ensure_ascii=False, separators=(',', ':')).encode('utf-8') for item in items]
+
+    offsets = [0]
+    for registro in registros:
+        offsets.append(offsets[-1] + len(registro))
+
+    DATASETS_DIR.mkdir(parents=True, exist_ok=True)
+    destino = _ruta_binario(nombre)
+    tmp = destino.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(CABECERA.pack(MAGIA, VERSION, len(registros), info.st_mtime_ns, info.st_size))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.writelines(registros)
+    os.replace(tmp, destino)
+
+
+def _vigente(nombre):
+    """True si el binario existe y corresponde a la versión actual del JSON."""
+    try:
+        origen = DATASETS[nombre].stat()
+        with open(_ruta_binario(nombre), 'rb') as f:
+            magia, version, _, mtime_ns, tamano = CABECERA.unpack(f.read(CABECERA.size))
+    except (OSError, struct.error):
+        return False
+    return magia == MAGIA and version == VERSION and mtime_ns == origen.st_mtime_ns and tamano == origen.st_size
+
+
+class Dataset:
+    """Acceso aleatorio O(1) a los registros de un dataset compilado."""
+
+    def __init__(self, nombre):
+        if nombre not in DATASETS:
+            raise LookupError(f"Dataset desconocido '{nombre}'. Disponibles: {', '.join(DATASETS)}")
+        if not _vigente(nombre):
+            compilar(nombre)
+        self.nombre = nombre
+        with open(_ruta_binario(nombre), 'rb') as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, self.cantidad, _, _ = CABECERA.unpack_from(self._mapa, 0)
+        self._inicio_datos = CABECERA.size + OFFSET.size * (self.cantidad + 1)
+
+    def __len__(self):
+        return self.cantidad
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.cantidad:
+            raise IndexError(i)
+        base = CABECERA.size + OFFSET.size * i
+        desde, hasta = struct.unpack_from('<II', self._mapa, base)
+        return json.loads(self._mapa[self._inicio_datos + desde:self._inicio_datos + hasta])
+
+
+# --- Selección sin repetición ---
+
+def _leer_cursores():
+    try:
+        return json.loads(CURSORES_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _guardar_cursores(cursores):
+    DATASETS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CURSORES_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(cursores), encoding='utf-8')
+    os.replace(tmp, CURSORES_PATH)
+
+
+def _ronda(semilla, ronda, valor, mascara):
+    datos = f"{semilla}:{ronda}:{valor}".encode('ascii')
+    return int.from_bytes(hashlib.blake2b(datos, digest_size=8).digest(), 'little') & mascara
+
+
+def _permutar(n, semilla, pos):
+    """Elemento `pos` de la permutación de range(n) que define la semilla (O(1))."""
+    bits = max(1, (n - 1).bit_length() + 1) // 2   # mitades de `bits` bits: 4^bits >= n
+    mascara = (1 << bits) - 1
+    x = pos
+    while True:
+        izquierda, derecha = x >> bits, x & mascara
+        for ronda in range(RONDAS_FEISTEL):
+            izquierda, derecha = derecha, izquierda ^ _ronda(semilla, ronda, derecha, mascara)
+        x = (izquierda << bits) | derecha
+        # Cycle walking: fuera de range(n) se vuelve a permutar hasta caer dentro
+        if x < n:
+            return x
+
+
+def _nueva_semilla(n, ultimo):
+    """Semilla de un ciclo nuevo que no empiece por el último ítem del anterior."""
+    while True:
+        semilla = random.getrandbits(64)
+        if n < 2 or _permutar(n, semilla, 0) != ultimo:
+            return semilla
+
+
+def elegir(nombre, chat='global'):
+    """Siguiente ítem del ciclo sin repetición del chat."""
+    dataset = Dataset(nombre)
+    n = len(dataset)
+    if n == 0:
+        return None
+
+    with bloqueo(CURSORES_PATH):
+        cursores = _leer_cursores()
+        clave = f"{nombre}:{chat}"
+        cursor = cursores.get(clave)
+        # Un cambio en la cantidad de ítems (o un cursor del formato anterior)
+        # invalida la permutación
+        if not cursor or cursor.get('n') != n or cursor.get('v') != VERSION_CURSOR or cursor['pos'] >= n:
+            ultimo = cursor.get('ultimo') if cursor else None
+            cursor = {'v': VERSION_CURSOR, 'n': n, 'semilla': _nueva_semilla(n, ultimo), 'pos': 0}
+
+        indice = _permutar(n, cursor['semilla'], cursor['pos'])
+        cursor['pos'] += 1
+        cursor['ultimo'] = indice
+        cursores[clave] = cursor
+        _guardar_cursores(cursores)
+    return dataset[indice]
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    args = sys.argv[1:]
+    try:
+        if args and args[0] == 'compilar':
+            for nombre in (args[1:] or DATASETS):
+                compilar(nombre)
+                print(f"{nombre}: {len(Dataset(nombre))} registros")
+        elif len(args) >= 2 and args[0] == 'elegir':
+            print(json.dumps(elegir(args[1], args[2] if len(args) > 2 else 'global'), ensure_ascii=False))
+        else:
+            print(__doc__.strip(), file=sys.stderr)
+            sys.exit(1)
+    except (LookupError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Aritmética de días hábiles sobre el calendario de feriados_cl.py.
+
+Por cada año se precalcula un bitset de días hábiles (lunes a viernes que no
+son feriado) y su suma acumulada, de modo que:
+  - contar días hábiles entre dos fechas es O(1) por año involucrado,
+  - "N días hábiles después de X" es una búsqueda binaria sobre la suma acumulada,
+  - los fines de semana largos (puentes) salen de una sola pasada por el año,
+    extendida unos días hacia los años vecinos para no cortar los que cruzan
+    el 31 de diciembre / 1 de enero.
+
+Uso:
+    python dias_habiles.py hasta <YYYY-MM-DD>
+    python dias_habiles.py entre <YYYY-MM-DD> <YYYY-MM-DD>
+    python dias_habiles.py sumar <YYYY-MM-DD> <n>
+    python dias_habiles.py puentes [año]
+"""
+import sys
+import io
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import feriados_cl
+
+# Días del año anterior y del siguiente que se agregan al recorrer los puentes
+MARGEN_PUENTES = 10
+
+
+class CalendarioAnual:
+    """Bitset de días hábiles de un año y su suma acumulada."""
+
+    def __init__(self, anio):
+        self.anio = anio
+        self.inicio = date(anio, 1, 1)
+        largo = (date(anio + 1, 1, 1) - self.inicio).days
+        feriados = {f['fecha'] for f in feriados_cl.feriados_del_anio(anio)}
+
+        # Un byte por día: 1 = hábil, 0 = fin de semana o feriado
+        self.habil = bytearray(largo)
+        primer_dia = self.inicio.weekday()
+        for i in range(largo):
+            if (primer_dia + i) % 7 < 5:
+                self.habil[i] = 1
+        for fecha in feriados:
+            self.habil[(fecha - self.inicio).days] = 0
+
+        # acumulado[i] = días hábiles en [1 de enero, inicio + i) ; acumulado[-1] = total
+        self.acumulado = array('H', [0]) * (largo + 1)
+        total = 0
+        for i, valor in enumerate(self.habil):
+            total += valor
+            self.acumulado[i + 1] = total
+        self.feriados = feriados
+
+    @property
+    def total(self):
+        return self.acumulado[-1]
+
+    def indice(self, fecha):
+        return (fecha - self.inicio).days
+
+    def es_habil(self, fecha):
+        return bool(self.habil[self.indice(fecha)])
+
+
+@lru_cache(maxsize=16)
+def calendario(anio):
+    return CalendarioAnual(anio)
+
+
+def es_habil(fecha):
+    return calendario(fecha.year).es_habil(fecha)
+
+
+def _habiles_antes_de(fecha):
+    """Días hábiles desde el 1 de enero del año de `fecha` hasta el día anterior."""
+    return calendario(fecha.year).acumulado[(fecha - date(fecha.year, 1, 1)).days]
+
+
+def contar_habiles(desde, hasta):
+    """
+    Días hábiles en el intervalo semiabierto (desde, hasta]: no cuenta el día de
+    partida y sí el de llegada. Si hasta < desde el resultado es negativo.
+    """
+    if hasta < desde:
+        return -contar_habiles(hasta, desde)
+    siguiente = desde + timedelta(days=1)
+    fin = hasta + timedelta(days=1)
+    if siguiente.year == fin.year or fin == date(siguiente.year + 1, 1, 1):
+        cal = calendario(siguiente.year)
+        return cal.acumulado[cal.indice(fin) if fin.year == siguiente.year else -1] - cal.acumulado[cal.indice(siguiente)]
+
+    total = calendario(siguiente.year).total - _habiles_antes_de(siguiente)
+    for anio in range(siguiente.year + 1, fin.year):
+        total += calendario(anio).total
+    return total + _habiles_antes_de(fin)
+
+
+def sumar_habiles(desde, n):
+    """Fecha que queda `n` días hábiles después (n > 0) o antes (n < 0) de `desde`."""
+    if n == 0:
+        return desde
+    if n < 0:
+        return _restar_habiles(desde, -n)
+
+    anio = desde.year
+    # Hábiles ya consumidos del año de partida (incluyendo el propio día)
+    objetivo = _habiles_antes_de(desde) + calendario(anio).habil[calendario(anio).indice(desde)] + n
+    while True:
+        cal = calendario(anio)
+        if objetivo <= cal.total:
+            # Primer índice cuyo acumulado (hasta el día inclusive) alcanza el objetivo
+            i = bisect_left(cal.acumulado, objetivo) - 1
+            return cal.inicio + timedelta(days=i)
+        objetivo -= cal.total
+        anio += 1
+
+
+def _restar_habiles(desde, n):
+    anio = desde.year
+    # Posición (1-based) del último hábil anterior a `desde` dentro de su año
+    objetivo = _habiles_antes_de(desde) - n + 1
+    while objetivo <= 0:
+        anio -= 1
+        objetivo += calendario(anio).total
+    cal = calendario(anio)
+    return cal.inicio + timedelta(days=bisect_left(cal.acumulado, objetivo) - 1)
+
+
+def puentes(anio, minimo=3):
+    """
+    Fines de semana largos del año: tramos de `minimo` o más días no hábiles
+    consecutivos que incluyen al menos un feriado. Una sola pasada por el bitset
+    del año, con MARGEN_PUENTES días de los años vecinos a cada lado: un puente
+    que cruza el año nuevo sale completo y aparece en ambos años.
+    """
+    anterior, cal, siguiente = calendario(anio - 1), calendario(anio), calendario(anio + 1)
+    habil = anterior.habil[-MARGEN_PUENTES:] + cal.habil + siguiente.habil[:MARGEN_PUENTES]
+    inicio = cal.inicio - timedelta(days=MARGEN_PUENTES)
+    fin = siguiente.inicio - timedelta(days=1)
+    todos_feriados = anterior.feriados | cal.feriados | siguiente.feriados
+
+    resultado = []
+    inicio_tramo = None
+    for i in range(len(habil) + 1):
+        libre = i < len(habil) and not habil[i]
+        if libre and inicio_tramo is None:
+            inicio_tramo = i
+        elif not libre and inicio_tramo is not None:
+            desde = inicio + timedelta(days=inicio_tramo)
+            hasta = inicio + timedelta(days=i - 1)
+            # Solo los tramos que tocan el año pedido
+            if i - inicio_tramo >= minimo and hasta >= cal.inicio and desde <= fin:
+                feriados = sorted(f for f in todos_feriados if desde <= f <= hasta)
+                if feriados:
+                    resultado.append({'desde': desde, 'hasta': hasta, 'dias': i - inicio_tramo, 'feriados': feriados})
+            inicio_tramo = None
+    return resultado
+
+
+# --- CLI ---
+
+def _fecha(texto):
+    return date.fromisoformat(texto)
+
+
+def main(argv):
+    hoy = datetime.now(feriados_cl.ZONA_HORARIA_CHILE).date()
+    if not argv:
+        print(__doc__.strip())
+        return 1
+
+    comando, args = argv[0], argv[1:]
+    try:
+        if comando == 'hasta' and args:
+            objetivo = _fecha(args[0])
+            n = contar_habiles(hoy, objetivo)
+            texto_fecha = f"{feriados_cl.formatear_fecha(objetivo).lower()} de {objetivo.year}"
+            if n < 0:
+                # Fecha pasada: el conteo negativo se muestra como "hace N"
+                print(f"🗓️ El {texto_fecha} ya pasó: fue hace *{-n}* días hábiles.")
+            else:
+                print(f"🗓️ Faltan *{n}* días hábiles hasta el {texto_fecha}.")
+        elif comando == 'entre' and len(args) >= 2:
+            desde, hasta = _fecha(args[0]), _fecha(args[1])
+            print(f"🗓️ Entre {desde.isoformat()} y {hasta.isoformat()} hay *{contar_habiles(desde, hasta)}* días hábiles.")
+        elif comando == 'sumar' and len(args) >= 2:
+            desde, n = _fecha(args[0]), int(args[1])
+            resultado = sumar_habiles(desde, n)
+            print(f"🗓️ {n} días hábiles desde el {desde.isoformat()}: *{feriados_cl.formatear_fecha(resultado)} de {resultado.year}*")
+        elif comando == 'puentes':
+            anio = int(args[0]) if args else hoy.year
+            lista = [p for p in puentes(anio) if p['hasta'] >= hoy or anio != hoy.year]
+            if not lista:
+                print(f"😴 No quedan fines de semana largos en {anio}.")
+                return 0
+            print(f"🏖️ *Fines de semana largos {anio}:*\n")
+            for p in lista:
+                print(f"• {feriados_cl.formatear_fecha(p['desde'])} al {feriados_cl.formatear_fecha(p['hasta']).lower()} ({p['dias']} días)")
+        else:
+            print(__doc__.strip(), file=sys.stderr)
+            return 1
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Estado agregado de bancos y medios de pago.
+
+Todos los sitios se consultan a la vez en un solo bucle asyncio, así que un
+barrido completo tarda lo que la consulta más lenta (con tope TIMEOUT). Cada
+sitio se prueba primero con HEAD y solo si el servidor no lo acepta se repite
+con GET, que reutiliza la misma conexión (una ClientSession con keep-alive y
+caché de DNS para todo el barrido). Los proveedores con página de estado
+Statuspage se leen desde su API JSON en vez de su portada.
+
+Cada resultado se agrega al historial de temp/estado_pagos.json (últimas
+MAX_HISTORIAL muestras por sitio). El estado que se informa sale de las
+últimas VENTANA muestras de los últimos VIGENCIA_MUESTRA segundos: un sitio
+pasa a CAIDO solo si falló en al menos FALLOS_CAIDO de ellas, de modo que un
+timeout aislado queda como INESTABLE. Las muestras más viejas no cuentan
+(los barridos son a pedido y pueden pasar horas entre uno y otro), así que
+una caída de ayer no tiñe el estado de hoy. Para no depender de barridos
+anteriores, cada sitio que falla se vuelve a sondear una vez en el mismo
+barrido: CAIDO exige siempre FALLOS_CAIDO fallos reales, nunca uno solo.
+
+El historial se lee, actualiza y escribe bajo el lock de bloqueo.py, para
+que dos consultas simultáneas no pierdan muestras.
+
+Uso:
+    python estado_pagos.py          -> texto para el chat
+    python estado_pagos.py --json   -> snapshot estructurado
+"""
+import sys
+import io
+import os
+import json
+import time
+import asyncio
+import statistics
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import aiohttp
+
+from bloqueo import bloqueo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+HISTORIAL_PATH = PROJECT_ROOT / 'temp' / 'estado_pagos.json'
+
+TIMEOUT = aiohttp.ClientTimeout(total=5, connect=3)
+VENTANA = 3
+VIGENCIA_MUESTRA = 10 * 60   # segundos
+FALLOS_CAIDO = 2
+MAX_HISTORIAL = 50
+LATENCIA_LENTA_MS = 2000
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Servidores que responden a HEAD con alguno de estos códigos sí están en pie,
+# pero hay que repetir con GET para medir una respuesta real
+SIN_HEAD = {403, 405, 501}
+
+BANCOS = [
+    ('BancoEstado', 'https://www.bancoestado.cl'),
+    ('Banco de Chile', 'https://portales.bancochile.cl/'),
+    ('Santander', 'https://banco.santander.cl/'),
+    ('BCI', 'https://www.bci.cl/'),
+    ('Scotiabank', 'https://www.scotiabankchile.cl/'),
+    ('Itaú', 'https://www.itau.cl/'),
+    ('Falabella', 'https://www.bancofalabella.cl/'),
+    ('Banco Ripley', 'https://www.bancoripley.cl/'),
+    ('Banco Security', 'https://www.security.cl/'),
+    ('Banco Consorcio', 'https://www.bancoconsorcio.cl/'),
+    ('Banco Internacional', 'https://www.bancointernacional.cl/'),
+    ('BICE', 'https://www.bice.cl/'),
+    ('Coopeuch', 'https://www.coopeuch.cl/'),
+    ('Tenpo', 'https://www.tenpo.cl/'),
+]
+
+# (nombre, url, tipo): 'web' se prueba como los bancos, 'statuspage' lee la API JSON
+PAGOS = [
+    ('Transbank', 'https://status.transbankdevelopers.cl/api/v2/status.json', 'statuspage'),
+    ('Mercado Pago', 'https://www.mercadopago.cl/', 'web'),
+    ('Flow', 'https://www.flow.cl/', 'web'),
+    ('Khipu', 'https://khipu.com/', 'web'),
+]
+
+ENDPOINTS = (
+    [{'nombre': n, 'url': u, 'grupo': 'banco', 'tipo': 'web'} for n, u in BANCOS] +
+    [{'nombre': n, 'url': u, 'grupo': 'pago', 'tipo': t} for n, u, t in PAGOS]
+)
+
+
+# --- Sondeo ---
+
+async def sondear_web(session, url):
+    """(ok, código HTTP, detalle). HEAD primero; GET solo si el servidor no acepta HEAD."""
+    async with session.head(url, allow_redirects=True) as response:
+        codigo = response.status
+    if codigo in SIN_HEAD:
+        async with session.get(url, allow_redirects=True) as response:
+            codigo = response.status
+    return codigo < 500, codigo, None
+
+
+async def sondear_statuspage(session, url):
+    """Indicador global de una página Statuspage: none/minor/major/critical."""
+    async with session.get(url) as response:
+        codigo = response.status
+        datos = await response.json(content_type=None)
+    indicador = datos.get('status', {}).get('indicator', 'none')
+    return indicador not in ('major', 'critical'), codigo, indicador
+
+
+async def sondear(session, endpoint):
+    inicio = time.perf_counter()
+    try:
+        sonda = sondear_statuspage if endpoint['tipo'] == 'statuspage' else sondear_web
+        ok, codigo, detalle = await sonda(session, endpoint['url'])
+    except asyncio.TimeoutError:
+        ok, codigo, detalle = False, None, 'timeout'
+    except (aiohttp.ClientError, ValueError) as e:
+        ok, codigo, detalle = False, None, type(e).__name__
+    latencia = round((time.perf_counter() - inicio) * 1000)
+    return {'ts': time.time(), 'ok': ok, 'codigo': codigo, 'detalle': detalle,
+            'latencia_ms': latencia if ok else None}
+
+
+async def barrido():
+    """
+    Sondea todos los endpoints en paralelo y repite una vez los que fallaron.
+    Devuelve, por endpoint, la lista de muestras tomadas (una o dos).
+    """
+    connector = aiohttp.TCPConnector(limit_per_host=2, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=TIMEOUT,
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        primeras = await asyncio.gather(*(sondear(session, e) for e in ENDPOINTS))
+        fallidos = [i for i, r in enumerate(primeras) if not r['ok']]
+        repetidas = await asyncio.gather(*(sondear(session, ENDPOINTS[i]) for i in fallidos))
+    muestras = [[r] for r in primeras]
+    for i, r in zip(fallidos, repetidas):
+        muestras[i].append(r)
+    return muestras
+
+
+# --- Historial y suavizado ---
+
+def leer_historial():
+    try:
+        return json.loads(HISTORIAL_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def guardar_historial(historial):
+    HISTORIAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = HISTORIAL_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(historial, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, HISTORIAL_PATH)
+
+
+def ventana(muestras, ahora):
+    """Últimas VENTANA muestras, descartando las de más de VIGENCIA_MUESTRA segundos."""
+    return [m for m in muestras[-VENTANA:] if ahora - m['ts'] <= VIGENCIA_MUESTRA]
+
+
+def estado_suavizado(muestras, ahora):
+    """OK / LENTO / INESTABLE / CAIDO a partir de las muestras vigentes de la ventana."""
+    ventana_actual = ventana(muestras, ahora)
+    if not ventana_actual:
+        # Solo muestras viejas (no debería pasar: el barrido recién agregado es vigente)
+        ventana_actual = muestras[-1:]
+    fallos = sum(1 for m in ventana_actual if not m['ok'])
+    if fallos >= FALLOS_CAIDO:
+        return 'CAIDO'
+    if fallos:
+        return 'INESTABLE'
+    latencias = [m['latencia_ms'] for m in ventana_actual]
+    return 'LENTO' if statistics.median(latencias) > LATENCIA_LENTA_MS else 'OK'
+
+
+def snapshot(resultados, historial):
+    """
+    Agrega el barrido (por endpoint, sus muestras en orden) al historial y
+    arma el snapshot que se informa.
+    """
+    servicios = []
+    ahora = time.time()
+    for endpoint, nuevas in zip(ENDPOINTS, resultados):
+        resultado = nuevas[-1]
+        muestras = (historial.get(endpoint['nombre'], []) + nuevas)[-MAX_HISTORIAL:]
+        historial[endpoint['nombre']] = muestras
+        latencias = [m['latencia_ms'] for m in ventana(muestras, ahora) if m['ok']]
+        servicios.append({
+            **endpoint,
+            'estado': estado_suavizado(muestras, ahora),
+            'latencia_ms': resultado['latencia_ms'],
+            'latencia_mediana_ms': round(statistics.median(latencias)) if latencias else None,
+            'ultima': {k: resultado[k] for k in ('ok', 'codigo', 'detalle')},
+        })
+    return {
+        'actualizado': ahora,
+        'online': sum(1 for s in servicios if s['estado'] != 'CAIDO'),
+        'total': len(servicios),
+        'servicios': servicios,
+    }
+
+
+# --- Formato ---
+
+EMOJIS = {'OK': '🟢', 'LENTO': '🟡', 'INESTABLE': '🟠', 'CAIDO': '❌'}
+ORDEN = {'OK': 0, 'LENTO': 1, 'INESTABLE': 2, 'CAIDO': 3}
+
+
+def _linea(s):
+    if s['estado'] == 'CAIDO':
+        return f"❌ *{s['nombre']}:* Caído o lento"
+    latencia = s['latencia_mediana_ms'] if s['latencia_mediana_ms'] is not None else s['latencia_ms']
+    extra = ' _(intermitente)_' if s['estado'] == 'INESTABLE' else ''
+    return f"{EMOJIS[s['estado']]} *{s['nombre']}:* {latencia}ms{extra}"
+
+
+def formatear(datos):
+    def ordenados(grupo):
+        servicios = [s for s in datos['servicios'] if s['grupo'] == grupo]
+        return sorted(servicios, key=lambda s: (ORDEN[s['estado']], s['latencia_mediana_ms'] or 0))
+
+    lineas = ["🏦 *Estado de Bancos y Medios de Pago* 🏦\n",
+              f"📊 *Resumen:* {datos['online']}/{datos['total']} servicios online\n",
+              "*Bancos*"]
+    lineas += [_linea(s) for s in ordenados('banco')]
+    lineas += ["", "*Medios de pago*"]
+    lineas += [_linea(s) for s in ordenados('pago')]
+    hora = datetime.fromtimestamp(datos['actualizado'], ZoneInfo('America/Santiago')).strftime('%H:%M:%S')
+    lineas.append(f"\n_Actualizado: {hora}_")
+    return "\n".join(lineas)
+
+
+def main():
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    resultados = asyncio.run(barrido())
+    with bloqueo(HISTORIAL_PATH):
+        historial = leer_historial()
+        datos = snapshot(resultados, historial)
+        guardar_historial(historial)
+
+    if '--json' in sys.argv:
+        print(json.dumps(datos, ensure_ascii=False))
+    else:
+        print(formatear(datos))
+
+
+if __name__ == '__main__':
+    main()
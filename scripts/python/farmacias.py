@@ -1,60 +1,240 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Script optimizado para obtener farmacias de turno usando la API del Minsal.
-Reemplaza el scraping lento con Playwright por una consulta directa y rápida.
-Uso: python farmacias.py <comuna>
+Farmacias de turno desde un dataset local de la API del Minsal.
+
+El listado nacional (getLocalesTurnos.php) cambia como mucho una vez al día,
+así que se descarga con `actualizar` (programado desde el bot) y se guarda
+partido por comuna en una versión de temp/farmacias/:
+
+    <version>/comunas.json        clave normalizada -> nombre y archivo
+    <version>/comunas/<n>.json    locales de una sola comuna
+    <version>/coordenadas.npz     lat/lng en radianes de todos los locales
+
+Una consulta por comuna lee solo el listado de nombres y el archivo de esa
+comuna, nunca el listado nacional. Cada actualización escribe una versión
+nueva completa y recién entonces apunta `actual` a ella con os.replace, de
+modo que un lector nunca ve una versión a medio escribir.
+
+Para búsquedas por ubicación, coordenadas.npz guarda también la comuna y la
+posición de cada local. Las N más cercanas salen de una sola pasada
+vectorizada de haversine con numpy más un argpartition, y luego se leen solo
+los archivos de las comunas de esas N.
+
+Si todavía no hay datos (primer arranque) la consulta no descarga en línea:
+responde que se están descargando, igual que bencina.py.
+
+Uso:
+    python farmacias.py <comuna>
+    python farmacias.py cerca <lat> <lng> [n]
+    python farmacias.py actualizar
 """
 
 import sys
+import os
 import json
+import time
+import shutil
 import requests
 import io
+from pathlib import Path
+
+import numpy as np
 from unidecode import unidecode
 
-# Configurar salida UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+import comunas
 
 API_URL = 'https://midas.minsal.cl/farmacia_v2/WS/getLocalesTurnos.php'
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DATA_DIR = PROJECT_ROOT / 'temp' / 'farmacias'
+ACTUAL_PATH = DATA_DIR / 'actual'
+VERSIONES_CONSERVADAS = 2   # la vigente y la anterior (por si un lector aún la usa)
+MAX_RESULTADOS = 10
+CERCANAS_DEFECTO = 5
+RADIO_TIERRA_KM = 6371.0
+SIMILITUD_SUGERENCIA = 0.3
+
+def normalizar(texto):
+    return ' '.join(unidecode(texto or '').lower().split())
+
+def _registro(f):
+    return {
+        'nombre': f.get('local_nombre', 'Farmacia'),
+        'direccion': f.get('local_direccion', 'Sin dirección'),
+        'telefono': f.get('local_telefono', ''),
+        'horario': f"{f.get('funcionamiento_hora_apertura', '')} - {f.get('funcionamiento_hora_cierre', '')}",
+        'lat': f.get('local_lat'),
+        'lng': f.get('local_lng')
+    }
+
+def construir_indice(farmacias):
+    """Agrupa los locales por comuna normalizada: {clave: {'nombre', 'farmacias'}}."""
+    comunas = {}
+    for f in farmacias:
+        nombre = (f.get('comuna_nombre') or '').strip()
+        clave = normalizar(nombre)
+        if not clave:
+            continue
+        comunas.setdefault(clave, {'nombre': nombre, 'farmacias': []})['farmacias'].append(_registro(f))
+    return {'actualizado': time.time(), 'total': len(farmacias), 'comunas': comunas}
+
+def _escribir_json(ruta, datos):
+    ruta.write_text(json.dumps(datos, ensure_ascii=False), encoding='utf-8')
+
+def guardar_indice(indice):
+    """Escribe una versión nueva (un archivo por comuna) y la deja como vigente."""
+    version = f"{int(indice['actualizado'] * 1000)}_{os.getpid()}"
+    directorio = DATA_DIR / version
+    (directorio / 'comunas').mkdir(parents=True, exist_ok=True)
+
+    listado = {}
+    for n, (clave, comuna) in enumerate(indice['comunas'].items()):
+        listado[clave] = {'nombre': comuna['nombre'], 'archivo': n}
+        _escribir_json(directorio / 'comunas' / f'{n}.json', comuna)
+    construir_coordenadas(indice, directorio)
+    _escribir_json(directorio / 'comunas.json',
+                   {'actualizado': indice['actualizado'], 'total': indice['total'], 'comunas': listado})
+
+    tmp = ACTUAL_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(version, encoding='utf-8')
+    os.replace(tmp, ACTUAL_PATH)
+    _borrar_versiones_antiguas(version)
+
+def _borrar_versiones_antiguas(vigente):
+    versiones = sorted((d for d in DATA_DIR.iterdir() if d.is_dir() and d.name != vigente),
+                       key=lambda d: d.stat().st_mtime, reverse=True)
+    for directorio in versiones[VERSIONES_CONSERVADAS - 1:]:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+def actualizar():
+    """Descarga el dataset del Minsal y reemplaza la versión vigente de forma atómica."""
+    response = requests.get(API_URL, timeout=30)
+    response.raise_for_status()
+    indice = construir_indice(response.json())
+    guardar_indice(indice)
+    return indice
+
+def _version_actual():
+    """Directorio de la versión vigente. Sin datos no se descarga en línea: la fuente es lenta."""
+    try:
+        directorio = DATA_DIR / ACTUAL_PATH.read_text(encoding='utf-8').strip()
+        if directorio.is_dir():
+            return directorio
+    except OSError:
+        pass
+    raise LookupError("Todavía no hay datos de farmacias de turno; se están descargando en segundo plano. "
+                      "Intenta de nuevo en unos minutos.")
+
+def cargar_comunas(directorio):
+    """Listado liviano de la versión: {'actualizado', 'total', 'comunas': {clave: {'nombre', 'archivo'}}}."""
+    return json.loads((directorio / 'comunas.json').read_text(encoding='utf-8'))
+
+def cargar_comuna(directorio, archivo):
+    """Locales de una sola comuna: {'nombre', 'farmacias'}."""
+    return json.loads((directorio / 'comunas' / f'{archivo}.json').read_text(encoding='utf-8'))
+
+# --- Búsqueda por cercanía ---
+
+def _coordenada(valor):
+    try:
+        return float(str(valor).replace(',', '.'))
+    except (TypeError, ValueError):
+        return np.nan
+
+def construir_coordenadas(indice, directorio):
+    """Guarda lat/lng en radianes de todos los locales (NaN si no tienen), con su comuna y posición."""
+    lat, lng, archivo, posicion = [], [], [], []
+    for n, comuna in enumerate(indice['comunas'].values()):
+        for i, f in enumerate(comuna['farmacias']):
+            lat.append(_coordenada(f['lat']))
+            lng.append(_coordenada(f['lng']))
+            archivo.append(n)
+            posicion.append(i)
+    lat, lng = np.array(lat, dtype=np.float64), np.array(lng, dtype=np.float64)
+    # (0, 0) aparece en registros sin georreferenciar
+    invalidas = (lat == 0) & (lng == 0)
+    lat[invalidas] = lng[invalidas] = np.nan
+    lat, lng = np.radians(lat), np.radians(lng)
+    np.savez(directorio / 'coordenadas.npz', lat=lat, lng=lng, cos_lat=np.cos(lat),
+             archivo=np.array(archivo, dtype=np.int32), posicion=np.array(posicion, dtype=np.int32))
+
+def farmacias_cercanas(lat, lng, n=CERCANAS_DEFECTO):
+    try:
+        directorio = _version_actual()
+        with np.load(directorio / 'coordenadas.npz') as datos:
+            lat_r, lng_r, cos_lat = datos['lat'], datos['lng'], datos['cos_lat']
+            archivos, posiciones = datos['archivo'], datos['posicion']
+        lat0, lng0 = np.radians(lat), np.radians(lng)
+
+        # Haversine vectorizado sobre todos los locales
+        a = np.sin((lat_r - lat0) / 2) ** 2 + np.cos(lat0) * cos_lat * np.sin((lng_r - lng0) / 2) ** 2
+        distancias = 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        distancias = np.where(np.isnan(distancias), np.inf, distancias)
+
+        n = min(n, len(distancias))
+        if n == 0:
+            return {'success': False, 'message': 'No hay farmacias de turno con ubicación registrada.'}
+        cercanas = np.argpartition(distancias, n - 1)[:n]
+        cercanas = cercanas[np.argsort(distancias[cercanas])]
+        cercanas = [i for i in cercanas if np.isfinite(distancias[i])]
+        if not cercanas:
+            return {'success': False, 'message': 'No hay farmacias de turno con ubicación registrada.'}
+
+        # Solo se leen las comunas de los locales elegidos
+        comunas_leidas = {int(archivos[i]): None for i in cercanas}
+        for archivo in comunas_leidas:
+            comunas_leidas[archivo] = cargar_comuna(directorio, archivo)
+
+        farmacias = []
+        for i in cercanas:
+            comuna = comunas_leidas[int(archivos[i])]
+            farmacias.append({**comuna['farmacias'][int(posiciones[i])], 'comuna': comuna['nombre'],
+                              'distancia_km': round(float(distancias[i]), 2)})
+        return {'success': True, 'farmacias': farmacias}
+
+    except LookupError as e:
+        return {'success': False, 'message': e.args[0]}
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Error al buscar farmacias cercanas: {str(e)}'
+        }
+
 def buscar_farmacias(comuna_busqueda):
     try:
-        # 1. Obtener datos de la API oficial (mucho más rápido que scraping)
-        response = requests.get(API_URL, timeout=10)
-        response.raise_for_status()
-        farmacias = response.json()
-        
-        # 2. Normalizar término de búsqueda
-        busqueda_norm = unidecode(comuna_busqueda.lower().strip())
-        
-        resultados = []
-        
-        for f in farmacias:
-            # La API devuelve campos como 'comuna_nombre', 'local_nombre', etc.
-            comuna_api = unidecode(f.get('comuna_nombre', '').lower())
-            
-            if busqueda_norm in comuna_api:
-                resultados.append({
-                    'nombre': f.get('local_nombre', 'Farmacia'),
-                    'direccion': f.get('local_direccion', 'Sin dirección'),
-                    'telefono': f.get('local_telefono', ''),
-                    'horario': f"{f.get('funcionamiento_hora_apertura', '')} - {f.get('funcionamiento_hora_cierre', '')}",
-                    'lat': f.get('local_lat'),
-                    'lng': f.get('local_lng')
-                })
-        
-        if not resultados:
-             return {
+        directorio = _version_actual()
+        listado = cargar_comunas(directorio)['comunas']
+        busqueda_norm = normalizar(comuna_busqueda)
+
+        # Coincidencia exacta: un lookup. Si no, búsqueda aproximada por trigramas
+        # ("nunoa", "pte alto", "stgo centro").
+        indice_comunas = comunas.indice(c['nombre'] for c in listado.values())
+        if busqueda_norm in listado:
+            clave = busqueda_norm
+        else:
+            encontrada = indice_comunas.buscar(comuna_busqueda)
+            clave = normalizar(encontrada) if encontrada else None
+
+        if not clave:
+            sugerencias = indice_comunas.candidatos(comuna_busqueda, minimo=SIMILITUD_SUGERENCIA)
+            mensaje = f'No se encontraron farmacias de turno para la comuna "{comuna_busqueda}".'
+            if sugerencias:
+                mensaje += f" ¿Quisiste decir {', '.join(nombre for nombre, _ in sugerencias)}?"
+            return {
                 'success': False,
-                'message': f'No se encontraron farmacias de turno para la comuna "{comuna_busqueda}".'
+                'message': mensaje
             }
 
+        comuna = cargar_comuna(directorio, listado[clave]['archivo'])
         return {
             'success': True,
-            'comuna': comuna_busqueda,
-            'farmacias': resultados[:10] # Limitar a 10
+            'comuna': comuna['nombre'],
+            'farmacias': comuna['farmacias'][:MAX_RESULTADOS]
         }
 
+    except LookupError as e:
+        return {'success': False, 'message': e.args[0]}
     except Exception as e:
         return {
             'success': False,
@@ -62,13 +242,31 @@ def buscar_farmacias(comuna_busqueda):
         }
 
 if __name__ == '__main__':
+    # Configurar salida UTF-8
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     if len(sys.argv) < 2:
         print(json.dumps({
             'success': False,
             'message': 'Debes especificar una comuna.'
         }, ensure_ascii=False))
         sys.exit(1)
-    
+
+    if sys.argv[1] == 'actualizar':
+        try:
+            indice = actualizar()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps({'farmacias': indice['total'], 'comunas': len(indice['comunas'])}))
+        sys.exit(0)
+
+    if sys.argv[1] == 'cerca' and len(sys.argv) >= 4:
+        n = int(sys.argv[4]) if len(sys.argv) > 4 else CERCANAS_DEFECTO
+        resultado = farmacias_cercanas(float(sys.argv[2]), float(sys.argv[3]), n)
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        sys.exit(0)
+
     comuna = ' '.join(sys.argv[1:])
     resultado = buscar_farmacias(comuna)
     print(json.dumps(resultado, ensure_ascii=False, indent=2))
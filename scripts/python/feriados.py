@@ -1,23 +1,15 @@
-# feriados.py - Obtiene los 5 próximos feriados desde feriados.cl
+# feriados.py - Muestra los 5 próximos feriados de Chile
+# Los feriados se calculan localmente (feriados_cl.py); feriados.cl solo se
+# consulta con --verificar para detectar decretos que falten en los overrides.
 import sys
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
 from datetime import datetime
 import io
-import locale
+
+import feriados_cl
 
 # Configuración de la salida a UTF-8
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-# Configuración de locale para leer fechas en español
-try:
-    locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-except locale.Error:
-    try:
-        locale.setlocale(locale.LC_TIME, 'es_CL.UTF-8')
-    except locale.Error:
-        pass  # Ignorar si no se puede establecer el locale
-
 URL = "https://www.feriados.cl"
 
 # Mapeo de meses en español a números
@@ -27,124 +19,111 @@ MESES_MAP = {
     'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
 }
 
-def parse_fecha(fecha_texto):
+def parse_fecha(fecha_texto, anio):
     """
-    Convierte un texto de fecha como "lunes, 23 de septiembre" a datetime.
-    Automáticamente ajusta el año si la fecha ya pasó.
+    Convierte un texto de fecha como "lunes, 23 de septiembre" a date del año indicado.
     """
     try:
-        today = datetime.now()
         partes = fecha_texto.lower().split(', ')
-        
         if len(partes) != 2:
             return None
-        
-        dia_y_mes = partes[1].strip()
+
         # Extraer día y mes: "23 de septiembre"
-        componentes = dia_y_mes.split(' de ')
+        componentes = partes[1].strip().split(' de ')
         if len(componentes) != 2:
             return None
-        
-        dia = int(componentes[0])
-        mes_texto = componentes[1].strip()
-        
-        # Obtener el número del mes
-        mes = MESES_MAP.get(mes_texto.lower())
+
+        mes = MESES_MAP.get(componentes[1].strip())
         if mes is None:
             return None
-        
-        # Crear la fecha con el año actual
-        feriado_date = datetime(today.year, mes, dia)
-        
-        # Si la fecha ya pasó este año, intentar con el próximo año
-        if feriado_date.date() < today.date():
-            feriado_date = datetime(today.year + 1, mes, dia)
-        
-        return feriado_date
+        return datetime(anio, mes, int(componentes[0])).date()
     except (ValueError, IndexError):
         return None
 
-def obtener_proximos_feriados():
+def obtener_feriados_web():
     """
-    Navega a feriados.cl y extrae los próximos 5 feriados desde la tabla.
+    Descarga la tabla de feriados.cl con Playwright (solo para verificación).
+    Devuelve una lista de (fecha, nombre) del año en curso.
     """
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            # Establecer un timeout más generoso
-            page.goto(URL, wait_until='domcontentloaded', timeout=30000)
-            
-            # Esperamos a que aparezca la tabla
-            page.wait_for_selector('tbody tr', timeout=25000)
-            content = page.content()
-            browser.close()
-
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Seleccionamos el cuerpo de la tabla
-        tabla_body = soup.find('tbody')
-        if not tabla_body:
-            print("⚠️ No se encontró la tabla de feriados. Intenta más tarde.")
-            return
-
-        proximos_feriados = []
-        today = datetime.now()
-        
-        # Iteramos por cada fila (<tr>) de la tabla
-        for fila in tabla_body.find_all('tr'):
-            celdas = fila.find_all('td')
-            if len(celdas) < 2:
-                continue
-
-            # La fecha está en la primera celda, el nombre en la segunda
-            fecha_texto = celdas[0].text.strip()
-            nombre = celdas[1].text.strip()
-            
-            # Parsear la fecha
-            feriado_date = parse_fecha(fecha_texto)
-            
-            if feriado_date and feriado_date.date() >= today.date():
-                # Formateamos la fecha de manera legible
-                fecha_formateada = feriado_date.strftime('%d de %B').lower()
-                dia_semana = feriado_date.strftime('%A').capitalize()
-                
-                # Calcular días restantes
-                dias_restantes = (feriado_date.date() - today.date()).days
-                
-                if dias_restantes == 0:
-                    marcador = "🔴 Hoy"
-                elif dias_restantes == 1:
-                    marcador = "⏰ Mañana"
-                else:
-                    marcador = f"📅 En {dias_restantes} días"
-                
-                proximos_feriados.append({
-                    'fecha': feriado_date,
-                    'nombre': nombre,
-                    'dia_semana': dia_semana,
-                    'fecha_text': fecha_formateada,
-                    'dias_restantes': dias_restantes,
-                    'marcador': marcador
-                })
-        
-        # Ordenar por fecha y obtener los 5 próximos
-        proximos_feriados.sort(key=lambda x: x['fecha'])
-        proximos_feriados = proximos_feriados[:5]
-        
-        if len(proximos_feriados) > 0:
-            print('🥳 *Próximos feriados en Chile:*\n')
-            for i, feriado in enumerate(proximos_feriados, 1):
-                output = f"{i}. *{feriado['nombre']}*\n"
-                output += f"   {feriado['dia_semana'].capitalize()}, {feriado['fecha_text']}\n"
-                output += f"   {feriado['marcador']}"
-                print(output)
-        else:
-            print('🎉 Ucha, parece que no quedan feriados este año. ¡Que descanses!')
+    from playwright.sync_api import sync_playwright
+    from bs4 import BeautifulSoup
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(URL, wait_until='domcontentloaded', timeout=30000)
+        page.wait_for_selector('tbody tr', timeout=25000)
+        content = page.content()
+        browser.close()
+
+    tabla_body = BeautifulSoup(content, 'html.parser').find('tbody')
+    if not tabla_body:
+        return []
 
+    anio = datetime.now(feriados_cl.ZONA_HORARIA_CHILE).year
+    feriados = []
+    for fila in tabla_body.find_all('tr'):
+        celdas = fila.find_all('td')
+        if len(celdas) < 2:
+            continue
+        fecha = parse_fecha(celdas[0].text.strip(), anio)
+        if fecha:
+            feriados.append((fecha, celdas[1].text.strip()))
+    return feriados
+
+def verificar_contra_web():
+    """Compara el cálculo local con feriados.cl e informa las diferencias."""
+    try:
+        web = obtener_feriados_web()
     except Exception as e:
         print(f"⚠️ Error al obtener los feriados: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if not web:
+        print("⚠️ No se encontró la tabla de feriados. Intenta más tarde.")
+        return
+
+    anio = web[0][0].year
+    locales = {f['fecha'] for f in feriados_cl.feriados_del_anio(anio)}
+    remotas = {fecha for fecha, _ in web}
+
+    faltantes = sorted((f, n) for f, n in web if f not in locales)
+    sobrantes = sorted(locales - remotas)
+    if not faltantes and not sobrantes:
+        print(f"✅ El calendario local coincide con feriados.cl para {anio}.")
+        return
+    for fecha, nombre in faltantes:
+        print(f"➕ Falta en el cálculo local: {fecha.isoformat()} {nombre}")
+    for fecha in sobrantes:
+        print(f"➖ No aparece en feriados.cl: {fecha.isoformat()}")
+
+def obtener_proximos_feriados():
+    """Imprime los próximos 5 feriados calculados localmente."""
+    hoy = datetime.now(feriados_cl.ZONA_HORARIA_CHILE).date()
+    proximos_feriados = feriados_cl.proximos_feriados(hoy, 5)
+
+    if len(proximos_feriados) > 0:
+        print('🥳 *Próximos feriados en Chile:*\n')
+        for i, feriado in enumerate(proximos_feriados, 1):
+            dias_restantes = (feriado['fecha'] - hoy).days
+            if dias_restantes == 0:
+                marcador = "🔴 Hoy"
+            elif dias_restantes == 1:
+                marcador = "⏰ Mañana"
+            else:
+                marcador = f"📅 En {dias_restantes} días"
+
+            output = f"{i}. *{feriado['nombre']}*"
+            if feriado['irrenunciable']:
+                output += " _(Irrenunciable)_"
+            output += f"\n   {feriados_cl.formatear_fecha(feriado['fecha'])}\n"
+            output += f"   {marcador}"
+            print(output)
+    else:
+        print('🎉 Ucha, parece que no quedan feriados este año. ¡Que descanses!')
 
 if __name__ == "__main__":
-    obtener_proximos_feriados()
\ No newline at end of file
+    if '--verificar' in sys.argv:
+        verificar_contra_web()
+    else:
+        obtener_proximos_feriados()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Calendario de feriados de Chile calculado localmente a partir de las reglas legales.
+
+Incluye los feriados fijos, los que dependen de Semana Santa, los trasladables
+(Ley 19.668), el 31 de octubre (Ley 20.299), los que solo existen según el día
+de la semana (2 de enero, 17 y 20 de septiembre) y el Día de los Pueblos
+Indígenas, que cae en el solsticio de invierno (Ley 21.357).
+Los feriados puntuales por decreto (elecciones, censos, etc.) se agregan o
+quitan desde src/data/feriados_overrides.json.
+"""
+import json
+import math
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+OVERRIDES_PATH = PROJECT_ROOT / 'src' / 'data' / 'feriados_overrides.json'
+
+ZONA_HORARIA_CHILE = ZoneInfo('America/Santiago')
+
+LUNES, MARTES, MIERCOLES, JUEVES, VIERNES, SABADO, DOMINGO = range(7)
+
+DIAS_SEMANA = {0: "Lunes", 1: "Martes", 2: "Miércoles", 3: "Jueves", 4: "Viernes", 5: "Sábado", 6: "Domingo"}
+MESES = {1: "enero", 2: "febrero", 3: "marzo", 4: "abril", 5: "mayo", 6: "junio", 7: "julio",
+         8: "agosto", 9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"}
+
+
+def domingo_de_pascua(anio):
+    """Domingo de Pascua (algoritmo gregoriano anónimo / Meeus-Jones-Butcher)."""
+    a = anio % 19
+    b, c = divmod(anio, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(anio, mes, dia + 1)
+
+
+# Términos periódicos de Meeus (Astronomical Algorithms, cap. 27)
+_SOLSTICIO_A = (485, 203, 199, 182, 156, 136, 77, 74, 70, 58, 52, 50,
+                45, 44, 29, 18, 17, 16, 14, 12, 12, 12, 9, 8)
+_SOLSTICIO_B = (324.96, 337.23, 342.08, 27.85, 73.14, 171.52, 222.54, 296.72, 243.58, 119.81, 297.17, 21.02,
+                247.54, 325.15, 60.93, 155.12, 288.79, 198.04, 199.76, 95.39, 287.11, 320.81, 227.73, 15.45)
+_SOLSTICIO_C = (1934.136, 32964.467, 20.186, 445267.112, 45036.886, 22518.443, 65928.934, 3034.906,
+                9037.513, 33718.147, 150.678, 2281.226, 29929.562, 31555.956, 4443.417, 67555.328,
+                4562.452, 62894.029, 31436.921, 14577.848, 31931.756, 34777.259, 1222.114, 16859.074)
+
+
+def solsticio_de_invierno(anio):
+    """Fecha (hora de Chile) del solsticio de junio, con precisión de minutos."""
+    y = (anio - 2000) / 1000
+    jde0 = 2451716.56767 + 365241.62603 * y + 0.00325 * y ** 2 + 0.00888 * y ** 3 - 0.00030 * y ** 4
+    t = (jde0 - 2451545.0) / 36525
+    w = math.radians(35999.373 * t - 2.47)
+    delta_lambda = 1 + 0.0334 * math.cos(w) + 0.0007 * math.cos(2 * w)
+    s = sum(a * math.cos(math.radians(b + c * t)) for a, b, c in zip(_SOLSTICIO_A, _SOLSTICIO_B, _SOLSTICIO_C))
+    jde = jde0 + 0.00001 * s / delta_lambda
+    # La diferencia TT-UTC (~1 minuto) es despreciable para obtener el día
+    instante = datetime(2000, 1, 1, 12, tzinfo=timezone.utc) + timedelta(days=jde - 2451545.0)
+    return instante.astimezone(ZONA_HORARIA_CHILE).date()
+
+
+def _trasladar_a_lunes(fecha):
+    """Ley 19.668: martes-jueves al lunes anterior; viernes al lunes siguiente."""
+    dia = fecha.weekday()
+    if dia in (MARTES, MIERCOLES, JUEVES):
+        return fecha - timedelta(days=dia)
+    if dia == VIERNES:
+        return fecha + timedelta(days=3)
+    return fecha
+
+
+def _dia_iglesias_evangelicas(anio):
+    """Ley 20.299: si el 31/10 es martes pasa al viernes anterior; si es miércoles, al viernes siguiente."""
+    fecha = date(anio, 10, 31)
+    if fecha.weekday() == MARTES:
+        return fecha - timedelta(days=4)
+    if fecha.weekday() == MIERCOLES:
+        return fecha + timedelta(days=2)
+    return fecha
+
+
+def _feriado(fecha, nombre, tipo='Civil', irrenunciable=False):
+    return {'fecha': fecha, 'nombre': nombre, 'tipo': tipo, 'irrenunciable': irrenunciable}
+
+
+def _feriados_legales(anio):
+    pascua = domingo_de_pascua(anio)
+    feriados = [
+        _feriado(date(anio, 1, 1), "Año Nuevo", irrenunciable=True),
+        _feriado(pascua - timedelta(days=2), "Viernes Santo", 'Religioso'),
+        _feriado(pascua - timedelta(days=1), "Sábado Santo", 'Religioso'),
+        _feriado(date(anio, 5, 1), "Día Nacional del Trabajo", irrenunciable=True),
+        _feriado(date(anio, 5, 21), "Día de las Glorias Navales"),
+        _feriado(_trasladar_a_lunes(date(anio, 6, 29)), "San Pedro y San Pablo", 'Religioso'),
+        _feriado(date(anio, 7, 16), "Día de la Virgen del Carmen", 'Religioso'),
+        _feriado(date(anio, 8, 15), "Asunción de la Virgen", 'Religioso'),
+        _feriado(date(anio, 9, 18), "Independencia Nacional", irrenunciable=True),
+        _feriado(date(anio, 9, 19), "Día de las Glorias del Ejército", irrenunciable=True),
+        _feriado(_trasladar_a_lunes(date(anio, 10, 12)), "Encuentro de Dos Mundos"),
+        _feriado(date(anio, 11, 1), "Día de Todos los Santos", 'Religioso'),
+        _feriado(date(anio, 12, 8), "Inmaculada Concepción", 'Religioso'),
+        _feriado(date(anio, 12, 25), "Navidad", 'Religioso', irrenunciable=True),
+    ]
+    if anio >= 2008:
+        feriados.append(_feriado(_dia_iglesias_evangelicas(anio), "Día de las Iglesias Evangélicas y Protestantes", 'Religioso'))
+    if anio >= 2017 and date(anio, 1, 2).weekday() == LUNES:
+        feriados.append(_feriado(date(anio, 1, 2), "Feriado adicional de Año Nuevo"))
+    # Ley 20.215 (2007): el 17 si cae lunes y el 20 si cae viernes
+    if anio >= 2007 and date(anio, 9, 17).weekday() == LUNES:
+        feriados.append(_feriado(date(anio, 9, 17), "Feriado adicional de Fiestas Patrias"))
+    if anio >= 2007 and date(anio, 9, 20).weekday() == VIERNES:
+        feriados.append(_feriado(date(anio, 9, 20), "Feriado adicional de Fiestas Patrias"))
+    if anio >= 2021:
+        feriados.append(_feriado(solsticio_de_invierno(anio), "Día Nacional de los Pueblos Indígenas"))
+    return feriados
+
+
+@lru_cache(maxsize=1)
+def _leer_overrides():
+    try:
+        return json.loads(OVERRIDES_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+@lru_cache(maxsize=32)
+def _feriados_anio(anio):
+    overrides = _leer_overrides()
+    quitar = {date.fromisoformat(f) for f in overrides.get('quitar', [])}
+    feriados = [f for f in _feriados_legales(anio) if f['fecha'] not in quitar]
+    for extra in overrides.get('agregar', []):
+        fecha = date.fromisoformat(extra['fecha'])
+        if fecha.year == anio:
+            feriados.append(_feriado(fecha, extra['nombre'], extra.get('tipo', 'Civil'), extra.get('irrenunciable', False)))
+    feriados.sort(key=lambda f: f['fecha'])
+    return tuple(feriados)
+
+
+def feriados_del_anio(anio):
+    """Lista de feriados del año, ordenada por fecha (copias de los dicts cacheados)."""
+    return [dict(f) for f in _feriados_anio(anio)]
+
+
+def es_feriado(fecha):
+    return any(f['fecha'] == fecha for f in _feriados_anio(fecha.year))
+
+
+def proximos_feriados(desde=None, cantidad=5):
+    """Los próximos `cantidad` feriados desde `desde` (incluido)."""
+    desde = desde or datetime.now(ZONA_HORARIA_CHILE).date()
+    resultado = []
+    anio = desde.year
+    while len(resultado) < cantidad:
+        resultado.extend(f for f in feriados_del_anio(anio) if f['fecha'] >= desde)
+        anio += 1
+    return resultado[:cantidad]
+
+
+def formatear_fecha(fecha):
+    """Formatea en español sin depender de locale: 'Jueves, 18 de septiembre'."""
+    return f"{DIAS_SEMANA[fecha.weekday()]}, {fecha.day} de {MESES[fecha.month]}"
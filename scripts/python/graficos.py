@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Gráficos de línea y sparklines para indicadores (valores.py / indicadores_hist.py)
+e índices bursátiles (bolsa.py), dibujados con PIL y entregados en memoria.
+
+Las imágenes se cachean por (serie, rango, versión de datos): en memoria dentro
+del proceso y en disco (temp/graficos, con tope de MAX_CACHE_DISCO archivos)
+entre ejecuciones, así que una misma consulta en el día no vuelve a
+dibujarse. Las fuentes y el fondo con la grilla se crean una sola vez por
+tamaño.
+
+La serie puede ser un indicador (uf, dolar, euro, utm, ipc) o un índice
+bursátil con histórico en bolsa.py (ipsa, igpa, dow, sp500, ...).
+
+Uso:
+    python graficos.py <serie> <dias> [--sparkline] [--raw]
+Por defecto imprime el PNG en base64; con --raw escribe los bytes en stdout.
+"""
+import sys
+import io
+import os
+import base64
+import hashlib
+from collections import OrderedDict
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+CACHE_DIR = PROJECT_ROOT / 'temp' / 'graficos'
+MAX_CACHE_MEMORIA = 64
+MAX_CACHE_DISCO = 500   # PNGs en temp/graficos; al pasarse se borran los menos usados
+
+# --- Estilo ---
+COLOR_FONDO = (24, 26, 32)
+COLOR_GRILLA = (52, 56, 66)
+COLOR_TEXTO = (230, 230, 230)
+COLOR_SUBE = (46, 204, 113)
+COLOR_BAJA = (231, 76, 60)
+TAMANO_LINEA = (900, 450)
+TAMANO_SPARKLINE = (300, 80)
+MARGEN = {'izq': 80, 'der': 24, 'arr': 56, 'aba': 40}
+FUENTES_SISTEMA = ("DejaVuSans.ttf", "arial.ttf", "C:/Windows/Fonts/arial.ttf")
+
+_cache_memoria = OrderedDict()
+
+
+@lru_cache(maxsize=8)
+def obtener_fuente(tamano):
+    """Carga la fuente una sola vez por tamaño."""
+    for ruta in FUENTES_SISTEMA:
+        try:
+            return ImageFont.truetype(ruta, tamano)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4)
+def _fondo(ancho, alto, con_grilla):
+    """Fondo pre-renderizado (con grilla para el gráfico completo)."""
+    img = Image.new("RGB", (ancho, alto), COLOR_FONDO)
+    if con_grilla:
+        draw = ImageDraw.Draw(img)
+        alto_util = alto - MARGEN['arr'] - MARGEN['aba']
+        for i in range(5):
+            y = MARGEN['arr'] + alto_util * i / 4
+            draw.line([(MARGEN['izq'], y), (ancho - MARGEN['der'], y)], fill=COLOR_GRILLA, width=1)
+    return img
+
+
+def _puntos(valores, caja):
+    """Escala los valores a coordenadas de la caja (x0, y0, x1, y1)."""
+    x0, y0, x1, y1 = caja
+    minimo, maximo = min(valores), max(valores)
+    amplitud = (maximo - minimo) or 1.0
+    paso = (x1 - x0) / max(len(valores) - 1, 1)
+    return [(x0 + i * paso, y1 - (v - minimo) / amplitud * (y1 - y0)) for i, v in enumerate(valores)]
+
+
+def _formatear(valor):
+    return "{:,.2f}".format(valor).replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def dibujar_linea(titulo, valores, etiquetas=None):
+    """Gráfico completo con título, eje Y y fechas de inicio/fin. Devuelve PNG en bytes."""
+    ancho, alto = TAMANO_LINEA
+    img = _fondo(ancho, alto, True).copy()
+    draw = ImageDraw.Draw(img)
+    color = COLOR_SUBE if valores[-1] >= valores[0] else COLOR_BAJA
+
+    caja = (MARGEN['izq'], MARGEN['arr'], ancho - MARGEN['der'], alto - MARGEN['aba'])
+    draw.line(_puntos(valores, caja), fill=color, width=3, joint="curve")
+
+    fuente_titulo, fuente = obtener_fuente(24), obtener_fuente(14)
+    variacion = (valores[-1] - valores[0]) / valores[0] * 100 if valores[0] else 0.0
+    draw.text((MARGEN['izq'], 14), f"{titulo}  {_formatear(valores[-1])} ({variacion:+.2f}%)",
+              font=fuente_titulo, fill=COLOR_TEXTO)
+
+    minimo, maximo = min(valores), max(valores)
+    alto_util = caja[3] - caja[1]
+    for i in range(5):
+        valor = maximo - (maximo - minimo) * i / 4
+        draw.text((8, caja[1] + alto_util * i / 4 - 8), _formatear(valor), font=fuente, fill=COLOR_TEXTO)
+
+    if etiquetas:
+        draw.text((caja[0], caja[3] + 10), etiquetas[0], font=fuente, fill=COLOR_TEXTO)
+        fin = etiquetas[-1]
+        draw.text((caja[2] - draw.textlength(fin, font=fuente), caja[3] + 10), fin, font=fuente, fill=COLOR_TEXTO)
+
+    return _a_png(img)
+
+
+def dibujar_sparkline(valores):
+    """Sparkline compacta sin ejes. Devuelve PNG en bytes."""
+    ancho, alto = TAMANO_SPARKLINE
+    img = _fondo(ancho, alto, False).copy()
+    draw = ImageDraw.Draw(img)
+    color = COLOR_SUBE if valores[-1] >= valores[0] else COLOR_BAJA
+    puntos = _puntos(valores, (4, 6, ancho - 8, alto - 6))
+    draw.line(puntos, fill=color, width=2)
+    x, y = puntos[-1]
+    draw.ellipse([x - 3, y - 3, x + 3, y + 3], fill=color)
+    return _a_png(img)
+
+
+def _a_png(img):
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG", optimize=False)
+    return buffer.getvalue()
+
+
+# --- Caché ---
+
+def _clave(serie, rango, version, tipo):
+    return hashlib.sha1(f"{serie}|{rango}|{version}|{tipo}".encode('utf-8')).hexdigest()
+
+
+def podar_cache(directorio, maximo):
+    """Deja a lo más `maximo` PNGs en el directorio, borrando los de uso más antiguo."""
+    try:
+        archivos = [(e.stat().st_mtime, e.path) for e in os.scandir(directorio)
+                    if e.name.endswith('.png')]
+    except OSError:
+        return
+    if len(archivos) <= maximo:
+        return
+    archivos.sort()
+    for _, ruta in archivos[:len(archivos) - maximo]:
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+def obtener_grafico(serie, rango, version, generar, tipo='linea', directorio=CACHE_DIR, maximo=MAX_CACHE_DISCO):
+    """
+    Devuelve el PNG cacheado para (serie, rango, versión) o lo genera llamando
+    a `generar()` y lo guarda en memoria y en disco. El caché en disco es LRU:
+    cada acierto actualiza la fecha del archivo y al escribir uno nuevo se
+    podan los más antiguos por sobre `maximo`.
+    """
+    clave = _clave(serie, rango, version, tipo)
+    if clave in _cache_memoria:
+        _cache_memoria.move_to_end(clave)
+        return _cache_memoria[clave]
+
+    ruta = directorio / f"{clave}.png"
+    try:
+        datos = ruta.read_bytes()
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+    except OSError:
+        datos = generar()
+        try:
+            directorio.mkdir(parents=True, exist_ok=True)
+            tmp = ruta.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_bytes(datos)
+            os.replace(tmp, ruta)
+            podar_cache(directorio, maximo)
+        except OSError:
+            pass
+
+    _cache_memoria[clave] = datos
+    if len(_cache_memoria) > MAX_CACHE_MEMORIA:
+        _cache_memoria.popitem(last=False)
+    return datos
+
+
+def grafico_serie(valores, titulo, serie, rango, version=None, sparkline=False, etiquetas=None):
+    """
+    Punto de entrada genérico (lo usan los índices de bolsa.py). Si no se indica
+    versión, se usa un hash de los valores para invalidar el caché al cambiar.
+    """
+    valores = [float(v) for v in valores]
+    if len(valores) < 2:
+        raise ValueError("Se necesitan al menos dos puntos para graficar.")
+    if version is None:
+        version = hashlib.sha1(repr(valores).encode('utf-8')).hexdigest()[:12]
+    tipo = 'sparkline' if sparkline else 'linea'
+    generar = (lambda: dibujar_sparkline(valores)) if sparkline else (lambda: dibujar_linea(titulo, valores, etiquetas))
+    return obtener_grafico(serie, rango, version, generar, tipo)
+
+
+def grafico_indicador(serie, dias, sparkline=False):
+    """Gráfico de un indicador del histórico local; la versión viene de sus metadatos."""
+    import indicadores_hist
+
+    datos = indicadores_hist.cargar_serie(serie)
+    hasta = min(date.today(), datos.fin)
+    desde = hasta - timedelta(days=dias)
+    tipo = 'sparkline' if sparkline else 'linea'
+
+    def generar():
+        valores = [v for v in datos.rellenado(desde, hasta).tolist() if v == v]
+        if len(valores) < 2:
+            raise ValueError(f"No hay datos suficientes de {serie} en los últimos {dias} días.")
+        if sparkline:
+            return dibujar_sparkline(valores)
+        titulo = indicadores_hist.SERIES[datos.serie]['nombre']
+        return dibujar_linea(titulo, valores, [desde.strftime('%d-%m-%Y'), hasta.strftime('%d-%m-%Y')])
+
+    # El rango incluye la fecha final para que el caché caduque con el día
+    return obtener_grafico(datos.serie, f"{dias}@{hasta.isoformat()}", datos.version, generar, tipo)
+
+
+def grafico_indice(nombre, dias, sparkline=False):
+    """Gráfico de un índice bursátil con el histórico diario que guarda bolsa.py."""
+    import bolsa
+
+    clave, puntos = bolsa.serie_historica(nombre, dias)
+    if len(puntos) < 2:
+        raise ValueError(f"Todavía no hay suficiente histórico de {clave} (se guarda un valor por día).")
+    desde, hasta = (date.fromisoformat(puntos[i][0]).strftime('%d-%m-%Y') for i in (0, -1))
+    return grafico_serie([valor for _, valor in puntos], f"Índice {clave}", f"bolsa:{clave}",
+                         f"{dias}@{puntos[-1][0]}", sparkline=sparkline, etiquetas=[desde, hasta])
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args:
+        print("Uso: python graficos.py <serie> <dias> [--sparkline] [--raw]", file=sys.stderr)
+        sys.exit(1)
+    try:
+        import indicadores_hist
+
+        graficar = grafico_indicador if args[0].lower() in indicadores_hist.SERIES else grafico_indice
+        png = graficar(args[0], int(args[1]) if len(args) > 1 else 30,
+                       sparkline='--sparkline' in sys.argv)
+    except (LookupError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if '--raw' in sys.argv:
+        sys.stdout.buffer.write(png)
+    else:
+        sys.stdout.write(base64.b64encode(png).decode('ascii'))
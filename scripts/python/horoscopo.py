@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
 import requests
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+from bs4 import UnicodeDammit
 import sys
 from unidecode import unidecode
 import io
 import os
+import json
+import re
+import time
+
+import snapshot_diario
 
 # Forzar la salida a UTF-8 para evitar UnicodeEncodeError en Windows
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -20,6 +26,17 @@ emojis_signos = {
     "capricornio": "♑️", "acuario": "♒️", "piscis": "♓️"
 }
 
+URL = "https://www.pudahuel.cl/horoscopo/"
+
+# Etiquetas de los datos de cada signo (un único patrón precompilado)
+ETIQUETAS = re.compile(r"(PALABRA|N[ÚU]MERO|COLOR):")
+CAMPOS_ETIQUETA = {"PALABRA": "palabra", "NÚMERO": "numero", "NUMERO": "numero", "COLOR": "color"}
+SIGNO_DE = re.compile(r"Signo de.*", re.S)
+# Elementos HTML sin etiqueta de cierre (no abren nivel en la pila)
+VACIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+          "meta", "param", "source", "track", "wbr"}
+FUENTE_SNAPSHOT = "horoscopo"
+
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 }
@@ -34,90 +51,136 @@ def obtener_ruta_imagen(signo):
         return os.path.abspath(imagen_path)
     return "no_image"
 
+def scrapear_signos():
+    """
+    Descarga la página y extrae todos los signos.
+    Devuelve {signo: datos}; lanza requests.RequestException si falla la conexión.
+    """
+    response = requests.get(URL, headers=HEADERS, timeout=10)
+    response.raise_for_status()
+    return parsear_signos(response.content)
+
+def extraer_campos(texto):
+    """
+    Separa el texto de un signo en descripción, palabra, número y color
+    con una sola pasada del patrón de etiquetas.
+    """
+    partes = ETIQUETAS.split(texto)
+    campos = {"descripcion": partes[0], "palabra": "No disponible", "numero": "No disponible", "color": "No disponible"}
+    # split deja [descripción, etiqueta, valor, etiqueta, valor, ...]
+    for etiqueta, valor in zip(partes[1::2], partes[2::2]):
+        campos[CAMPOS_ETIQUETA[etiqueta]] = valor
+
+    for campo, valor in campos.items():
+        # Limpiar la parte de "Signo de..." que viene pegada al final
+        campos[campo] = SIGNO_DE.sub("", valor).strip()
+    return campos
+
+class _Secciones(HTMLParser):
+    """
+    Recorre el HTML una sola vez, sin construir árbol, y junta por signo el
+    texto de los <p> hermanos de su <h2>: una sección termina en el siguiente
+    h2 del mismo contenedor o al cerrarse el contenedor, igual que el
+    recorrido por hermanos del parser original. Así un pie de página o un
+    bloque anidado no se mezclan con el último signo.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pila = []          # ids de los elementos abiertos
+        self.nombres = []       # etiqueta de cada elemento abierto
+        self.siguiente_id = 0
+        self.parrafos = {}
+        self.seccion = None     # (signo, id del contenedor)
+        self.texto = None       # texto del h2 o p que se está leyendo
+        self.nivel_texto = None
+        self.padre_texto = None
+
+    def _contenedor(self):
+        return self.pila[-1] if self.pila else None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VACIOS:
+            return
+        if self.texto is None and tag in ("h2", "p"):
+            self.texto, self.nivel_texto = [], len(self.pila)
+            self.padre_texto = self._contenedor()
+        self.siguiente_id += 1
+        self.pila.append(self.siguiente_id)
+        self.nombres.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if tag not in self.nombres:
+            return
+        while self.nombres:
+            cerrada, id_cerrado = self.nombres.pop(), self.pila.pop()
+            if self.texto is not None and len(self.pila) == self.nivel_texto:
+                self._cerrar_texto(cerrada)
+            if self.seccion and id_cerrado == self.seccion[1]:
+                # Se cerró el contenedor del signo: fin de la sección
+                self.seccion = None
+            if cerrada == tag:
+                break
+
+    def handle_data(self, data):
+        if self.texto is not None:
+            self.texto.append(data)
+
+    def _cerrar_texto(self, etiqueta):
+        texto, padre = "".join(self.texto).strip(), self.padre_texto
+        self.texto = self.nivel_texto = None
+        if etiqueta == "h2":
+            nombre = unidecode(texto.lower())
+            if nombre in emojis_signos:
+                self.seccion = (nombre, padre)
+                self.parrafos[nombre] = []
+            elif self.seccion and padre == self.seccion[1]:
+                # Un h2 que no es signo corta la sección solo si es su hermano
+                self.seccion = None
+        elif self.seccion and padre == self.seccion[1]:
+            self.parrafos[self.seccion[0]].append(texto)
+
+
+def parsear_signos(html):
+    """
+    Extrae los datos de todos los signos del HTML de la página con una sola
+    pasada del tokenizador (ver _Secciones).
+    """
+    if isinstance(html, bytes):
+        html = UnicodeDammit(html, ["utf-8"]).unicode_markup
+    lector = _Secciones()
+    lector.feed(html)
+    lector.close()
+
+    datos_signos = {}
+    for signo, textos in lector.parrafos.items():
+        datos_signos[signo] = extraer_campos(" ".join(textos))
+        datos_signos[signo]["imagen"] = obtener_ruta_imagen(signo)
+    return datos_signos
+
+def perfilar(rutas, repeticiones=50):
+    """Mide el tiempo de parseo sobre páginas guardadas en disco."""
+    for ruta in rutas:
+        with open(ruta, "rb") as f:
+            html = f.read()
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            signos = parsear_signos(html)
+        ms = (time.perf_counter() - inicio) / repeticiones * 1000
+        print(f"{os.path.basename(ruta)}: {len(html) / 1024:.0f} KB, {len(signos)} signos, {ms:.2f} ms por parseo")
+
+def obtener_todos():
+    """Snapshot del día con todos los signos (una sola descarga por día)."""
+    return snapshot_diario.obtener(FUENTE_SNAPSHOT, scrapear_signos)
+
 def obtener_horoscopo(signo_buscar):
-    url = "https://www.pudahuel.cl/horoscopo/"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
+        datos_signos = obtener_todos()
     except requests.RequestException as e:
         return f"Error al conectar con la página de horóscopo: {e}"
-    
-    try:
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        # Buscar todos los h2 que contienen los nombres de los signos
-        signos_h2 = soup.find_all("h2")
-        datos_signos = {}
-        
-        for h2 in signos_h2:
-            nombre_signo = h2.text.strip()
-            
-            # Saltar si no es un signo válido
-            nombre_normalizado = unidecode(nombre_signo.lower())
-            if nombre_normalizado not in emojis_signos:
-                continue
-            
-            descripcion = ""
-            palabra_clave = "No disponible"
-            numero = "No disponible"
-            color = "No disponible"
-            imagen_url = obtener_ruta_imagen(nombre_normalizado)
-            
-            # Recopilar párrafos hasta encontrar los datos o cambiar de sección
-            elementos = []
-            actual = h2.find_next()
-            
-            while actual:
-                if actual.name == "h2":
-                    # Hemos llegado a otro signo, detener
-                    break
-                elif actual.name == "p":
-                    elementos.append(actual.text.strip())
-                
-                actual = actual.find_next_sibling()
-            
-            # Procesar los elementos recopilados
-            texto_completo = " ".join(elementos)
-            
-            # El primer elemento es la descripción (antes de PALABRA:)
-            if "PALABRA:" in texto_completo:
-                descripcion = texto_completo.split("PALABRA:")[0].strip()
-                resto = texto_completo.split("PALABRA:")[1]
-                
-                # Extraer palabra clave
-                if "NÚMERO:" in resto:
-                    palabra_clave = resto.split("NÚMERO:")[0].strip()
-                    resto = resto.split("NÚMERO:")[1]
-                else:
-                    palabra_clave = resto.split("COLOR:")[0].strip()
-                    resto = resto.split("COLOR:")[1]
-                
-                # Extraer número
-                if "COLOR:" in resto:
-                    numero = resto.split("COLOR:")[0].strip()
-                    color_texto = resto.split("COLOR:")[1].strip()
-                    # Limpiar la parte de "Signo de..." del color
-                    if "Signo de" in color_texto:
-                        color = color_texto.split("Signo de")[0].strip()
-                    else:
-                        color = color_texto
-                else:
-                    numero = resto.strip()
-            else:
-                descripcion = texto_completo
-            
-            # Limpiar descripciones que contengan información extra
-            if "Signo de" in descripcion:
-                descripcion = descripcion.split("Signo de")[0].strip()
-            
-            datos_signos[nombre_normalizado] = {
-                "descripcion": descripcion,
-                "palabra": palabra_clave,
-                "numero": numero,
-                "color": color,
-                "imagen": imagen_url
-            }
-
     except Exception as e:
         return f"Error al procesar los datos de la página: {e}"
 
@@ -128,7 +191,17 @@ def obtener_horoscopo(signo_buscar):
         return "Signo no encontrado."
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
+    if '--perfil' in sys.argv:
+        # Ej: python horoscopo.py --perfil muestras/horoscopo_simple.html muestras/horoscopo_portal.html muestras/horoscopo_pie.html
+        perfilar([a for a in sys.argv[1:] if a != '--perfil'])
+    elif '--todos' in sys.argv:
+        # Modo batch: todos los signos del día en un solo JSON
+        try:
+            print(json.dumps(obtener_todos(), ensure_ascii=False))
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif len(sys.argv) != 2:
         print("Uso: python horoscopo.py <signo>")
     else:
         signo = sys.argv[1]
@@ -5,6 +5,9 @@ from bs4 import BeautifulSoup
 from unidecode import unidecode
 import io
 import os
+import json
+
+import snapshot_diario
 
 # Forzar la salida a UTF-8
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -19,6 +22,9 @@ emojis_signos_chinos = {
     "gallo": "🐓", "perro": "🐕", "cerdo": "🐖"
 }
 
+URL = "https://www.elhoroscopochino.com.ar/horoscopo-chino-de-hoy"
+FUENTE_SNAPSHOT = "horoscopo_chino"
+
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 }
@@ -29,42 +35,51 @@ def obtener_ruta_imagen(signo):
         return os.path.abspath(imagen_path)
     return "no_image"
 
-def obtener_horoscopo_chino(signo_buscar):
-    url = "https://www.elhoroscopochino.com.ar/horoscopo-chino-de-hoy"
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        datos_signos = {}
+def scrapear_signos():
+    """Descarga la página y devuelve {signo: datos} con los doce signos."""
+    response = requests.get(URL, headers=HEADERS, timeout=10)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.content, "html.parser")
+    
+    datos_signos = {}
+    
+    # Buscar todos los divs que contienen "card-body" en su clase
+    # No usar class_="card-body" exacto ya que tiene más clases
+    card_divs = soup.find_all("div", class_=lambda x: x and "card-body" in x)
+    
+    for card in card_divs:
+        # Buscar el h2 dentro del card
+        h2_tag = card.find("h2")
+        if not h2_tag:
+            continue
         
-        # Buscar todos los divs que contienen "card-body" en su clase
-        # No usar class_="card-body" exacto ya que tiene más clases
-        card_divs = soup.find_all("div", class_=lambda x: x and "card-body" in x)
+        texto_h2 = h2_tag.get_text(strip=True).upper()
         
-        for card in card_divs:
-            # Buscar el h2 dentro del card
-            h2_tag = card.find("h2")
-            if not h2_tag:
-                continue
-            
-            texto_h2 = h2_tag.get_text(strip=True).upper()
-            
-            # Buscar cuál signo es
-            for signo, emoji in emojis_signos_chinos.items():
-                if signo.upper() in texto_h2 and 'HOY' in texto_h2:
-                    # Buscar el párrafo con la descripción
-                    p_tag = card.find("p", class_=lambda x: x and "mb-3" in x if x else False)
+        # Buscar cuál signo es
+        for signo, emoji in emojis_signos_chinos.items():
+            if signo.upper() in texto_h2 and 'HOY' in texto_h2:
+                # Buscar el párrafo con la descripción
+                p_tag = card.find("p", class_=lambda x: x and "mb-3" in x if x else False)
+                
+                if p_tag:
+                    descripcion = p_tag.get_text(strip=True)
                     
-                    if p_tag:
-                        descripcion = p_tag.get_text(strip=True)
-                        
-                        datos_signos[signo] = {
-                            "nombre_original": signo.capitalize(),
-                            "descripcion": descripcion,
-                            "imagen": obtener_ruta_imagen(signo)
-                        }
-                    break
+                    datos_signos[signo] = {
+                        "nombre_original": signo.capitalize(),
+                        "descripcion": descripcion,
+                        "imagen": obtener_ruta_imagen(signo)
+                    }
+                break
+    
+    return datos_signos
+
+def obtener_todos():
+    """Snapshot del día con todos los signos (una sola descarga por día)."""
+    return snapshot_diario.obtener(FUENTE_SNAPSHOT, scrapear_signos)
+
+def obtener_horoscopo_chino(signo_buscar):
+    try:
+        datos_signos = obtener_todos()
         
         # Buscar el signo solicitado
         signo_normalizado = unidecode(signo_buscar.lower())
@@ -81,7 +96,14 @@ def obtener_horoscopo_chino(signo_buscar):
         return f"Error: {str(e)}\n{traceback.format_exc()}"
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
+    if '--todos' in sys.argv:
+        # Modo batch: todos los signos del día en un solo JSON
+        try:
+            print(json.dumps(obtener_todos(), ensure_ascii=False))
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif len(sys.argv) != 2:
         print("Uso: python horoscopoc.py <signo>")
     else:
         signo = sys.argv[1]
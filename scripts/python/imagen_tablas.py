@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Imágenes PNG de tablas de posiciones y fixtures, con colores por zona.
+
+Se dibujan con la misma base PIL de graficos.py (fuentes cacheadas por
+tamaño, PNG en memoria) y se cachean con `graficos.obtener_grafico` usando
+como versión un hash de los datos: la imagen solo se vuelve a dibujar cuando
+la tabla o la jornada cambian. El mismo hash indexa el file_id de Telegram,
+así que mientras los datos no cambien la imagen se reenvía sin subirla.
+
+Cada tipo de imagen tiene su propio directorio en disco (temp/graficos/tablas/<tipo>)
+con capacidad para VERSIONES_EN_DISCO PNGs: al dibujar una versión nueva se
+borran las reemplazadas. Durante un partido en vivo el minuto cambia la
+huella del fixture a cada rato, y sin esto cada minuto dejaría un PNG.
+
+Uso:
+    python imagen_tablas.py <tabla|tclasi|prox> [--png]  -> {"hash", "file_id"} o {"hash", "png"}
+    python imagen_tablas.py file_id <hash> <file_id> -> registra el file_id de Telegram
+"""
+import sys
+import io
+import os
+import json
+import base64
+import hashlib
+
+from PIL import Image, ImageDraw
+
+from bloqueo import bloqueo
+from graficos import CACHE_DIR, COLOR_FONDO, COLOR_GRILLA, COLOR_TEXTO, obtener_fuente, obtener_grafico, _a_png
+
+FILE_IDS_PATH = CACHE_DIR / 'file_ids.json'
+TABLAS_DIR = CACHE_DIR / 'tablas'
+VERSIONES_EN_DISCO = 2   # la vigente y la anterior, por tipo
+
+ANCHO = 720
+ALTO_FILA = 40
+ALTO_TITULO = 72
+ALTO_ENCABEZADO = 36
+ALTO_LEYENDA = 48
+MARGEN_X = 24
+ANCHO_FRANJA = 8
+
+COLOR_FILA_ALTERNA = (32, 35, 43)
+COLOR_SECUNDARIO = (150, 156, 168)
+ZONAS = {
+    # zona: (color, etiqueta de la leyenda)
+    "libertadores": ((46, 134, 222), "Libertadores"),
+    "sudamericana": ((243, 156, 18), "Sudamericana"),
+    "descenso": ((231, 76, 60), "Descenso"),
+    "clasificado": ((46, 204, 113), "Clasifica"),
+    "repechaje": ((241, 196, 15), "Repechaje"),
+}
+ESTADOS_PARTIDO = {
+    "programado": COLOR_SECUNDARIO,
+    "en_vivo": (46, 204, 113),
+    "finalizado": COLOR_TEXTO,
+}
+
+# Clasificatorias: 6 cupos directos y 1 de repechaje
+CUPOS_MUNDIAL = 6
+CUPO_REPECHAJE = 7
+
+
+def huella(datos):
+    """Hash estable de los datos que determinan la imagen."""
+    return hashlib.sha1(json.dumps(datos, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+# --- Dibujo ---
+
+def _lienzo(alto, titulo):
+    img = Image.new("RGB", (ANCHO, alto), COLOR_FONDO)
+    draw = ImageDraw.Draw(img)
+    draw.text((MARGEN_X, 22), titulo, font=obtener_fuente(28), fill=COLOR_TEXTO)
+    return img, draw
+
+
+def _derecha(draw, x, y, texto, fuente, color=COLOR_TEXTO):
+    draw.text((x - draw.textlength(texto, font=fuente), y), texto, font=fuente, fill=color)
+
+
+def dibujar_tabla(titulo, filas, columnas):
+    """
+    Tabla de posiciones. `filas` son dicts con 'posicion', 'equipo', 'zona'
+    y las claves de `columnas` (lista de (clave, encabezado)), alineadas a la derecha.
+    """
+    zonas_usadas = [z for z in ZONAS if any(f.get("zona") == z for f in filas)]
+    alto = ALTO_TITULO + ALTO_ENCABEZADO + ALTO_FILA * len(filas) + (ALTO_LEYENDA if zonas_usadas else 16)
+    img, draw = _lienzo(alto, titulo)
+    fuente, fuente_negrita = obtener_fuente(18), obtener_fuente(20)
+
+    x_columnas = [ANCHO - MARGEN_X - 64 * i for i in range(len(columnas))][::-1]
+    y = ALTO_TITULO
+    draw.text((MARGEN_X + 20, y + 8), "#", font=fuente, fill=COLOR_SECUNDARIO)
+    draw.text((MARGEN_X + 64, y + 8), "Equipo", font=fuente, fill=COLOR_SECUNDARIO)
+    for x, (_, encabezado) in zip(x_columnas, columnas):
+        _derecha(draw, x, y + 8, encabezado, fuente, COLOR_SECUNDARIO)
+    y += ALTO_ENCABEZADO
+    draw.line([(MARGEN_X, y - 1), (ANCHO - MARGEN_X, y - 1)], fill=COLOR_GRILLA)
+
+    for i, fila in enumerate(filas):
+        if i % 2:
+            draw.rectangle([MARGEN_X, y, ANCHO - MARGEN_X, y + ALTO_FILA - 1], fill=COLOR_FILA_ALTERNA)
+        if fila.get("zona") in ZONAS:
+            draw.rectangle([MARGEN_X, y, MARGEN_X + ANCHO_FRANJA - 1, y + ALTO_FILA - 1], fill=ZONAS[fila["zona"]][0])
+        texto_y = y + (ALTO_FILA - 22) / 2
+        draw.text((MARGEN_X + 20, texto_y), str(fila["posicion"]), font=fuente, fill=COLOR_TEXTO)
+        draw.text((MARGEN_X + 64, texto_y), fila["equipo"], font=fuente, fill=COLOR_TEXTO)
+        for x, (clave, _) in zip(x_columnas, columnas):
+            es_puntos = clave in ("pts", "puntos")
+            _derecha(draw, x, texto_y, str(fila.get(clave, "")), fuente_negrita if es_puntos else fuente)
+        y += ALTO_FILA
+
+    x = MARGEN_X
+    for zona in zonas_usadas:
+        color, etiqueta = ZONAS[zona]
+        draw.rectangle([x, y + 20, x + 14, y + 34], fill=color)
+        draw.text((x + 22, y + 16), etiqueta, font=fuente, fill=COLOR_SECUNDARIO)
+        x += 44 + draw.textlength(etiqueta, font=fuente)
+    return _a_png(img)
+
+
+def dibujar_fixture(titulo, dias):
+    """Lista de partidos agrupada por día (formato de as_com.jornada)."""
+    dias = [d for d in dias if d["partidos"]]
+    alto = ALTO_TITULO + sum(ALTO_ENCABEZADO + ALTO_FILA * len(d["partidos"]) for d in dias) + 16
+    img, draw = _lienzo(alto, titulo)
+    fuente, fuente_negrita = obtener_fuente(18), obtener_fuente(20)
+    centro = ANCHO / 2
+
+    y = ALTO_TITULO
+    for dia in dias:
+        draw.text((MARGEN_X, y + 8), dia["titulo"], font=fuente, fill=COLOR_SECUNDARIO)
+        y += ALTO_ENCABEZADO
+        draw.line([(MARGEN_X, y - 1), (ANCHO - MARGEN_X, y - 1)], fill=COLOR_GRILLA)
+        for i, partido in enumerate(dia["partidos"]):
+            if i % 2:
+                draw.rectangle([MARGEN_X, y, ANCHO - MARGEN_X, y + ALTO_FILA - 1], fill=COLOR_FILA_ALTERNA)
+            texto_y = y + (ALTO_FILA - 22) / 2
+            centro_texto = partido["marcador"] or partido["hora"] or "vs"
+            if partido["estado"] == "en_vivo" and partido.get("minuto"):
+                centro_texto = f"{centro_texto}  {partido['minuto']}"
+            ancho_centro = draw.textlength(centro_texto, font=fuente_negrita)
+            _derecha(draw, centro - ancho_centro / 2 - 16, texto_y, partido["local"], fuente)
+            draw.text((centro - ancho_centro / 2, texto_y), centro_texto, font=fuente_negrita,
+                      fill=ESTADOS_PARTIDO.get(partido["estado"], COLOR_TEXTO))
+            draw.text((centro + ancho_centro / 2 + 16, texto_y), partido["visitante"], font=fuente, fill=COLOR_TEXTO)
+            y += ALTO_FILA
+    return _a_png(img)
+
+
+# --- Fuentes de datos ---
+
+def _datos_tabla():
+    import posiciones
+
+    try:
+        estado, _ = posiciones.actualizar()
+    except Exception:
+        estado = posiciones.cargar_estado(posiciones.LIGA)
+    filas = posiciones.tabla(estado)
+    columnas = [("pj", "PJ"), ("dg", "DG"), ("pts", "Pts")]
+    return "Tabla de Posiciones - Liga Chilena", filas, columnas
+
+
+def _datos_tclasi():
+    import as_com
+
+    filas = []
+    for fila in as_com.tabla_clasificatorias():
+        posicion = fila["posicion"]
+        zona = "clasificado" if posicion <= CUPOS_MUNDIAL else "repechaje" if posicion == CUPO_REPECHAJE else None
+        filas.append({**fila, "zona": zona})
+    return "Clasificatorias Sudamericanas", filas, [("puntos", "Pts")]
+
+
+def imagen(tipo):
+    """Devuelve (hash, png) de la imagen pedida, dibujándola solo si sus datos cambiaron."""
+    if tipo == "prox":
+        import as_com
+
+        jornada = as_com.jornada()
+        version = huella(jornada)
+        png = obtener_grafico("fixture", tipo, version,
+                              lambda: dibujar_fixture(jornada["titulo"] or "Próximos partidos", jornada["dias"]),
+                              directorio=TABLAS_DIR / tipo, maximo=VERSIONES_EN_DISCO)
+        return version, png
+
+    fuentes = {"tabla": _datos_tabla, "tclasi": _datos_tclasi}
+    if tipo not in fuentes:
+        raise LookupError(f"Tipo desconocido '{tipo}'. Disponibles: tabla, tclasi, prox")
+    titulo, filas, columnas = fuentes[tipo]()
+    if not filas:
+        raise ValueError("No hay datos para dibujar la tabla.")
+    version = huella([titulo, filas])
+    return version, obtener_grafico("tabla", tipo, version, lambda: dibujar_tabla(titulo, filas, columnas),
+                                    directorio=TABLAS_DIR / tipo, maximo=VERSIONES_EN_DISCO)
+
+
+# --- file_id de Telegram ---
+
+def leer_file_ids():
+    try:
+        return json.loads(FILE_IDS_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def registrar_file_id(version, file_id):
+    # Bajo lock, como en cache_media.py: dos envíos simultáneos no se pisan el índice
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with bloqueo(FILE_IDS_PATH):
+        file_ids = leer_file_ids()
+        file_ids[version] = file_id
+        # Solo interesan las versiones recientes: se conservan las últimas 50
+        file_ids = dict(list(file_ids.items())[-50:])
+        tmp = FILE_IDS_PATH.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(file_ids), encoding='utf-8')
+        os.replace(tmp, FILE_IDS_PATH)
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    args = [a for a in sys.argv[1:] if a != '--png']
+    try:
+        if len(args) == 3 and args[0] == 'file_id':
+            registrar_file_id(args[1], args[2])
+            print(json.dumps({'registrado': True}))
+        elif len(args) == 1:
+            version, png = imagen(args[0])
+            file_id = leer_file_ids().get(version)
+            salida = {'hash': version, 'file_id': file_id}
+            if not file_id or '--png' in sys.argv:
+                salida['png'] = base64.b64encode(png).decode('ascii')
+            print(json.dumps(salida))
+        else:
+            print(__doc__.strip(), file=sys.stderr)
+            sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén local del histórico de indicadores económicos (mindicador.cl).
+
+Cada serie (UF, dólar, euro, UTM, IPC) se guarda como un arreglo float64
+indexado por día: la posición i corresponde a `inicio + i días`, así que buscar
+el valor de una fecha es aritmética de índices (O(1)), sin recorrer listas.
+Los días sin dato quedan como NaN. Los archivos se abren con `np.memmap`.
+Junto a cada serie se guarda, al actualizar, el índice del último dato válido
+de cada día (`<serie>.ult`), así que las consultas no recorren el arreglo.
+
+La descarga completa se hace una vez con los endpoints por año
+(`/api/<serie>/<año>`) y luego se actualiza a diario con `/api/<serie>`.
+
+Uso:
+    python indicadores_hist.py actualizar [--completo]
+    python indicadores_hist.py valor <serie> [YYYY-MM-DD]
+    python indicadores_hist.py variacion <serie> <dias>
+    python indicadores_hist.py rango <serie> <dias>
+    python indicadores_hist.py media <serie> <dias>
+Cualquier consulta acepta --json para salida estructurada.
+"""
+import sys
+import io
+import os
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import requests
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+API_URL = "https://mindicador.cl/api"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+REQUEST_TIMEOUT = 15
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DATA_DIR = PROJECT_ROOT / 'temp' / 'indicadores'
+META_PATH = DATA_DIR / 'meta.json'
+
+# Primer año publicado por mindicador para cada serie
+SERIES = {
+    'uf': {'nombre': 'UF', 'desde': 1977},
+    'dolar': {'nombre': 'Dólar observado', 'desde': 1984},
+    'euro': {'nombre': 'Euro', 'desde': 1999},
+    'utm': {'nombre': 'UTM', 'desde': 1990},
+    'ipc': {'nombre': 'IPC', 'desde': 1928},
+}
+
+DTYPE = np.float64
+DTYPE_INDICE = np.int64
+
+
+def _parse_fecha(texto):
+    """Convierte la fecha ISO de mindicador ('2024-01-15T03:00:00.000Z') a date."""
+    return datetime.fromisoformat(texto.replace('Z', '+00:00')).date()
+
+
+# --- Persistencia ---
+
+def leer_meta():
+    try:
+        return json.loads(META_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _escribir_meta(meta):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = META_PATH.with_suffix('.tmp')
+    tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.replace(tmp, META_PATH)
+
+
+def _ruta_serie(serie):
+    return DATA_DIR / f"{serie}.f64"
+
+
+def _ruta_ultimo_valido(serie):
+    return DATA_DIR / f"{serie}.ult"
+
+
+def _ultimos_validos(valores):
+    """Índice del último dato válido en o antes de cada día (-1 antes del primero)."""
+    posiciones = np.where(~np.isnan(valores), np.arange(len(valores)), -1)
+    return np.maximum.accumulate(posiciones).astype(DTYPE_INDICE, copy=False)
+
+
+def _guardar_serie(serie, valores):
+    """
+    Escribe el arreglo completo y su índice de últimos válidos, y los publica
+    con reemplazos atómicos (primero el índice: un lector que vea el arreglo
+    nuevo con el índice viejo lo detecta por el largo).
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    for ruta, arreglo in ((_ruta_ultimo_valido(serie), _ultimos_validos(valores)),
+                          (_ruta_serie(serie), np.ascontiguousarray(valores, dtype=DTYPE))):
+        tmp = ruta.with_suffix(f'{ruta.suffix}.tmp')
+        arreglo.tofile(tmp)
+        os.replace(tmp, ruta)
+
+
+def _combinar(inicio, valores, puntos):
+    """
+    Inserta una lista de (fecha, valor) en el arreglo diario, ampliándolo si
+    hace falta. Devuelve (inicio, valores) posiblemente con nuevos límites.
+    """
+    if not puntos:
+        return inicio, valores
+    fechas = [f for f, _ in puntos]
+    nuevo_inicio = min([inicio] + fechas) if inicio else min(fechas)
+    fin_actual = inicio + timedelta(days=len(valores) - 1) if inicio and len(valores) else nuevo_inicio
+    nuevo_fin = max([fin_actual] + fechas)
+
+    largo = (nuevo_fin - nuevo_inicio).days + 1
+    resultado = np.full(largo, np.nan, dtype=DTYPE)
+    if inicio and len(valores):
+        desplazamiento = (inicio - nuevo_inicio).days
+        resultado[desplazamiento:desplazamiento + len(valores)] = valores
+
+    indices = np.fromiter(((f - nuevo_inicio).days for f in fechas), dtype=np.int64, count=len(fechas))
+    resultado[indices] = np.fromiter((v for _, v in puntos), dtype=DTYPE, count=len(puntos))
+    return nuevo_inicio, resultado
+
+
+# --- Descarga ---
+
+def _descargar(url, session):
+    response = session.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    puntos = []
+    for item in response.json().get('serie', []):
+        try:
+            puntos.append((_parse_fecha(item['fecha']), float(item['valor'])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return puntos
+
+
+def actualizar(completo=False, session=None):
+    """
+    Actualiza todas las series. La primera vez (o con completo=True) baja el
+    histórico año por año; después solo pide los últimos valores publicados.
+    """
+    session = session or requests.Session()
+    meta = leer_meta()
+    hoy = date.today()
+    resumen = {}
+
+    for serie, config in SERIES.items():
+        info = meta.get(serie)
+        existente = info is not None and _ruta_serie(serie).exists()
+        try:
+            if completo or not existente:
+                inicio, valores = None, np.empty(0, dtype=DTYPE)
+                for anio in range(config['desde'], hoy.year + 1):
+                    puntos = _descargar(f"{API_URL}/{serie}/{anio}", session)
+                    inicio, valores = _combinar(inicio, valores, puntos)
+            else:
+                inicio = date.fromisoformat(info['inicio'])
+                valores = np.fromfile(_ruta_serie(serie), dtype=DTYPE)
+                ultima = date.fromisoformat(info['ultima'])
+                puntos = _descargar(f"{API_URL}/{serie}", session)
+                # Si pasó más de un mes sin actualizar, completamos con los años faltantes
+                if (hoy - ultima).days > 25:
+                    for anio in range(ultima.year, hoy.year + 1):
+                        puntos += _descargar(f"{API_URL}/{serie}/{anio}", session)
+                inicio, valores = _combinar(inicio, valores, puntos)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Advertencia: no se pudo actualizar {serie}: {e}", file=sys.stderr)
+            continue
+
+        if inicio is None:
+            continue
+        _guardar_serie(serie, valores)
+        meta[serie] = {
+            'inicio': inicio.isoformat(),
+            'ultima': (inicio + timedelta(days=len(valores) - 1)).isoformat(),
+            'version': int(datetime.now().timestamp()),
+        }
+        resumen[serie] = int(np.count_nonzero(~np.isnan(valores)))
+
+    _escribir_meta(meta)
+    return resumen
+
+
+# --- Consultas ---
+
+class Serie:
+    """Vista de solo lectura sobre el arreglo diario de un indicador."""
+
+    def __init__(self, serie, meta=None):
+        meta = meta if meta is not None else leer_meta()
+        if serie not in meta or not _ruta_serie(serie).exists():
+            raise LookupError(f"No hay histórico local para '{serie}'. Ejecuta 'actualizar' primero.")
+        self.serie = serie
+        self.inicio = date.fromisoformat(meta[serie]['inicio'])
+        self.version = meta[serie].get('version', 0)
+        self.valores = np.memmap(_ruta_serie(serie), dtype=DTYPE, mode='r')
+        # Índice del último dato válido en cada día, precalculado al actualizar:
+        # permite responder "valor vigente en la fecha X" (p. ej. UTM o IPC
+        # mensual) en O(1) sin recorrer la serie al abrirla.
+        self._ultimo_valido = self._cargar_ultimo_valido()
+
+    def _cargar_ultimo_valido(self):
+        ruta = _ruta_ultimo_valido(self.serie)
+        try:
+            indice = np.memmap(ruta, dtype=DTYPE_INDICE, mode='r')
+        except (FileNotFoundError, ValueError):
+            indice = None
+        if indice is not None and len(indice) == len(self.valores):
+            return indice
+        # Datos escritos por una versión anterior (o a medio publicar): se calcula en memoria
+        return _ultimos_validos(self.valores)
+
+    @property
+    def fin(self):
+        return self.inicio + timedelta(days=len(self.valores) - 1)
+
+    def indice(self, fecha):
+        return (fecha - self.inicio).days
+
+    def valor_en(self, fecha):
+        """Último valor publicado en o antes de `fecha` (None si no existe)."""
+        i = min(self.indice(fecha), len(self.valores) - 1)
+        if i < 0:
+            return None
+        j = self._ultimo_valido[i]
+        if j < 0:
+            return None
+        return self.inicio + timedelta(days=int(j)), float(self.valores[j])
+
+    def rellenado(self, desde, hasta):
+        """Tramo [desde, hasta] con los huecos rellenados hacia adelante."""
+        a = max(self.indice(desde), 0)
+        b = min(self.indice(hasta), len(self.valores) - 1)
+        if b < a:
+            return np.empty(0, dtype=DTYPE)
+        idx = self._ultimo_valido[a:b + 1]
+        tramo = np.full(len(idx), np.nan, dtype=DTYPE)
+        validos = idx >= 0
+        tramo[validos] = self.valores[idx[validos]]
+        return tramo
+
+    def variacion(self, dias, hasta=None):
+        """Variación absoluta y porcentual entre `hasta - dias` y `hasta`."""
+        hasta = hasta or min(date.today(), self.fin)
+        actual = self.valor_en(hasta)
+        previo = self.valor_en(hasta - timedelta(days=dias))
+        if not actual or not previo or previo[1] == 0:
+            return None
+        delta = actual[1] - previo[1]
+        return {'desde': previo[0].isoformat(), 'hasta': actual[0].isoformat(),
+                'inicial': previo[1], 'final': actual[1],
+                'diferencia': delta, 'porcentaje': delta / previo[1] * 100}
+
+    def rango(self, dias, hasta=None):
+        """Mínimo y máximo (con sus fechas) dentro de los últimos `dias` días."""
+        hasta = hasta or min(date.today(), self.fin)
+        desde = hasta - timedelta(days=dias)
+        a = max(self.indice(desde), 0)
+        tramo = np.asarray(self.valores[a:self.indice(hasta) + 1])
+        if tramo.size == 0 or np.all(np.isnan(tramo)):
+            return None
+        i_min, i_max = int(np.nanargmin(tramo)), int(np.nanargmax(tramo))
+        base = self.inicio + timedelta(days=a)
+        return {'minimo': float(tramo[i_min]), 'fecha_minimo': (base + timedelta(days=i_min)).isoformat(),
+                'maximo': float(tramo[i_max]), 'fecha_maximo': (base + timedelta(days=i_max)).isoformat()}
+
+    def media_movil(self, ventana, desde, hasta):
+        """Media móvil de `ventana` días sobre la serie rellenada, vía suma acumulada."""
+        tramo = self.rellenado(desde - timedelta(days=ventana - 1), hasta)
+        # Tras rellenar, solo pueden quedar NaN al comienzo (antes del primer dato)
+        tramo = tramo[~np.isnan(tramo)]
+        if tramo.size < ventana:
+            return np.empty(0, dtype=DTYPE)
+        acumulada = np.cumsum(np.insert(tramo, 0, 0.0))
+        return (acumulada[ventana:] - acumulada[:-ventana]) / ventana
+
+
+def cargar_serie(serie):
+    serie = serie.lower()
+    if serie not in SERIES:
+        raise LookupError(f"Serie desconocida '{serie}'. Disponibles: {', '.join(SERIES)}")
+    return Serie(serie)
+
+
+# --- CLI ---
+
+def _formatear(valor):
+    return "{:,.2f}".format(valor).replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _texto(comando, serie, resultado):
+    nombre = SERIES[serie.serie]['nombre']
+    if resultado is None:
+        return f"⚠️ No hay datos suficientes de {nombre} para esa consulta."
+    if comando == 'valor':
+        return f"📅 *{nombre}* al {resultado['fecha']}: ${_formatear(resultado['valor'])}"
+    if comando == 'variacion':
+        signo = "📈" if resultado['diferencia'] >= 0 else "📉"
+        return (f"{signo} *{nombre}* {resultado['desde']} → {resultado['hasta']}\n"
+                f"${_formatear(resultado['inicial'])} → ${_formatear(resultado['final'])} "
+                f"({resultado['porcentaje']:+.2f}%)")
+    if comando == 'rango':
+        return (f"📊 *{nombre}*\n"
+                f"  Mín.: ${_formatear(resultado['minimo'])} ({resultado['fecha_minimo']})\n"
+                f"  Máx.: ${_formatear(resultado['maximo'])} ({resultado['fecha_maximo']})")
+    return f"〰️ *{nombre}* media móvil {resultado['ventana']} días: ${_formatear(resultado['media'])}"
+
+
+def main(argv):
+    json_output = '--json' in argv
+    args = [a for a in argv if not a.startswith('--')]
+    if not args:
+        print(__doc__.strip())
+        return 1
+
+    comando = args[0]
+    if comando == 'actualizar':
+        resumen = actualizar(completo='--completo' in argv)
+        print(json.dumps(resumen) if json_output else
+              "\n".join(f"{s}: {n} registros" for s, n in resumen.items()))
+        return 0
+
+    if len(args) < 2:
+        print("Debes indicar la serie: " + ", ".join(SERIES), file=sys.stderr)
+        return 1
+
+    try:
+        serie = cargar_serie(args[1])
+        if comando == 'valor':
+            fecha = date.fromisoformat(args[2]) if len(args) > 2 else date.today()
+            encontrado = serie.valor_en(fecha)
+            resultado = {'fecha': encontrado[0].isoformat(), 'valor': encontrado[1]} if encontrado else None
+        elif comando in ('variacion', 'rango', 'media'):
+            dias = int(args[2]) if len(args) > 2 else 7
+            if comando == 'variacion':
+                resultado = serie.variacion(dias)
+            elif comando == 'rango':
+                resultado = serie.rango(dias)
+            else:
+                hasta = min(date.today(), serie.fin)
+                medias = serie.media_movil(dias, hasta, hasta)
+                resultado = {'ventana': dias, 'media': float(medias[-1])} if medias.size else None
+        else:
+            print(f"Comando desconocido: {comando}", file=sys.stderr)
+            return 1
+    except (LookupError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if json_output:
+        print(json.dumps({'serie': serie.serie, 'comando': comando, 'resultado': resultado}, ensure_ascii=False))
+    else:
+        print(_texto(comando, serie, resultado))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
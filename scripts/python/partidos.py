@@ -3,10 +3,13 @@ import requests
 from datetime import datetime, timedelta
 import sys
 import io
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
 # Diccionario de ligas
 LIGAS = {
     "🏆 Liga Chilena": "chi.1",
@@ -14,6 +17,16 @@ LIGAS = {
 }
 
 ZONA_HORARIA_CHILE = ZoneInfo('America/Santiago')
+ESPN_URL = "https://site.api.espn.com/apis/site/v2/sports/soccer/{liga}/scoreboard"
+DIAS_A_BUSCAR = 7
+
+# Caché por liga y por día: corto para hoy o días con partidos en juego, largo para el futuro
+CACHE_PATH = Path(__file__).resolve().parent.parent.parent / 'temp' / 'partidos_cache.json'
+TTL_EN_VIVO = 60              # 1 minuto
+TTL_FUTURO = 6 * 60 * 60      # 6 horas
+
+# Sesión compartida: reutiliza conexiones entre ligas
+SESSION = requests.Session()
 
 # Traducción manual para no depender del sistema operativo (locale)
 DIAS_SEMANA = {0: "Lunes", 1: "Martes", 2: "Miércoles", 3: "Jueves", 4: "Viernes", 5: "Sábado", 6: "Domingo"}
@@ -25,70 +38,145 @@ def formatear_fecha(dt):
     mes = MESES[dt.month]
     return f"{dia}, {dt.day} de {mes}"
 
-def obtener_y_formatear_partidos(codigo_liga, fecha):
+def normalizar_evento(evento):
+    """Reduce un evento del scoreboard de ESPN a los campos que usamos."""
+    competencia = evento["competitions"][0]
+    equipos_data = competencia["competitors"]
+    # ESPN no garantiza el orden: se usa homeAway cuando viene
+    local = next((e for e in equipos_data if e.get("homeAway") == "home"), equipos_data[0])
+    visitante = next((e for e in equipos_data if e.get("homeAway") == "away"), equipos_data[1])
+    estado = evento["status"]["type"]
+    return {
+        "id": evento.get("id"),
+        "fecha": evento["date"],
+        "local": local["team"]["displayName"],
+        "visitante": visitante["team"]["displayName"],
+        "id_local": local["team"].get("id"),
+        "id_visitante": visitante["team"].get("id"),
+        "goles_local": local.get("score", "0"),
+        "goles_visitante": visitante.get("score", "0"),
+        "estado": estado["state"],
+        "completado": estado.get("completed", False),
+        "detalle": estado["shortDetail"],
+        "reloj": evento["status"].get("displayClock"),
+        "detalles": competencia.get("details", []),
+    }
+
+def fecha_local(evento):
+    """Día (hora de Chile) en que se juega el evento, como 'YYYY-MM-DD'."""
+    # Parseo manual ISO8601 para evitar dependencia de dateutil
+    hora_utc = datetime.fromisoformat(evento["fecha"].replace('Z', '+00:00'))
+    return hora_utc.astimezone(ZONA_HORARIA_CHILE).strftime('%Y-%m-%d')
+
+def descargar_eventos(codigo_liga, desde, hasta, limite=200):
     """
-    Obtiene los partidos de una liga para una fecha específica.
+    Descarga todos los partidos de la liga entre dos fechas con una sola
+    consulta de rango (dates=YYYYMMDD-YYYYMMDD).
     """
-    url = f"https://site.api.espn.com/apis/site/v2/sports/soccer/{codigo_liga}/scoreboard?dates={fecha.strftime('%Y%m%d')}"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-    except (requests.RequestException, ValueError):
-        return []
+    rango = f"{desde.strftime('%Y%m%d')}-{hasta.strftime('%Y%m%d')}"
+    response = SESSION.get(ESPN_URL.format(liga=codigo_liga), params={"dates": rango, "limit": limite}, timeout=10)
+    response.raise_for_status()
 
-    partidos_formateados = []
-    for evento in data.get("events", []):
+    eventos = []
+    for evento in response.json().get("events", []):
         try:
-            equipos_data = evento["competitions"][0]["competitors"]
-            equipo_local = equipos_data[0]["team"]["displayName"]
-            equipo_visitante = equipos_data[1]["team"]["displayName"]
-
-            estado_detalle = evento["status"]["type"]["shortDetail"]
-            estado_tipo = evento["status"]["type"]["state"]
-
-            if estado_tipo == "pre":
-                # Parseo manual ISO8601 para evitar dependencia de dateutil
-                hora_utc = datetime.fromisoformat(evento["date"].replace('Z', '+00:00'))
-                hora_chile = hora_utc.astimezone(ZONA_HORARIA_CHILE).strftime("%H:%M")
-                partidos_formateados.append(f"🏟️ *{equipo_local}* vs *{equipo_visitante}* _({hora_chile})_")
-            else:
-                score_local = equipos_data[0].get("score", "0")
-                score_visitante = equipos_data[1].get("score", "0")
-                partidos_formateados.append(f"⚽ *{equipo_local}* {score_local} - {score_visitante} *{equipo_visitante}* _({estado_detalle})_")
+            eventos.append(normalizar_evento(evento))
         except (KeyError, IndexError):
             continue
-    return partidos_formateados
+    return eventos
+
+def leer_cache():
+    try:
+        return json.loads(CACHE_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def guardar_cache(cache):
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_PATH.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(cache, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        pass
+
+def obtener_eventos_por_dia(codigo_liga, desde, dias, cache):
+    """
+    Devuelve {'YYYY-MM-DD': [eventos]} para `dias` días desde `desde`.
+    Cada día vence por separado (TTL_EN_VIVO hoy o con partidos en juego,
+    TTL_FUTURO el resto): solo se descarga, con una sola petición, el tramo
+    entre el primer y el último día vencido, y se mezcla con lo que ya había.
+    """
+    fechas = [(desde + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(dias)]
+    # Los días ya pasados salen del caché
+    cache_liga = {f: v for f, v in cache.get(codigo_liga, {}).items() if f >= fechas[0]}
+    cache[codigo_liga] = cache_liga
+    ahora = time.time()
+
+    vencidos = [i for i, f in enumerate(fechas) if f not in cache_liga or cache_liga[f]["expira"] <= ahora]
+    if not vencidos:
+        return {f: cache_liga[f]["eventos"] for f in fechas}
+
+    tramo = fechas[vencidos[0]:vencidos[-1] + 1]
+    try:
+        eventos = descargar_eventos(codigo_liga, desde + timedelta(days=vencidos[0]),
+                                    desde + timedelta(days=vencidos[-1]))
+    except (requests.RequestException, ValueError):
+        # Sin red: se usa lo que haya en caché aunque esté vencido
+        return {f: cache_liga.get(f, {}).get("eventos", []) for f in fechas}
+
+    por_dia = {f: [] for f in tramo}
+    for evento in eventos:
+        dia = fecha_local(evento)
+        if dia in por_dia:
+            por_dia[dia].append(evento)
+
+    hoy = fechas[0]
+    for dia, lista in por_dia.items():
+        en_juego = dia == hoy or any(e["estado"] == "in" for e in lista)
+        cache_liga[dia] = {"expira": ahora + (TTL_EN_VIVO if en_juego else TTL_FUTURO), "eventos": lista}
+    return {f: cache_liga[f]["eventos"] for f in fechas}
+
+def formatear_partido(evento):
+    if evento["estado"] == "pre":
+        hora_utc = datetime.fromisoformat(evento["fecha"].replace('Z', '+00:00'))
+        hora_chile = hora_utc.astimezone(ZONA_HORARIA_CHILE).strftime("%H:%M")
+        return f"🏟️ *{evento['local']}* vs *{evento['visitante']}* _({hora_chile})_"
+    return (f"⚽ *{evento['local']}* {evento['goles_local']} - {evento['goles_visitante']} "
+            f"*{evento['visitante']}* _({evento['detalle']})_")
 
 def main():
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     fecha_hoy = datetime.now(ZONA_HORARIA_CHILE)
-    
-    for nombre_liga, codigo in LIGAS.items():
+    cache = leer_cache()
+
+    # Todas las ligas en paralelo: una ronda de peticiones en vez de una por día y liga
+    with ThreadPoolExecutor(max_workers=len(LIGAS)) as pool:
+        futuros = {nombre: pool.submit(obtener_eventos_por_dia, codigo, fecha_hoy, DIAS_A_BUSCAR + 1, cache)
+                   for nombre, codigo in LIGAS.items()}
+        resultados = {nombre: futuro.result() for nombre, futuro in futuros.items()}
+    guardar_cache(cache)
+
+    for nombre_liga, por_dia in resultados.items():
         print(f"\n*{nombre_liga}*")
-        
-        partidos_de_hoy = obtener_y_formatear_partidos(codigo, fecha_hoy)
+        dias = list(por_dia.items())
+        _, partidos_de_hoy = dias[0]
 
         if partidos_de_hoy:
             print(f"📅 Partidos para hoy, {fecha_hoy.strftime('%d-%m-%Y')}:")
             for partido in partidos_de_hoy:
-                print(partido)
+                print(formatear_partido(partido))
         else:
             print(f"🚫 No hay partidos programados para hoy.")
 
-            encontrado_futuro = False
-            for i in range(1, 8):
-                fecha_futura = fecha_hoy + timedelta(days=i)
-                partidos_futuros = obtener_y_formatear_partidos(codigo, fecha_futura)
-
-                if partidos_futuros:
-                    print(f"📅 Próxima fecha: {formatear_fecha(fecha_futura)}")
-                    for partido in partidos_futuros:
-                        print(partido)
-                    encontrado_futuro = True
-                    break
-            
-            if not encontrado_futuro:
+            proximo = next(((dia, lista) for dia, lista in dias[1:] if lista), None)
+            if proximo:
+                dia, lista = proximo
+                print(f"📅 Próxima fecha: {formatear_fecha(datetime.strptime(dia, '%Y-%m-%d'))}")
+                for partido in lista:
+                    print(formatear_partido(partido))
+            else:
                 print("🚫 _No se encontraron partidos en los próximos 7 días._")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Motor local de la tabla de posiciones a partir de los resultados de ESPN.
+
+Los partidos finalizados de la temporada se aplican uno a uno sobre las
+estadísticas de cada equipo y se guardan en temp/posiciones/<liga>_<año>.json.
+Cada actualización solo descarga los últimos días (desde el último resultado
+conocido, menos MARGEN_DIAS para recoger partidos reprogramados o
+corregidos) y aplica los partidos nuevos; si un partido ya aplicado llega con
+otro marcador, se descuenta el resultado anterior y se suma el corregido.
+La primera carga de la temporada descarga el fixture completo del año, de
+modo que los equipos que aún no juegan también aparecen en la tabla.
+
+Criterios de orden: puntos, diferencia de gol, goles a favor, goles de
+visita y, si persiste el empate, puntos en los partidos entre los empatados.
+
+Uso:
+    python posiciones.py              -> actualiza e imprime la tabla en JSON
+    python posiciones.py --completo   -> reconstruye la temporada desde cero
+
+El margen de días se puede ajustar con la variable POSICIONES_MARGEN_DIAS.
+"""
+import sys
+import io
+import os
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+from partidos import ZONA_HORARIA_CHILE, descargar_eventos, fecha_local
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+POSICIONES_DIR = PROJECT_ROOT / 'temp' / 'posiciones'
+LIGA = "chi.1"
+VERSION = 2
+# Días hacia atrás que se vuelven a revisar en cada actualización
+MARGEN_DIAS = int(os.environ.get('POSICIONES_MARGEN_DIAS', 10))
+LIMITE_TEMPORADA = 500   # eventos por consulta de rango
+
+# Zonas de la tabla (mismas que usa tabla.py)
+ZONA_LIBERTADORES = 3
+ZONA_SUDAMERICANA = 7
+INICIO_DESCENSO = 15
+
+
+# --- Estado ---
+
+def _ruta(liga, anio):
+    return POSICIONES_DIR / f"{liga}_{anio}.json"
+
+
+def estado_vacio(liga, anio):
+    return {"version": VERSION, "liga": liga, "anio": anio,
+            "ultima_fecha": None, "partidos": {}, "equipos": {}}
+
+
+def cargar_estado(liga, anio=None):
+    anio = anio or datetime.now(ZONA_HORARIA_CHILE).year
+    try:
+        estado = json.loads(_ruta(liga, anio).read_text(encoding='utf-8'))
+        if estado.get("version") == VERSION:
+            return estado
+    except (FileNotFoundError, ValueError):
+        pass
+    return estado_vacio(liga, anio)
+
+
+def guardar_estado(estado):
+    POSICIONES_DIR.mkdir(parents=True, exist_ok=True)
+    ruta = _ruta(estado["liga"], estado["anio"])
+    tmp = ruta.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(estado, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, ruta)
+
+
+# --- Aplicación de resultados ---
+
+def _equipo(estado, nombre):
+    return estado["equipos"].setdefault(nombre, {
+        "pj": 0, "pg": 0, "pe": 0, "pp": 0, "gf": 0, "gc": 0, "gv": 0, "pts": 0})
+
+
+def _sumar(estado, local, visitante, goles_local, goles_visitante, signo=1):
+    """Suma (signo=1) o descuenta (signo=-1) un resultado en las estadísticas."""
+    local_s, visitante_s = _equipo(estado, local), _equipo(estado, visitante)
+    for equipo, favor, contra in ((local_s, goles_local, goles_visitante), (visitante_s, goles_visitante, goles_local)):
+        equipo["pj"] += signo
+        equipo["gf"] += signo * favor
+        equipo["gc"] += signo * contra
+        if favor > contra:
+            equipo["pg"] += signo
+            equipo["pts"] += signo * 3
+        elif favor == contra:
+            equipo["pe"] += signo
+            equipo["pts"] += signo
+        else:
+            equipo["pp"] += signo
+    visitante_s["gv"] += signo * goles_visitante
+
+
+def aplicar_resultado(estado, partido):
+    """
+    Suma un partido finalizado a la tabla. Si ya estaba aplicado con otro
+    marcador (resultado corregido), descuenta el anterior y aplica el nuevo.
+    Devuelve False si no hubo cambios o si no es un resultado válido
+    (suspendido, sin marcador...).
+    """
+    if not partido.get("completado"):
+        return False
+    try:
+        goles_local, goles_visitante = int(partido["goles_local"]), int(partido["goles_visitante"])
+    except (TypeError, ValueError):
+        return False
+
+    nuevo = [partido["local"], partido["visitante"], goles_local, goles_visitante]
+    anterior = estado["partidos"].get(partido["id"])
+    if anterior == nuevo:
+        return False
+    if anterior:
+        _sumar(estado, *anterior, signo=-1)
+    _sumar(estado, *nuevo)
+
+    estado["partidos"][partido["id"]] = nuevo
+    dia = fecha_local(partido)
+    if not estado["ultima_fecha"] or dia > estado["ultima_fecha"]:
+        estado["ultima_fecha"] = dia
+    return True
+
+
+def actualizar(liga=LIGA, completo=False, margen_dias=MARGEN_DIAS):
+    """Descarga los resultados nuevos y los aplica. Devuelve (estado, aplicados)."""
+    hoy = datetime.now(ZONA_HORARIA_CHILE)
+    estado = estado_vacio(liga, hoy.year) if completo else cargar_estado(liga, hoy.year)
+
+    if estado["ultima_fecha"]:
+        desde = datetime.strptime(estado["ultima_fecha"], '%Y-%m-%d') - timedelta(days=margen_dias)
+        hasta = hoy
+    else:
+        # Primera carga: todo el fixture del año, también los partidos por jugar
+        desde, hasta = datetime(hoy.year, 1, 1), datetime(hoy.year, 12, 31)
+
+    equipos_antes, aplicados = len(estado["equipos"]), 0
+    for partido in sorted(descargar_eventos(liga, desde, hasta, limite=LIMITE_TEMPORADA), key=lambda p: p["fecha"]):
+        # Todo equipo del fixture entra a la tabla, aunque no haya jugado
+        _equipo(estado, partido["local"])
+        _equipo(estado, partido["visitante"])
+        aplicados += aplicar_resultado(estado, partido)
+    if aplicados or completo or len(estado["equipos"]) != equipos_antes:
+        guardar_estado(estado)
+    return estado, aplicados
+
+
+# --- Orden ---
+
+def _clave_general(item):
+    _, s = item
+    return (-s["pts"], -(s["gf"] - s["gc"]), -s["gf"], -s["gv"])
+
+
+def _puntos_entre(estado, equipos):
+    """Puntos obtenidos solo en los partidos jugados entre `equipos`."""
+    puntos = dict.fromkeys(equipos, 0)
+    for local, visitante, gl, gv in estado["partidos"].values():
+        if local in puntos and visitante in puntos:
+            if gl > gv:
+                puntos[local] += 3
+            elif gl < gv:
+                puntos[visitante] += 3
+            else:
+                puntos[local] += 1
+                puntos[visitante] += 1
+    return puntos
+
+
+def zona(posicion):
+    if posicion <= ZONA_LIBERTADORES:
+        return "libertadores"
+    if posicion <= ZONA_SUDAMERICANA:
+        return "sudamericana"
+    if posicion >= INICIO_DESCENSO:
+        return "descenso"
+    return None
+
+
+def tabla(estado):
+    """Filas ordenadas: {'posicion', 'equipo', 'pj', ..., 'dg', 'pts', 'zona'}."""
+    ordenados = sorted(estado["equipos"].items(), key=_clave_general)
+
+    # Los bloques empatados en todos los criterios generales se desempatan por enfrentamiento directo
+    resultado, i = [], 0
+    while i < len(ordenados):
+        j = i + 1
+        while j < len(ordenados) and _clave_general(ordenados[j]) == _clave_general(ordenados[i]):
+            j += 1
+        bloque = ordenados[i:j]
+        if len(bloque) > 1:
+            directos = _puntos_entre(estado, [nombre for nombre, _ in bloque])
+            bloque.sort(key=lambda item: (-directos[item[0]], item[0]))
+        resultado.extend(bloque)
+        i = j
+
+    return [{"posicion": pos, "equipo": nombre, **s, "dg": s["gf"] - s["gc"], "zona": zona(pos)}
+            for pos, (nombre, s) in enumerate(resultado, start=1)]
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    try:
+        estado, _ = actualizar(completo='--completo' in sys.argv)
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(tabla(estado), ensure_ascii=False))
@@ -6,11 +6,12 @@ import sys
 import io
 import json
 import os
+import re
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+import cola_random
 
 # Headers estándar para evitar bloqueos
 DEFAULT_HEADERS = {
@@ -21,18 +22,35 @@ DEFAULT_HEADERS = {
 NASA_API_KEY = os.getenv('NASA_API_KEY', 'DEMO_KEY')
 REQUEST_TIMEOUT = 10  # segundos
 
-# Resolver path dinámico del JSON
+# Resolver path dinámico del proyecto
 SCRIPT_DIR = Path(__file__).parent.parent.parent
-GEEK_TERMS_PATH = SCRIPT_DIR / 'src' / 'data' / 'terminos_geek.json'
 
 # Cache y reintentos
 import time
+import queue
+import threading
 
 CARTELERA_CACHE_PATH = SCRIPT_DIR / 'temp' / 'cartelera_cache.json'
 CARTELERA_TTL = 6 * 60 * 60  # 6 horas
 RETRIES = 3
 BACKOFF_FACTOR = 1.5
 
+# Ejecución concurrente de fuentes
+HEDGE_PARALLEL = 3          # fuentes corriendo a la vez
+HEDGE_DEADLINE = 20         # segundos (el proceso Node corta a los 30)
+SOURCE_STATS_PATH = SCRIPT_DIR / 'temp' / 'random_source_stats.json'
+STATS_WINDOW = 10
+STATS_MIN_SAMPLES = 4
+MAX_FAILURE_RATE = 0.7
+PROBE_PROBABILITY = 0.1
+
+# Chat que pide el dato (ciclo sin repetición del término geek)
+CHAT = 'global'
+
+def escapar_markdown(texto):
+    """Escapa el Markdown de Telegram en textos de APIs externas que van dentro de un caption."""
+    return re.sub(r'([_*`\[])', r'\\\1', str(texto))
+
 def requests_get_with_retries(url, **kwargs):
     """Wrapper de requests.get con reintentos exponenciales."""
     timeout = kwargs.pop('timeout', REQUEST_TIMEOUT)
@@ -117,7 +135,7 @@ def get_nasa_apod():
             timeout=REQUEST_TIMEOUT
         )
         data = response.json()
-        title = data.get('title', 'Foto astronómica')
+        title = escapar_markdown(data.get('title', 'Foto astronómica'))
         explanation = data.get('explanation', 'Sin descripción')
         media_url = data.get('hdurl') or data.get('url')
         
@@ -125,7 +143,7 @@ def get_nasa_apod():
             return None
             
         # Limitar explicación a 500 caracteres
-        explanation = explanation[:500] + '...' if len(explanation) > 500 else explanation
+        explanation = escapar_markdown(explanation[:500] + '...' if len(explanation) > 500 else explanation)
         
         return {
             "type": "image",
@@ -251,7 +269,7 @@ def get_trago_del_dia():
         if not trago:
             return None
         
-        nombre = trago.get('strDrink', 'Cóctel')
+        nombre = escapar_markdown(trago.get('strDrink', 'Cóctel'))
         ingredientes = []
         
         for i in range(1, 16):
@@ -259,9 +277,9 @@ def get_trago_del_dia():
             medida = trago.get(f'strMeasure{i}')
             if ingrediente and ingrediente.strip():
                 medida_str = medida.strip() if medida else ''
-                ingredientes.append(f"- {medida_str} {ingrediente.strip()}")
+                ingredientes.append(escapar_markdown(f"- {medida_str} {ingrediente.strip()}"))
         
-        instrucciones = trago.get('strInstructionsES') or trago.get('strInstructions', 'Sin instrucciones')
+        instrucciones = escapar_markdown(trago.get('strInstructionsES') or trago.get('strInstructions', 'Sin instrucciones'))
         thumb = trago.get('strDrinkThumb')
         
         if not thumb or not ingredientes:
@@ -276,27 +294,8 @@ def get_trago_del_dia():
         return None
 
 def get_termino_geek():
-    """Lee el archivo JSON local y devuelve un término geek al azar."""
-    try:
-        if not GEEK_TERMS_PATH.exists():
-            return None
-        
-        with open(GEEK_TERMS_PATH, 'r', encoding='utf-8') as f:
-            terminos = json.load(f)
-        
-        if not terminos:
-            return None
-        
-        termino_elegido = random.choice(terminos)
-        termino = termino_elegido.get('termino', 'Término')
-        definicion = termino_elegido.get('definicion', 'Sin definición')
-        
-        return {
-            "type": "text",
-            "caption": f"💻 *Término Geek: {termino}*\n\n{definicion}"
-        }
-    except (FileNotFoundError, json.JSONDecodeError, KeyError, IndexError):
-        return None
+    """Devuelve un término geek del dataset local, sin repetir hasta completar el ciclo del chat."""
+    return cola_random.termino_geek(CHAT)
 
 def get_xkcd_comic():
     """Obtiene un cómic aleatorio de XKCD."""
@@ -319,7 +318,7 @@ def get_xkcd_comic():
         )
         comic_data = response_comic.json()
         
-        title = comic_data.get('safe_title', 'Cómic XKCD')
+        title = escapar_markdown(comic_data.get('safe_title', 'Cómic XKCD'))
         img = comic_data.get('img')
         
         if not img:
@@ -334,7 +333,91 @@ def get_xkcd_comic():
         return None
 
 
+# --- EJECUCIÓN CON COBERTURA (HEDGING) ---
+
+def read_source_stats():
+    try:
+        return json.loads(SOURCE_STATS_PATH.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+
+def write_source_stats(stats):
+    try:
+        SOURCE_STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = SOURCE_STATS_PATH.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(stats), encoding='utf-8')
+        os.replace(tmp, SOURCE_STATS_PATH)
+    except Exception:
+        pass
+
+def record_outcome(stats, name, ok):
+    """Guarda los últimos STATS_WINDOW resultados (1 = éxito, 0 = fallo) de una fuente."""
+    history = stats.get(name, [])
+    history.append(1 if ok else 0)
+    stats[name] = history[-STATS_WINDOW:]
+
+def is_healthy(stats, name):
+    """Una fuente con muchos fallos recientes se salta, salvo un sondeo ocasional."""
+    history = stats.get(name, [])
+    if len(history) < STATS_MIN_SAMPLES:
+        return True
+    failure_rate = 1 - sum(history) / len(history)
+    return failure_rate <= MAX_FAILURE_RATE or random.random() < PROBE_PROBABILITY
+
+def _run_source(funcion, results):
+    try:
+        results.put((funcion, funcion()))
+    except Exception:
+        results.put((funcion, None))
+
+def run_hedged(opciones, stats, parallel=HEDGE_PARALLEL, deadline=HEDGE_DEADLINE):
+    """
+    Lanza `parallel` fuentes a la vez y devuelve el primer resultado válido.
+    Cada fuente que falla se reemplaza por la siguiente de la lista. Los hilos son
+    daemon, así que las fuentes que siguen corriendo se abandonan al terminar;
+    esas cuentan como fallo (no entregaron a tiempo), para que una fuente que se
+    cuelga termine marcada como no saludable.
+    """
+    pendientes = list(opciones)
+    results = queue.Queue()
+    en_curso = set()
+    limite = time.monotonic() + deadline
+
+    def lanzar():
+        funcion = pendientes.pop(0)
+        threading.Thread(target=_run_source, args=(funcion, results), daemon=True).start()
+        en_curso.add(funcion)
+
+    while pendientes and len(en_curso) < parallel:
+        lanzar()
+
+    resultado = None
+    while en_curso:
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            break
+        try:
+            funcion, resultado = results.get(timeout=restante)
+        except queue.Empty:
+            break
+        en_curso.discard(funcion)
+        record_outcome(stats, funcion.__name__, bool(resultado))
+        if resultado:
+            break
+        if pendientes:
+            lanzar()
+
+    for funcion in en_curso:
+        record_outcome(stats, funcion.__name__, False)
+    return resultado or None
+
+
 if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    # Uso: python random_info.py [chat]
+    if len(sys.argv) > 1:
+        CHAT = sys.argv[1]
+
     opciones = [
         get_efemeride, get_fun_fact, get_nasa_apod, get_quote_of_the_day,
         get_cartelera_cine, get_geek_joke, get_trago_del_dia, get_termino_geek,
@@ -342,12 +425,11 @@ if __name__ == "__main__":
     ]
     
     random.shuffle(opciones)
-    
-    resultado = None
-    for funcion in opciones:
-        resultado = funcion()
-        if resultado:
-            break
+
+    stats = read_source_stats()
+    saludables = [f for f in opciones if is_healthy(stats, f.__name__)] or opciones
+    resultado = run_hedged(saludables, stats)
+    write_source_stats(stats)
     
     if resultado:
         print(json.dumps(resultado, ensure_ascii=False))
@@ -356,4 +438,4 @@ if __name__ == "__main__":
         print(json.dumps({
             "type": "text", 
             "caption": "No pude encontrar un dato aleatorio en este momento, ¡qué mala suerte!"
-        }, ensure_ascii=False))
\ No newline at end of file
+        }, ensure_ascii=False))
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Seguimiento en vivo de los partidos del día (ESPN scoreboard).
+
+Un único bucle asyncio consulta todas las ligas de partidos.py, compara cada
+snapshot con el anterior y emite un evento NDJSON por línea en stdout:
+
+    {"tipo": "inicio" | "gol" | "roja" | "final", "liga", "partido",
+     "local", "visitante", "marcador", "minuto", "mensaje"}
+
+El intervalo se adapta al estado: INTERVALO_EN_VIVO mientras haya partidos en
+juego, hasta el próximo pitazo inicial (con tope INTERVALO_PREVIO) si solo hay
+partidos por jugar, y el proceso termina cuando todos los del día finalizaron.
+La primera consulta solo fija la línea base, así que reiniciar el proceso a
+mitad de un partido no repite goles ya anunciados.
+
+Uso:
+    python seguimiento_partidos.py
+"""
+import sys
+import io
+import json
+import asyncio
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from partidos import LIGAS, ESPN_URL, ZONA_HORARIA_CHILE, normalizar_evento, fecha_local
+
+INTERVALO_EN_VIVO = 30          # segundos
+INTERVALO_PREVIO = 10 * 60      # tope de espera antes de un partido
+INTERVALO_MINIMO = 30
+ANTICIPO_INICIO = 60            # se empieza a consultar 1 minuto antes del pitazo
+TIMEOUT = aiohttp.ClientTimeout(total=15)
+
+
+# --- Consulta ---
+
+async def consultar_liga(session, nombre, codigo, hoy):
+    """Partidos de hoy (hora de Chile) de una liga; [] si la consulta falla."""
+    # Los partidos nocturnos en Chile caen al día siguiente en UTC
+    rango = f"{hoy.strftime('%Y%m%d')}-{(hoy + timedelta(days=1)).strftime('%Y%m%d')}"
+    try:
+        async with session.get(ESPN_URL.format(liga=codigo), params={"dates": rango}) as response:
+            response.raise_for_status()
+            datos = await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+    dia = hoy.strftime('%Y-%m-%d')
+    partidos = []
+    for evento in datos.get("events", []):
+        try:
+            partido = normalizar_evento(evento)
+        except (KeyError, IndexError):
+            continue
+        if fecha_local(partido) == dia or partido["estado"] == "in":
+            partido["liga"] = nombre
+            partidos.append(partido)
+    return partidos
+
+
+async def consultar_todas(session, hoy):
+    """{id: partido} de todas las ligas. Una liga caída no borra su estado previo."""
+    resultados = await asyncio.gather(*(consultar_liga(session, nombre, codigo, hoy)
+                                        for nombre, codigo in LIGAS.items()))
+    caidas = {nombre for nombre, r in zip(LIGAS, resultados) if r is None}
+    return {p["id"]: p for r in resultados if r for p in r}, caidas
+
+
+# --- Comparación de snapshots ---
+
+def _clave_detalle(detalle):
+    atletas = ",".join(a.get("displayName", "") for a in detalle.get("athletesInvolved", []))
+    return (detalle.get("type", {}).get("id"), detalle.get("clock", {}).get("displayValue"), atletas)
+
+
+def _evento(tipo, partido, mensaje, minuto=None):
+    return {
+        "tipo": tipo,
+        "liga": partido["liga"],
+        "partido": partido["id"],
+        "local": partido["local"],
+        "visitante": partido["visitante"],
+        "marcador": f"{partido['goles_local']}-{partido['goles_visitante']}",
+        "minuto": minuto or partido.get("reloj"),
+        "mensaje": mensaje,
+    }
+
+
+def _marcador(partido):
+    return f"*{partido['local']}* {partido['goles_local']} - {partido['goles_visitante']} *{partido['visitante']}*"
+
+
+def comparar(anterior, actual):
+    """Eventos ocurridos entre dos snapshots del mismo partido."""
+    eventos = []
+    if anterior["estado"] == "pre" and actual["estado"] != "pre":
+        eventos.append(_evento("inicio", actual, f"🟢 ¡Comenzó! *{actual['local']}* vs *{actual['visitante']}*"))
+
+    vistos = {_clave_detalle(d) for d in anterior.get("detalles", [])}
+    nuevos = [d for d in actual.get("detalles", []) if _clave_detalle(d) not in vistos]
+
+    # Goles: manda el marcador; los detalles solo aportan autor y minuto
+    goles_detalle = [d for d in nuevos if d.get("scoringPlay")]
+    for lado, equipo_id in (("local", actual.get("id_local")), ("visitante", actual.get("id_visitante"))):
+        try:
+            diferencia = int(actual[f"goles_{lado}"]) - int(anterior[f"goles_{lado}"])
+        except (TypeError, ValueError):
+            continue
+        del_equipo = [d for d in goles_detalle if d.get("team", {}).get("id") == equipo_id]
+        for i in range(max(diferencia, 0)):
+            detalle = del_equipo[i] if i < len(del_equipo) else {}
+            minuto = detalle.get("clock", {}).get("displayValue")
+            autor = ", ".join(a.get("displayName", "") for a in detalle.get("athletesInvolved", []))
+            extra = f" — {autor}" if autor else ""
+            extra += f" _({minuto})_" if minuto else ""
+            eventos.append(_evento("gol", actual, f"⚽ ¡Gol de {actual[lado]}!{extra}\n{_marcador(actual)}", minuto))
+
+    for detalle in nuevos:
+        if not detalle.get("redCard"):
+            continue
+        minuto = detalle.get("clock", {}).get("displayValue")
+        equipo = actual["local"] if detalle.get("team", {}).get("id") == actual.get("id_local") else actual["visitante"]
+        jugador = ", ".join(a.get("displayName", "") for a in detalle.get("athletesInvolved", [])) or equipo
+        eventos.append(_evento("roja", actual, f"🟥 Roja para {jugador} ({equipo}) _({minuto})_", minuto))
+
+    if anterior["estado"] != "post" and actual["estado"] == "post":
+        eventos.append(_evento("final", actual, f"🏁 Final: {_marcador(actual)}"))
+    return eventos
+
+
+def proxima_espera(partidos, ahora):
+    """Segundos hasta la próxima consulta, o None si ya no queda nada por seguir."""
+    if any(p["estado"] == "in" for p in partidos):
+        return INTERVALO_EN_VIVO
+    inicios = [datetime.fromisoformat(p["fecha"].replace('Z', '+00:00'))
+               for p in partidos if p["estado"] == "pre"]
+    if not inicios:
+        return None
+    faltan = (min(inicios) - ahora).total_seconds() - ANTICIPO_INICIO
+    return max(INTERVALO_MINIMO, min(faltan, INTERVALO_PREVIO))
+
+
+def emitir(evento):
+    print(json.dumps(evento, ensure_ascii=False), flush=True)
+
+
+# --- Bucle principal ---
+
+async def seguir():
+    connector = aiohttp.TCPConnector(limit_per_host=len(LIGAS))
+    async with aiohttp.ClientSession(connector=connector, timeout=TIMEOUT) as session:
+        snapshot = None
+        while True:
+            hoy = datetime.now(ZONA_HORARIA_CHILE)
+            actual, caidas = await consultar_todas(session, hoy)
+
+            if snapshot is not None:
+                for id_partido, partido in actual.items():
+                    if id_partido in snapshot:
+                        for evento in comparar(snapshot[id_partido], partido):
+                            emitir(evento)
+                # Se conserva el último estado conocido de las ligas que fallaron
+                actual.update({k: p for k, p in snapshot.items() if p["liga"] in caidas and k not in actual})
+            elif caidas == set(LIGAS):
+                await asyncio.sleep(INTERVALO_EN_VIVO)
+                continue
+            snapshot = actual
+
+            espera = proxima_espera(list(actual.values()), hoy)
+            if espera is None:
+                return
+            await asyncio.sleep(espera)
+
+
+if __name__ == "__main__":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    try:
+        asyncio.run(seguir())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Caché de snapshots diarios para fuentes que cambian una vez al día.
+
+Cada fuente guarda un JSON por fecha (hora de Chile) en temp/snapshots/.
+Los scripts de horóscopo scrapean la página una sola vez, guardan todos los
+signos y responden cualquier consulta del mismo día desde el archivo.
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+SNAPSHOTS_DIR = PROJECT_ROOT / 'temp' / 'snapshots'
+ZONA_HORARIA_CHILE = ZoneInfo('America/Santiago')
+DIAS_A_CONSERVAR = 7
+
+
+def fecha_hoy():
+    return datetime.now(ZONA_HORARIA_CHILE).strftime('%Y-%m-%d')
+
+
+def _ruta(fuente, fecha):
+    return SNAPSHOTS_DIR / f"{fuente}_{fecha}.json"
+
+
+def leer(fuente, fecha=None):
+    """Devuelve el snapshot de la fuente para la fecha (hoy por defecto) o None."""
+    try:
+        return json.loads(_ruta(fuente, fecha or fecha_hoy()).read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def guardar(fuente, datos, fecha=None):
+    """Guarda el snapshot de forma atómica y elimina los de días antiguos."""
+    fecha = fecha or fecha_hoy()
+    try:
+        SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+        ruta = _ruta(fuente, fecha)
+        tmp = ruta.with_suffix('.tmp')
+        tmp.write_text(json.dumps(datos, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, ruta)
+
+        antiguos = sorted(SNAPSHOTS_DIR.glob(f"{fuente}_*.json"))[:-DIAS_A_CONSERVAR]
+        for archivo in antiguos:
+            archivo.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def obtener(fuente, generar):
+    """
+    Snapshot del día para la fuente; si no existe lo crea llamando a `generar()`.
+    Solo se guarda si `generar()` devuelve datos (un dict no vacío).
+    """
+    datos = leer(fuente)
+    if datos:
+        return datos
+    datos = generar()
+    if datos:
+        guardar(fuente, datos)
+    return datos
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Pruebas de la tabla local (python -m pytest scripts/python/test_posiciones.py)
+import posiciones
+
+
+def _partido(id_partido, local, visitante, goles_local, goles_visitante):
+    return {"id": id_partido, "fecha": "2026-03-01T20:00Z", "local": local, "visitante": visitante,
+            "goles_local": str(goles_local), "goles_visitante": str(goles_visitante), "completado": True}
+
+
+def test_resultado_corregido_reemplaza_al_anterior():
+    estado = posiciones.estado_vacio("chi.1", 2026)
+    assert posiciones.aplicar_resultado(estado, _partido("1", "Colo-Colo", "U. de Chile", 2, 1))
+
+    # ESPN corrige el marcador: 2-2
+    assert posiciones.aplicar_resultado(estado, _partido("1", "Colo-Colo", "U. de Chile", 2, 2))
+
+    colo, u = estado["equipos"]["Colo-Colo"], estado["equipos"]["U. de Chile"]
+    assert colo == {"pj": 1, "pg": 0, "pe": 1, "pp": 0, "gf": 2, "gc": 2, "gv": 0, "pts": 1}
+    assert u == {"pj": 1, "pg": 0, "pe": 1, "pp": 0, "gf": 2, "gc": 2, "gv": 2, "pts": 1}
+    assert estado["partidos"]["1"] == ["Colo-Colo", "U. de Chile", 2, 2]
+
+
+def test_mismo_resultado_no_se_aplica_dos_veces():
+    estado = posiciones.estado_vacio("chi.1", 2026)
+    assert posiciones.aplicar_resultado(estado, _partido("1", "Colo-Colo", "U. de Chile", 1, 0))
+    assert not posiciones.aplicar_resultado(estado, _partido("1", "Colo-Colo", "U. de Chile", 1, 0))
+    assert estado["equipos"]["Colo-Colo"]["pj"] == 1
+    assert estado["equipos"]["Colo-Colo"]["pts"] == 3
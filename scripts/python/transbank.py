@@ -1,23 +1,61 @@
 # -*- coding: utf-8 -*-
 """
 Script optimizado para obtener estado de Transbank.
-Sin caché local (delegado a Node.js), con soporte de zona horaria y manejo de errores.
+
+Usa la API JSON de Statuspage (/api/v2/summary.json e incidents.json) con
+peticiones condicionales (ETag / Last-Modified): si nada cambió el servidor
+responde 304 y se reutiliza la última respuesta guardada. Solo si la API
+falla se recurre al scraping del HTML.
+
+Cada consulta compara el estado de los componentes con el anterior y
+registra las transiciones en temp/transbank/estado.json. Con --json se
+imprimen solo esos cambios (para el monitoreo automático de Node.js).
+
+La API y el HTML no nombran igual los componentes, así que cada línea base
+guarda de qué fuente viene y no se comparan estados de fuentes distintas: al
+cambiar de fuente la línea base se reinicia sin reportar cambios. La red se
+consulta fuera del lock; la lectura-modificación-escritura del estado va
+bajo el lock de bloqueo.py.
+
+Uso:
+    python transbank.py               -> texto para el chat
+    python transbank.py --json        -> {"cambios": [...], "caidos": [...]}
+    python transbank.py --incidentes  -> incidentes recientes
 """
 import sys
+import os
 import json
+import time
 import requests
 from bs4 import BeautifulSoup
 import io
 from datetime import datetime
+from pathlib import Path
 from zoneinfo import ZoneInfo
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-# Configurar salida UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from bloqueo import bloqueo
 
 # Configuración
 URL_TRANSBANK = 'https://status.transbankdevelopers.cl/'
+URL_SUMMARY = URL_TRANSBANK + 'api/v2/summary.json'
+URL_INCIDENTS = URL_TRANSBANK + 'api/v2/incidents.json'
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+ESTADO_PATH = PROJECT_ROOT / 'temp' / 'transbank' / 'estado.json'
+MAX_HISTORIAL = 200
+MAX_INCIDENTES = 5
+
+# Estados de la API -> textos que muestra la página (y que usa el formato de salida)
+ESTADOS_API = {
+    'operational': 'Operational',
+    'degraded_performance': 'Degraded Performance',
+    'partial_outage': 'Partial Outage',
+    'major_outage': 'Major Outage',
+    'under_maintenance': 'Under Maintenance',
+}
+
 # Requests session con reintentos
 SESSION = requests.Session()
 RETRY_STRAT = Retry(
@@ -31,8 +69,63 @@ SESSION.mount("https://", ADAPTER)
 SESSION.mount("http://", ADAPTER)
 SESSION.headers.update({'User-Agent': 'Botillero/2.0'})
 
+# --- Estado local ---
+
+def leer_estado():
+    try:
+        estado = json.loads(ESTADO_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        estado = {}
+    estado.setdefault('cache', {})         # url -> {etag, last_modified, cuerpo}
+    estado.setdefault('fuente', None)      # 'api' o 'html' de `componentes`
+    estado.setdefault('componentes', {})   # servicio -> estado
+    estado.setdefault('historial', [])     # transiciones
+    return estado
+
+def guardar_estado(estado):
+    ESTADO_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ESTADO_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps(estado, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, ESTADO_PATH)
+
+# --- Obtención ---
+
+def get_json_condicional(url, estado):
+    """GET con If-None-Match / If-Modified-Since; ante un 304 devuelve el cuerpo guardado."""
+    previo = estado['cache'].get(url, {})
+    headers = {}
+    if previo.get('etag'):
+        headers['If-None-Match'] = previo['etag']
+    if previo.get('last_modified'):
+        headers['If-Modified-Since'] = previo['last_modified']
+
+    response = SESSION.get(url, headers=headers, timeout=10)
+    if response.status_code == 304 and 'cuerpo' in previo:
+        return previo['cuerpo']
+    response.raise_for_status()
+    cuerpo = response.json()
+    estado['cache'][url] = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'cuerpo': cuerpo,
+    }
+    return cuerpo
+
+def get_transbank_status_api(estado):
+    """Estados desde summary.json: ({servicio: estado}, incidentes sin resolver)."""
+    resumen = get_json_condicional(URL_SUMMARY, estado)
+    status_map = {}
+    for componente in resumen.get('components', []):
+        # Los grupos solo agrupan componentes; su estado es el peor de sus hijos
+        if componente.get('group'):
+            continue
+        status_map[componente['name']] = ESTADOS_API.get(componente.get('status'), componente.get('status', ''))
+    if not status_map:
+        raise Exception('La API no devolvió componentes')
+    return status_map, resumen.get('incidents', [])
+
 def get_transbank_status():
-    """Obtiene el estado de los servicios haciendo scraping."""
+    """Obtiene el estado de los servicios haciendo scraping (respaldo de la API)."""
     try:
         response = SESSION.get(URL_TRANSBANK, timeout=10)
         response.raise_for_status()
@@ -65,51 +158,144 @@ def get_transbank_status():
     except Exception as e:
         raise e
 
+def consultar(estado):
+    """Estado actual (API y, si falla, HTML), incidentes activos y fuente usada."""
+    try:
+        return (*get_transbank_status_api(estado), 'api')
+    except Exception:
+        return get_transbank_status(), [], 'html'
+
+def diferencias(anteriores, actuales, ts):
+    """Transiciones {servicio, anterior, actual, ts} entre dos mapas de estados."""
+    cambios = [
+        {'servicio': servicio, 'anterior': anteriores.get(servicio), 'actual': actual, 'ts': ts}
+        for servicio, actual in actuales.items()
+        if anteriores.get(servicio) != actual
+    ]
+    cambios += [
+        {'servicio': servicio, 'anterior': anterior, 'actual': None, 'ts': ts}
+        for servicio, anterior in anteriores.items()
+        if servicio not in actuales
+    ]
+    return cambios
+
+def registrar_cambios(estado, status_map, fuente):
+    """Agrega al historial las transiciones respecto de la consulta anterior (de la misma fuente)."""
+    cambios = []
+    if estado['fuente'] == fuente:
+        cambios = diferencias(estado['componentes'], status_map, time.time())
+    estado['fuente'] = fuente
+    estado['componentes'] = status_map
+    estado['historial'] = (estado['historial'] + cambios)[-MAX_HISTORIAL:]
+    return cambios
+
+def cambios_monitor(estado, status_map, fuente):
+    """
+    Transiciones desde la última consulta del monitoreo (--json). Lleva su
+    propia línea base para que un !transbank manual entre medio no le
+    "consuma" un cambio.
+    """
+    base = estado.get('monitor') or {}
+    cambios = []
+    if base.get('fuente') == fuente:
+        cambios = diferencias(base.get('componentes', {}), status_map, time.time())
+    estado['monitor'] = {'fuente': fuente, 'componentes': status_map}
+    return cambios
+
+def guardar_consulta(consultado, aplicar=None):
+    """
+    Vuelca en el estado del disco las respuestas cacheadas de `consultado` y
+    aplica `aplicar(estado)`, todo bajo el lock. Devuelve lo que devuelva
+    `aplicar`.
+    """
+    with bloqueo(ESTADO_PATH):
+        estado = leer_estado()
+        estado['cache'].update(consultado['cache'])
+        resultado = aplicar(estado) if aplicar else None
+        guardar_estado(estado)
+    return resultado
+
+# --- Salidas ---
+
+def formatear_texto(data, incidentes):
+    # Formato texto para WhatsApp
+    output = "*Estado de Servicios Transbank*\n\n"
+
+    # Normalizar estados comunes
+    for service, status in data.items():
+        normalized = {
+            'Operational': 'OK',
+            'Degraded Performance': 'WARN',
+            'Partial Outage': 'WARN',
+            'Major Outage': 'DOWN',
+            'Under Maintenance': 'MAINT',
+            'Investigating': 'WARN'
+        }.get(status, 'UNKNOWN')
+
+        emoji_map = {
+            'OK': '✅',
+            'WARN': '⚠️',
+            'DOWN': '❌',
+            'MAINT': '🛠️',
+            'UNKNOWN': '❓'
+        }
+        emoji = emoji_map.get(normalized, '❓')
+        output += f"{emoji} {service}: {status}\n"
+
+    if incidentes:
+        output += "\n*Incidentes activos*\n"
+        for incidente in incidentes:
+            output += f"🔸 {incidente.get('name')} _({incidente.get('status')})_\n"
+
+    # Fecha en hora de Chile
+    now_chile = datetime.now(ZoneInfo('America/Santiago'))
+    timestamp = now_chile.strftime('%Y-%m-%d %H:%M:%S')
+    output += f"\nActualizado: {timestamp}"
+    return output
+
+def formatear_incidentes(estado):
+    incidentes = get_json_condicional(URL_INCIDENTS, estado).get('incidents', [])[:MAX_INCIDENTES]
+    if not incidentes:
+        return "No hay incidentes recientes de Transbank."
+    output = "*Incidentes recientes de Transbank*\n"
+    for incidente in incidentes:
+        fecha = (incidente.get('created_at') or '')[:10]
+        output += f"\n🔸 *{incidente.get('name')}* ({fecha})\nEstado: {incidente.get('status')}\n"
+    return output.strip()
+
 def main():
+    # Configurar salida UTF-8
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     try:
-        json_output = '--json' in sys.argv
-        data = get_transbank_status()
-        
-        if json_output:
-            # Salida JSON pura para el monitoreo automático
-            print(json.dumps(data, ensure_ascii=False))
+        # Lectura sin lock: solo se usa para las cabeceras condicionales
+        estado = leer_estado()
+
+        if '--incidentes' in sys.argv:
+            texto = formatear_incidentes(estado)
+            guardar_consulta(estado)
+            print(texto)
+            return
+
+        data, incidentes, fuente = consultar(estado)
+
+        if '--json' in sys.argv:
+            # Salida JSON para el monitoreo automático: solo las transiciones
+            def aplicar(actual):
+                registrar_cambios(actual, data, fuente)
+                return cambios_monitor(actual, data, fuente)
+
+            cambios = guardar_consulta(estado, aplicar)
+            caidos = [s for s, st in data.items() if st == 'Major Outage']
+            print(json.dumps({'cambios': cambios, 'caidos': caidos}, ensure_ascii=False))
             return
 
-        # Formato texto para WhatsApp
-        output = "*Estado de Servicios Transbank*\n\n"
-        
-        # Normalizar estados comunes
-        for service, status in data.items():
-            normalized = {
-                'Operational': 'OK',
-                'Degraded Performance': 'WARN',
-                'Partial Outage': 'WARN',
-                'Major Outage': 'DOWN',
-                'Under Maintenance': 'MAINT',
-                'Investigating': 'WARN'
-            }.get(status, 'UNKNOWN')
-            
-            emoji_map = {
-                'OK': '✅',
-                'WARN': '⚠️',
-                'DOWN': '❌',
-                'MAINT': '🛠️',
-                'UNKNOWN': '❓'
-            }
-            emoji = emoji_map.get(normalized, '❓')
-            output += f"{emoji} {service}: {status}\n"
-
-        # Fecha en hora de Chile
-        now_chile = datetime.now(ZoneInfo('America/Santiago'))
-        timestamp = now_chile.strftime('%Y-%m-%d %H:%M:%S')
-        output += f"\nActualizado: {timestamp}"
-        
-        print(output)
-        
+        guardar_consulta(estado, lambda actual: registrar_cambios(actual, data, fuente))
+        print(formatear_texto(data, incidentes))
+
     except Exception as e:
         # Imprimir error en stderr y salir con código 1 para que Node.js lo detecte
         print(f"Error: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -6,9 +6,6 @@ import requests
 from datetime import datetime
 import io
 
-# Configurar salida UTF-8 para evitar errores en Windows (Consistente con otros scripts)
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
 # Headers para evitar bloqueos
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
@@ -127,6 +124,9 @@ async def main():
                     print(f"{nombre}: ${formatear_con_decimales(valor)}")
 
 if __name__ == "__main__":
+    # Configurar salida UTF-8 para evitar errores en Windows (Consistente con otros scripts)
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     # Fix para Windows y asyncio
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
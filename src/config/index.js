@@ -7,7 +7,8 @@ dotenv.config({ path: path.resolve(__dirname, '..', '..', '.env') });
 // --- Validación de Variables de Entorno ---
 const requiredEnvVars = {
   'OPENWEATHER_API_KEY': 'Información del clima (comando !clima)',
-  'TELEGRAM_BOT_TOKEN': 'Token del bot de Telegram'
+  'TELEGRAM_BOT_TOKEN': 'Token del bot de Telegram',
+  'CNE_TOKEN': 'Precios de bencina de la CNE (comando !bencina)'
 };
 
 const missingVars = [];
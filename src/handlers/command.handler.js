@@ -14,6 +14,10 @@ const services = {
     get horoscope() { return require('../services/horoscope.service'); },
     get league() { return require('../services/league.service.js'); },
     get transbank() { return require('../services/transbank.service.js'); },
+    get external() { return require('../services/external.service'); },
+    get alert() { return require('../services/alert.service'); },
+    get matchTracker() { return require('../services/match-tracker.service'); },
+    get mediaCache() { return require('../services/media-cache.service'); },
     get system() { return require('./system.handler'); },
     get utility() { return require('./utility.handler'); },
     get fun() { return require('./fun.handler'); },
@@ -62,12 +66,11 @@ async function handleTransbankWithCooldown() {
 }
 
 async function handleRandomCommand(client, message) {
-    const randomData = await services.utility.handleRandom();
+    const randomData = await services.utility.handleRandom(message);
     
     if (randomData.type === 'image' && randomData.media_url) {
         try {
-            const media = await MessageMedia.fromUrl(randomData.media_url);
-            await client.sendMessage(message.from, media, { caption: randomData.caption });
+            await services.mediaCache.sendCachedImage(client, message, randomData.media_url, randomData.caption);
         } catch (err) {
             console.error("Error al enviar imagen random:", err);
             await message.reply(randomData.caption + "\n\n(No pude cargar la imagen 😢)");
@@ -78,6 +81,42 @@ async function handleRandomCommand(client, message) {
     return randomData.caption;
 }
 
+async function handleIndicatorChart(message) {
+    const [, serie, dias] = message.body.trim().split(/\s+/);
+    if (!serie) {
+        return "Uso: `!grafico <uf|dolar|euro|utm|ipc|ipsa|igpa|...> [dias]`";
+    }
+
+    try {
+        const data = await services.economy.getIndicatorChart(serie.toLowerCase(), parseInt(dias, 10) || 30);
+        const media = new MessageMedia('image/png', data, `${serie}.png`);
+        await message.reply(media);
+    } catch (err) {
+        console.error("Error al generar gráfico:", err.message);
+        await message.reply("No pude generar el gráfico en este momento.");
+    }
+    return null;
+}
+
+/**
+ * `!tabla img`, `!tclasi img` y `!prox img`: la misma información como imagen.
+ * imagen_tablas.py solo redibuja cuando cambian los datos y reutiliza el file_id.
+ */
+function wantsImage(message) {
+    const arg = (message.body.trim().split(/\s+/)[1] || '').toLowerCase();
+    return arg === 'img' || arg === 'imagen';
+}
+
+async function handleStandingsImage(client, message, tipo) {
+    try {
+        await services.mediaCache.sendGeneratedImage(client, message, 'imagen_tablas.py', [tipo]);
+    } catch (err) {
+        console.error(`Error al generar imagen de ${tipo}:`, err.message);
+        await message.reply("No pude generar la imagen en este momento.");
+    }
+    return null;
+}
+
 async function handleStickerToImage(client, message) {
     if (!message.hasQuotedMsg) {
         return 'Debes responder a un sticker para convertirlo en imagen.';
@@ -103,11 +142,15 @@ const commandTypeMap = {
     'partidos': 'sports',
     'tclasi': 'sports',
     'clasi': 'sports',
+    'seguir': 'sports',
     
     // Clima y servicios
     'clima': 'weather',
     'metro': 'metro',
     'valores': 'economy',
+    'historico': 'economy',
+    'grafico': 'economy',
+    'alerta': 'economy',
     'transbank': 'transbank',
     'trstatus': 'transbank',
     'bancos': 'bank',
@@ -135,6 +178,7 @@ const commandTypeMap = {
     'ping': 'system',
     'menu': 'system',
     'feriados': 'system',
+    'habiles': 'system',
     'recap': 'system',
     'sismos': 'earthquake',
     
@@ -145,6 +189,7 @@ const commandTypeMap = {
     // Utilidades
     'bus': 'bus',
     'far': 'pharmacy',
+    'bencina': 'system',
     'sec': 'system',
     'num': 'phone',
     'tne': 'phone',
@@ -189,15 +234,19 @@ const commandAliases = {
 // --- Command Map (Reemplaza el switch gigante) ---
 const commandMap = {
     // Liga/Deportes
-    'tabla': () => services.league.getLeagueTable(),
-    'prox': () => services.league.getLeagueUpcomingMatches(),
+    'tabla': (client, msg) => wantsImage(msg) ? handleStandingsImage(client, msg, 'tabla') : services.league.getLeagueTable(),
+    'prox': (client, msg) => wantsImage(msg) ? handleStandingsImage(client, msg, 'prox') : services.league.getLeagueUpcomingMatches(),
     'partidos': () => services.league.getMatchDaySummary(),
-    'tclasi': () => services.nationalTeam.getQualifiersTable(),
+    'tclasi': (client, msg) => wantsImage(msg) ? handleStandingsImage(client, msg, 'tclasi') : services.nationalTeam.getQualifiersTable(),
     'clasi': () => services.nationalTeam.getQualifiersMatches(),
+    'seguir': (_, msg) => services.matchTracker.handleFollowCommand(msg.from, msg.body.trim().split(/\s+/).slice(1)),
     
     // Servicios públicos
     'metro': () => services.metro.getMetroStatus(),
     'valores': () => services.economy.getEconomicIndicators(),
+    'historico': (_, msg) => services.economy.getIndicatorHistory(msg.body.split(' ').slice(1)),
+    'grafico': (_, msg) => handleIndicatorChart(msg),
+    'alerta': (_, msg) => services.alert.handleAlertCommand(msg.from, msg.body.trim().split(/\s+/).slice(1)),
     'horoscopo': (client, msg) => handleHoroscopeCommand(client, msg, services.horoscope.getHoroscope.bind(services.horoscope)),
     'chino': (client, msg) => handleHoroscopeCommand(client, msg, services.horoscope.getChineseHoroscope.bind(services.horoscope)),
     'trstatus': () => services.transbank.getTransbankStatus(),
@@ -207,7 +256,9 @@ const commandMap = {
     // Sistema y utilidades
     'ping': (_, msg) => services.system.handlePing(msg),
     'feriados': (_, msg) => services.utility.handleFeriados(msg),
+    'habiles': (_, msg) => services.utility.handleDiasHabiles(msg),
     'far': (_, msg) => services.utility.handleFarmacias(msg),
+    'bencina': (_, msg) => services.external.getBencinaData(msg.body.trim().split(/\s+/).slice(1)),
     'clima': (_, msg) => services.utility.handleClima(msg),
     'sismos': () => services.utility.handleSismos(),
     'bus': (client, msg) => services.utility.handleBus(msg, client),
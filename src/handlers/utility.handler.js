@@ -2,120 +2,90 @@
 "use strict";
 
 const axios = require('axios');
-const cheerio = require('cheerio');
 const moment = require('moment-timezone');
 const config = require('../config');
 const { generateMessage } = require('../utils/secService');
 const { getRandomInfo } = require('../services/utility.service');
 // const { getFeriadosResponse } = require('../services/ai.service'); // IA DESHABILITADA
 const { getBanksStatus } = require('../services/bank.service');
-
-// Variables para caché de farmacias (evita descargar la lista gigante en cada consulta)
-let farmaciasCache = null;
-let lastFarmaciasUpdate = 0;
-const FARMACIAS_CACHE_TTL = 60 * 60 * 1000; // 1 hora de caché
+const pythonService = require('../services/python.service');
 
 async function handleFeriados(message) {
     try {
-        const userQuery = message ? message.body.replace(/^([!/])feriados\s*/i, '').trim() : '';
         if (message) await message.react('🇨🇱');
 
-        // Volvemos a scrapear feriados.cl ya que la API del gobierno está inestable
-        const { data } = await axios.get('https://www.feriados.cl', {
-            headers: { 
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36' 
-            }
-        });
-
-        const $ = cheerio.load(data);
-        const feriadosData = [];
-
-        // Extraemos la tabla de feriados.cl
-        // Estructura usual: Fecha | Nombre | Tipo/Irrenunciable
-        $('table tbody tr').each((i, el) => {
-            const cols = $(el).find('td');
-            if (cols.length > 1) {
-                const fechaRaw = $(cols[0]).text().trim(); // Ej: "18 de Septiembre (Miércoles)"
-                const nombre = $(cols[1]).text().trim();
-                const tipo = $(cols[2]).text().trim();
-                
-                if (fechaRaw && nombre) {
-                    feriadosData.push({
-                        fecha: fechaRaw,
-                        nombre: nombre,
-                        irrenunciable: tipo.toLowerCase().includes('irrenunciable') ? "1" : "0"
-                    });
-                }
-            }
-        });
-
-        // IA DESHABILITADA - Devolver lista simple de feriados
-        if (feriadosData.length === 0) {
-            return '❌ No se pudieron obtener los feriados en este momento.';
+        // Los feriados se calculan localmente en feriados.py (sin scraping)
+        const result = await pythonService.executeScript('feriados.py');
+        if (result.code !== 0 || !result.stdout) {
+            throw new Error(result.stderr || 'Error al ejecutar feriados.py');
         }
-        
-        let reply = '🇨🇱 *Próximos Feriados en Chile:*\n\n';
-        feriadosData.slice(0, 10).forEach((feriado, idx) => {
-            const tipo = feriado.irrenunciable === "1" ? "Irrenunciable" : "Renunciable";
-            reply += `${idx + 1}. *${feriado.fecha}*: ${feriado.nombre} _(${tipo})_\n`;
-        });
-        
-        return reply.trim();
+        return result.stdout;
 
     } catch (error) {
         console.error('Error al obtener los feriados:', error.message);
-        return 'Ocurrió un error al leer feriados.cl. Intenta más tarde.';
+        return 'Ocurrió un error al calcular los feriados. Intenta más tarde.';
     }
 }
 
+async function handleDiasHabiles(message) {
+    // !habiles 2025-12-31 | !habiles sumar 2025-01-10 10 | !habiles entre <fecha> <fecha> | !habiles puentes [año]
+    const args = message.body.trim().split(/\s+/).slice(1);
+    if (args.length === 0) {
+        return 'Uso: `!habiles <fecha>`, `!habiles sumar <fecha> <n>`, `!habiles entre <fecha> <fecha>` o `!habiles puentes [año]`';
+    }
+    const scriptArgs = ['hasta', 'sumar', 'entre', 'puentes'].includes(args[0]) ? args : ['hasta', ...args];
+
+    try {
+        const result = await pythonService.executeScript('dias_habiles.py', scriptArgs);
+        if (result.code !== 0 || !result.stdout) {
+            return 'Revisa el formato: las fechas van como AAAA-MM-DD.';
+        }
+        return result.stdout;
+    } catch (error) {
+        console.error('Error al calcular días hábiles:', error.message);
+        return 'Ocurrió un error al calcular los días hábiles.';
+    }
+}
+
+/**
+ * Escapa los caracteres especiales del Markdown de Telegram en datos externos
+ * (nombres y direcciones del Minsal); sin esto el envío falla por completo.
+ */
+function escapeMarkdown(text) {
+    return String(text ?? '').replace(/([_*`\[])/g, '\\$1');
+}
+
 async function handleFarmacias(message) {
     const city = message.body.replace(/^([!/])far\s*/i, '').trim().toLowerCase();
     if (!city) {
-        return 'Debes especificar una comuna. Por ejemplo: `!far santiago`';
+        return 'Debes especificar una comuna. Por ejemplo: `!far santiago`\n📍 También puedes compartirme tu ubicación por privado para ver las más cercanas.';
     }
 
     try {
         await message.react('⏳');
         
-        let farmacias;
-        // Verificar si tenemos datos en caché recientes
-        if (farmaciasCache && (Date.now() - lastFarmaciasUpdate < FARMACIAS_CACHE_TTL)) {
-            farmacias = farmaciasCache;
-        } else {
-            console.log(`(Farmacias) -> Descargando lista actualizada del Minsal...`);
-            const response = await axios.get('https://midas.minsal.cl/farmacia_v2/WS/getLocalesTurnos.php');
-            farmacias = response.data;
-            farmaciasCache = farmacias; // Guardamos en caché
-            lastFarmaciasUpdate = Date.now();
+        // farmacias.py consulta el índice local (se actualiza en segundo plano)
+        const result = await pythonService.executeScript('farmacias.py', [city]);
+        const data = result.json;
+        if (!data) {
+            throw new Error(result.stderr || 'Respuesta inválida de farmacias.py');
         }
-       
-        // Filtrar por comuna
-        const filteredFarmacias = farmacias.filter(f => 
-            f.comuna_nombre && f.comuna_nombre.toLowerCase().includes(city)
-        );
-        
-        console.log(`(Farmacias) -> Farmacias filtradas: ${filteredFarmacias.length}`);
-
-        if (filteredFarmacias.length > 0) {
-            // Encontró farmacias en la API
-            let replyMessage = `🏥 *Farmacias de turno en ${filteredFarmacias[0].comuna_nombre}*\n\n`;
-            filteredFarmacias.slice(0, 5).forEach(f => {
-                replyMessage += `*${f.local_nombre}*\n`;
-                replyMessage += `📍 ${f.local_direccion}\n`;
-                replyMessage += `🕐 ${f.funcionamiento_hora_apertura} - ${f.funcionamiento_hora_cierre}\n`;
-                if (f.local_telefono) replyMessage += `📞 ${f.local_telefono}\n`;
+
+        if (data.success) {
+            let replyMessage = `🏥 *Farmacias de turno en ${escapeMarkdown(data.comuna)}*\n\n`;
+            data.farmacias.slice(0, 5).forEach(f => {
+                replyMessage += `*${escapeMarkdown(f.nombre)}*\n`;
+                replyMessage += `📍 ${escapeMarkdown(f.direccion)}\n`;
+                replyMessage += `🕐 ${escapeMarkdown(f.horario)}\n`;
+                if (f.telefono) replyMessage += `📞 ${escapeMarkdown(f.telefono)}\n`;
                 replyMessage += `\n`;
             });
             await message.react('✅');
             return replyMessage.trim();
         }
-        
-        // No encontró en API, ofrecer alternativas
-        const comunasDisponibles = [...new Set(farmacias.map(f => f.comuna_nombre))];
-        const algunasComunas = comunasDisponibles.slice(0, 8).join(', ');
-        
+
         await message.react('❌');
-        return `❌ No encontré farmacias de turno para "${city}" en la base de datos actual.\n\n💡 **Comunas disponibles en la API:**\n${algunasComunas}\n\n🌐 **Para otras comunas de Chile:**\nConsulta el sitio oficial del Minsal:\nhttps://seremienlinea.minsal.cl/asdigital/index.php?mfarmacias`;
+        return `❌ ${data.message}\n\n🌐 **Para otras comunas de Chile:**\nConsulta el sitio oficial del Minsal:\nhttps://seremienlinea.minsal.cl/asdigital/index.php?mfarmacias`;
         
     } catch (error) {
         console.error('(Farmacias) -> Error:', error.message);
@@ -124,6 +94,34 @@ async function handleFarmacias(message) {
     }
 }
 
+/**
+ * Farmacias de turno más cercanas a una ubicación (sin importar la comuna).
+ * @param {number} lat
+ * @param {number} lng
+ */
+async function handleFarmaciasCercanas(lat, lng) {
+    try {
+        const result = await pythonService.executeScript('farmacias.py', ['cerca', String(lat), String(lng)]);
+        const data = result.json;
+        if (!data || !data.success) {
+            return `❌ ${(data && data.message) || 'No pude buscar farmacias cercanas.'}`;
+        }
+
+        let replyMessage = '🏥 *Farmacias de turno más cercanas*\n\n';
+        data.farmacias.forEach(f => {
+            replyMessage += `*${escapeMarkdown(f.nombre)}* _(${f.distancia_km.toFixed(1)} km, ${escapeMarkdown(f.comuna)})_\n`;
+            replyMessage += `📍 ${escapeMarkdown(f.direccion)}\n`;
+            replyMessage += `🕐 ${escapeMarkdown(f.horario)}\n`;
+            if (f.telefono) replyMessage += `📞 ${escapeMarkdown(f.telefono)}\n`;
+            replyMessage += `\n`;
+        });
+        return replyMessage.trim();
+    } catch (error) {
+        console.error('(Farmacias) -> Error en búsqueda por ubicación:', error.message);
+        return '❌ No pude obtener información de farmacias en este momento.';
+    }
+}
+
 async function handleClima(message) {
     const city = message.body.replace(/^([!/])clima\s*/i, '').trim();
     if (!city) {
@@ -242,9 +240,9 @@ async function handleSec(message) {
     return generateMessage(region);
 }
 
-async function handleRandom() {
+async function handleRandom(message) {
     try {
-        return await getRandomInfo();
+        return await getRandomInfo(message?.from);
     } catch (error) {
         console.error('Error al obtener dato random:', error);
         return '🎲 Hubo un error al lanzar los dados de la información.';
@@ -356,7 +354,9 @@ async function handleMenu(client, message) {
 
 module.exports = { 
     handleFeriados,
+    handleDiasHabiles,
     handleFarmacias,
+    handleFarmaciasCercanas,
     handleClima,
     handleSismos,
     handleBus,
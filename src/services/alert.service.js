@@ -0,0 +1,78 @@
+// src/services/alert.service.js
+"use strict";
+
+const pythonService = require('./python.service');
+
+const ALERT_SCRIPT = 'alertas.py';
+const CHECK_INTERVAL = 10 * 60 * 1000; // 10 minutos
+
+let monitoringInterval = null;
+
+const USAGE = "Uso:\n`!alerta IPSA < -2%` (variación del día)\n`!alerta USD > 1000` (valor)\n`!alerta listar`\n`!alerta borrar <id>`";
+
+/**
+ * Maneja el comando !alerta para el chat actual.
+ * @param {string} chatId
+ * @param {Array<string>} args - Argumentos después de !alerta
+ */
+async function handleAlertCommand(chatId, args) {
+    const [action, ...rest] = args;
+    if (!action) return USAGE;
+
+    try {
+        if (action === 'listar') {
+            const result = await pythonService.executeScript(ALERT_SCRIPT, ['listar', chatId]);
+            const rules = result.json || [];
+            if (rules.length === 0) return "No hay alertas registradas en este chat.";
+            return "🔔 *Alertas activas*\n\n" + rules.map(r =>
+                `\`${r.id}\` ${r.metrica} ${r.operador} ${r.umbral}${r.campo === 'porcentaje' ? '%' : ''}`
+            ).join('\n');
+        }
+
+        if (action === 'borrar') {
+            if (!rest[0]) return USAGE;
+            // Solo se pueden borrar alertas del propio chat
+            const result = await pythonService.executeScript(ALERT_SCRIPT, ['borrar', chatId, rest[0]]);
+            return result.code === 0 ? `🗑️ Alerta \`${rest[0]}\` eliminada.` : "No encontré esa alerta.";
+        }
+
+        // !alerta <métrica> <op> <umbral>[%] [cooldown_min]
+        if (rest.length < 2) return USAGE;
+        const result = await pythonService.executeScript(ALERT_SCRIPT, ['agregar', chatId, action, ...rest]);
+        if (result.code !== 0 || !result.json) {
+            return `⚠️ No pude registrar la alerta. ${result.stderr || ''}`.trim();
+        }
+        const r = result.json;
+        return `✅ Alerta \`${r.id}\` registrada: ${r.metrica} ${r.operador} ${r.umbral}${r.campo === 'porcentaje' ? '%' : ''}`;
+    } catch (error) {
+        console.error("Error en handleAlertCommand:", error.message);
+        return "No pude procesar la alerta en este momento.";
+    }
+}
+
+/**
+ * Inicia la evaluación periódica de alertas.
+ * alertas.py descarga los datos una sola vez y evalúa todas las reglas juntas;
+ * cada línea de salida es un evento JSON con el chat de destino.
+ */
+function startAlertMonitoring(bot) {
+    if (monitoringInterval) clearInterval(monitoringInterval);
+    console.log('(Alertas) -> Iniciando evaluación periódica...');
+
+    monitoringInterval = setInterval(async () => {
+        try {
+            const result = await pythonService.executeScript(ALERT_SCRIPT, ['evaluar'], { timeout: 60000 });
+            if (result.code !== 0 || !result.stdout) return;
+
+            for (const line of result.stdout.split('\n')) {
+                let event;
+                try { event = JSON.parse(line); } catch (e) { continue; }
+                await bot.sendMessage(event.chat, event.mensaje, { parse_mode: 'Markdown' });
+            }
+        } catch (e) {
+            console.error('(Alertas) -> Error en evaluación:', e.message);
+        }
+    }, CHECK_INTERVAL);
+}
+
+module.exports = { handleAlertCommand, startAlertMonitoring };
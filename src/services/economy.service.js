@@ -1,6 +1,8 @@
 const pythonService = require('./python.service');
 
 const SCRIPT_NAME = 'valores.py';
+const HISTORY_SCRIPT_NAME = 'indicadores_hist.py';
+const CHART_SCRIPT_NAME = 'graficos.py';
 
 // Variables para caché (evita ejecutar Python innecesariamente)
 let cachedData = null;
@@ -39,6 +41,69 @@ async function getEconomicIndicators() {
   }
 }
 
+/**
+ * Consulta el histórico local de indicadores (indicadores_hist.py).
+ * Ej: ['variacion', 'uf', '30'] o ['valor', 'dolar', '2024-01-15'].
+ */
+const HISTORY_QUERIES = ['valor', 'variacion', 'rango', 'media'];
+
+async function getIndicatorHistory(args = []) {
+  // Solo consultas: 'actualizar' (y cualquier --opción) queda para el refresco programado
+  args = args.filter(a => a && !a.startsWith('-'));
+  if (args.length < 2 || !HISTORY_QUERIES.includes(args[0].toLowerCase())) {
+    return "Uso: `!historico <valor|variacion|rango|media> <uf|dolar|euro|utm|ipc> [dias|fecha]`";
+  }
+  args[0] = args[0].toLowerCase();
+
+  try {
+    const result = await pythonService.executeScript(HISTORY_SCRIPT_NAME, args);
+    if (result.code !== 0) {
+      throw new Error(result.stderr || 'Error desconocido en script Python');
+    }
+    return result.stdout;
+  } catch (error) {
+    console.error("Error en getIndicatorHistory:", error.message);
+    return "No pude consultar el histórico de indicadores en este momento.";
+  }
+}
+
+/**
+ * Genera el gráfico PNG de un indicador (graficos.py) y lo devuelve en base64.
+ * El script cachea las imágenes por serie, rango y versión de datos.
+ */
+async function getIndicatorChart(serie, dias = 30) {
+  const result = await pythonService.executeScript(CHART_SCRIPT_NAME, [serie, String(dias)]);
+  if (result.code !== 0 || !result.stdout) {
+    throw new Error(result.stderr || 'Error desconocido en script Python');
+  }
+  return result.stdout;
+}
+
+/**
+ * Mantiene al día el histórico local (indicadores_hist.py): al arrancar hace
+ * la descarga inicial si falta y luego una actualización incremental diaria.
+ */
+const HISTORY_REFRESH_INTERVAL = 24 * 60 * 60 * 1000; // 1 día
+const HISTORY_REFRESH_TIMEOUT = 20 * 60 * 1000; // la primera descarga son ~250 peticiones
+let historyRefreshInterval = null;
+
+function refreshIndicatorHistory() {
+  pythonService.executeScript(HISTORY_SCRIPT_NAME, ['actualizar'], { timeout: HISTORY_REFRESH_TIMEOUT })
+    .then((result) => {
+      if (result.code !== 0) console.error('(Indicadores) -> No se pudo actualizar el histórico:', result.stderr);
+    })
+    .catch((e) => console.error('(Indicadores) -> Error actualizando el histórico:', e.message));
+}
+
+function startIndicatorHistoryRefresh() {
+  if (historyRefreshInterval) clearInterval(historyRefreshInterval);
+  refreshIndicatorHistory();
+  historyRefreshInterval = setInterval(refreshIndicatorHistory, HISTORY_REFRESH_INTERVAL);
+}
+
 module.exports = {
   getEconomicIndicators,
+  getIndicatorHistory,
+  getIndicatorChart,
+  startIndicatorHistoryRefresh,
 };
\ No newline at end of file
@@ -3,14 +3,33 @@
 
 const pythonService = require('./python.service');
 
-async function getBencinaData(comuna) {
-    if (!comuna) {
+const BENCINA_REFRESH_INTERVAL = 2 * 60 * 60 * 1000; // 2 horas
+let bencinaRefreshInterval = null;
+
+/**
+ * !bencina <comuna> | !bencina cerca <lat> <lng> [combustible]
+ * bencina.py responde desde su índice local, sin consultar la fuente.
+ * @param {Array<string>} args - Argumentos después de !bencina
+ */
+async function getBencinaData(args) {
+    // Solo consultas: 'actualizar' (y cualquier --opción) queda para el refresco programado
+    args = (args || []).filter(a => a && !a.startsWith('-'));
+    if (args.length === 0 || args[0].toLowerCase() === 'actualizar') {
         return "Debes especificar una comuna. Ejemplo: `!bencina santiago`";
     }
+    if (args[0].toLowerCase() === 'cerca') {
+        if (args.length < 3 || !args.slice(1, 3).every(n => Number.isFinite(Number(n)))) {
+            return "Uso: `!bencina cerca <lat> <lng> [combustible]`";
+        }
+        args = ['cerca', ...args.slice(1, 4)];
+    }
     try {
-        console.log(`(Servicio Externo) -> Ejecutando bencina.py para ${comuna}...`);
-        const bencinaData = await pythonService.executeScript('bencina.py', [comuna]);
-        return bencinaData;
+        console.log(`(Servicio Externo) -> Ejecutando bencina.py para ${args.join(' ')}...`);
+        const result = await pythonService.executeScript('bencina.py', args);
+        if (!result.stdout) {
+            throw new Error(result.stderr || 'Error al ejecutar bencina.py');
+        }
+        return result.stdout;
     } catch (error) {
         console.error("Error en getBencinaData:", error.message);
         return "No pude obtener los precios de la bencina en este momento.";
@@ -39,8 +58,26 @@ async function getBolsaData() {
     }
 }
 
+/**
+ * Refresca el dataset local de precios de bencina.py en segundo plano.
+ */
+function refreshBencinaDataset() {
+    pythonService.executeScript('bencina.py', ['actualizar'], { timeout: 180000 })
+        .then((result) => {
+            if (result.code !== 0) console.error('(Bencina) -> No se pudo actualizar el índice:', result.stderr);
+        })
+        .catch((e) => console.error('(Bencina) -> Error actualizando el índice:', e.message));
+}
+
+function startBencinaRefresh() {
+    if (bencinaRefreshInterval) clearInterval(bencinaRefreshInterval);
+    refreshBencinaDataset();
+    bencinaRefreshInterval = setInterval(refreshBencinaDataset, BENCINA_REFRESH_INTERVAL);
+}
+
 module.exports = {
     getBencinaData,
+    startBencinaRefresh,
     getTraductorStatus,
     getBolsaData,
 };
\ No newline at end of file
@@ -46,7 +46,7 @@ async function getLeagueUpcomingMatches() {
 
     try {
         console.log(`(Servicio Liga) -> Ejecutando proxpar.py...`);
-        // Aumentamos el timeout a 60s porque Selenium puede ser lento
+        // Timeout de 60s por si as_com.py tiene que recurrir al navegador
         const result = await pythonService.executeScript('proxpar.py', [], { timeout: 60000 });
         if (result.code !== 0) {
             throw new Error(result.stderr || 'Error al ejecutar proxpar.py');
@@ -83,8 +83,18 @@ async function getMatchDaySummary() {
     }
 }
 
+/**
+ * Descarta la tabla en caché (p. ej. al terminar un partido) para que el
+ * próximo !tabla la recalcule con el nuevo resultado.
+ */
+function invalidateLeagueTable() {
+    tableCache = null;
+    lastTableUpdate = 0;
+}
+
 module.exports = {
     getLeagueTable,
+    invalidateLeagueTable,
     getLeagueUpcomingMatches,
     getMatchDaySummary // Exportamos la nueva función junto a las antiguas
 };
\ No newline at end of file
@@ -0,0 +1,110 @@
+// src/services/match-tracker.service.js
+"use strict";
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const pythonService = require('./python.service');
+const leagueService = require('./league.service');
+
+const TRACKER_SCRIPT = 'seguimiento_partidos.py';
+const SUBSCRIPTIONS_FILE = path.join(__dirname, '..', '..', 'database', 'seguimiento.json');
+const CHECK_INTERVAL = 15 * 60 * 1000; // 15 minutos
+
+let botInstance = null;
+let trackerProcess = null;
+let checkInterval = null;
+
+function leerSuscripciones() {
+    try {
+        if (!fs.existsSync(SUBSCRIPTIONS_FILE)) return [];
+        return JSON.parse(fs.readFileSync(SUBSCRIPTIONS_FILE, 'utf8'));
+    } catch (error) {
+        console.error('Error leyendo suscripciones de partidos:', error);
+        return [];
+    }
+}
+
+function guardarSuscripciones(chats) {
+    try {
+        fs.mkdirSync(path.dirname(SUBSCRIPTIONS_FILE), { recursive: true });
+        fs.writeFileSync(SUBSCRIPTIONS_FILE, JSON.stringify(chats, null, 2), 'utf8');
+    } catch (error) {
+        console.error('Error guardando suscripciones de partidos:', error);
+    }
+}
+
+/**
+ * Aplica el resultado recién finalizado a la tabla local (posiciones.py)
+ * y descarta la tabla en caché del servicio de liga.
+ */
+async function actualizarTabla() {
+    try {
+        await pythonService.executeScript('posiciones.py', [], { timeout: 60000 });
+    } catch (e) {
+        console.error('(Partidos) -> Error actualizando la tabla:', e.message);
+    }
+    leagueService.invalidateLeagueTable();
+}
+
+/**
+ * Lanza el tracker si hay chats suscritos y no está corriendo.
+ * Un solo proceso sirve a todos los chats; termina solo cuando
+ * finalizan los partidos del día.
+ */
+function ensureTracker() {
+    if (trackerProcess || !botInstance || leerSuscripciones().length === 0) return;
+
+    console.log('(Partidos) -> Iniciando seguimiento en vivo...');
+    trackerProcess = pythonService.spawnScript(TRACKER_SCRIPT);
+
+    readline.createInterface({ input: trackerProcess.stdout }).on('line', async (line) => {
+        let event;
+        try { event = JSON.parse(line); } catch (e) { return; }
+        if (event.tipo === 'final') actualizarTabla();
+        for (const chatId of leerSuscripciones()) {
+            try {
+                await botInstance.sendMessage(chatId, event.mensaje, { parse_mode: 'Markdown' });
+            } catch (e) {
+                console.error(`(Partidos) -> No se pudo notificar a ${chatId}:`, e.message);
+            }
+        }
+    });
+    trackerProcess.stderr.on('data', (chunk) => console.error('(Partidos) ->', chunk.toString().trim()));
+    trackerProcess.on('error', (err) => console.error('(Partidos) -> Error del tracker:', err.message));
+    trackerProcess.on('close', () => { trackerProcess = null; });
+}
+
+/**
+ * Maneja el comando !seguir para el chat actual.
+ * @param {string} chatId
+ * @param {Array<string>} args - Argumentos después de !seguir
+ */
+function handleFollowCommand(chatId, args) {
+    const chats = leerSuscripciones();
+    const id = String(chatId);
+
+    if (args[0] === 'off') {
+        if (!chats.includes(id)) return "Este chat no estaba siguiendo los partidos.";
+        guardarSuscripciones(chats.filter(c => c !== id));
+        return "🔕 Listo, ya no enviaré goles ni resultados en este chat.";
+    }
+
+    if (chats.includes(id)) return "Este chat ya sigue los partidos en vivo. Usa `!seguir off` para dejar de seguirlos.";
+    guardarSuscripciones([...chats, id]);
+    ensureTracker();
+    return "🔔 Te avisaré inicios, goles, rojas y resultados finales de los partidos del día.";
+}
+
+/**
+ * Revisa periódicamente si hay que levantar el tracker (p. ej. al comenzar
+ * una nueva jornada).
+ */
+function startMatchTracking(bot) {
+    botInstance = bot;
+    if (checkInterval) clearInterval(checkInterval);
+    ensureTracker();
+    checkInterval = setInterval(ensureTracker, CHECK_INTERVAL);
+}
+
+module.exports = { handleFollowCommand, startMatchTracking };
@@ -0,0 +1,79 @@
+// src/services/media-cache.service.js
+"use strict";
+
+const pythonService = require('./python.service');
+const { MessageMedia } = require('../adapters/wwebjs-adapter');
+
+const SCRIPT_NAME = 'cache_media.py';
+// Mismo formato en el reenvío por file_id y en la primera subida: los captions
+// traen Markdown propio y los textos externos ya vienen escapados desde Python.
+const CAPTION_OPTIONS = { parse_mode: 'Markdown' };
+
+/**
+ * Envía una imagen remota usando el caché local (cache_media.py).
+ * - Si ya se subió antes, reenvía el file_id de Telegram (sin descarga ni subida).
+ * - Si no, envía la variante reducida guardada en disco y registra el file_id.
+ */
+async function sendCachedImage(bot, message, url, caption = '') {
+    const result = await pythonService.executeScript(SCRIPT_NAME, ['obtener', url]);
+    if (result.code !== 0 || !result.json) {
+        throw new Error(result.stderr || `No se pudo cachear la imagen ${url}`);
+    }
+
+    const { ruta, file_id: fileId } = result.json;
+    if (fileId) {
+        try {
+            return await bot.sendPhoto(message.from, fileId, { caption, ...CAPTION_OPTIONS });
+        } catch (err) {
+            // file_id inválido o expirado: se vuelve a subir desde disco
+            if (!ruta) throw err;
+        }
+    }
+
+    const media = MessageMedia.fromFilePath(ruta);
+    const sent = await message.reply(media, null, { caption, ...CAPTION_OPTIONS });
+
+    const photos = sent && sent.photo;
+    if (photos && photos.length > 0) {
+        const newFileId = photos[photos.length - 1].file_id;
+        pythonService.executeScript(SCRIPT_NAME, ['file_id', url, newFileId])
+            .catch((e) => console.error('(Media Cache) -> No se pudo registrar file_id:', e.message));
+    }
+    return sent;
+}
+
+/**
+ * Envía una imagen generada por un script que responde {hash, file_id, png}
+ * (p. ej. imagen_tablas.py). Si el script ya conoce un file_id para ese hash
+ * se reenvía; si no, se sube el PNG y se registra con `<script> file_id <hash> <id>`.
+ */
+async function sendGeneratedImage(bot, message, scriptName, args, caption = '') {
+    let result = await pythonService.executeScript(scriptName, args, { timeout: 60000 });
+    if (result.code !== 0 || !result.json) {
+        throw new Error(result.stderr || `No se pudo generar la imagen con ${scriptName}`);
+    }
+
+    if (result.json.file_id) {
+        try {
+            return await bot.sendPhoto(message.from, result.json.file_id, { caption, ...CAPTION_OPTIONS });
+        } catch (err) {
+            // file_id expirado: se pide el PNG para volver a subirlo
+            result = await pythonService.executeScript(scriptName, [...args, '--png'], { timeout: 60000 });
+            if (result.code !== 0 || !result.json || !result.json.png) throw err;
+        }
+    }
+
+    const { hash, png } = result.json;
+    const media = new MessageMedia('image/png', png, `${hash}.png`);
+    const sent = await message.reply(media, null, { caption, ...CAPTION_OPTIONS });
+
+    const photos = sent && sent.photo;
+    if (photos && photos.length > 0) {
+        const newFileId = photos[photos.length - 1].file_id;
+        pythonService.executeScript(scriptName, ['file_id', hash, newFileId])
+            .catch((e) => console.error('(Media Cache) -> No se pudo registrar file_id:', e.message));
+    }
+    return sent;
+}
+
+module.exports = { sendCachedImage, sendGeneratedImage };
@@ -10,7 +10,7 @@ const PYTHON_COMMAND = process.env.PYTHON || (process.platform === 'win32' ? 'py
  * Ejecuta un script Python y devuelve una Promise con { stdout, stderr, code, json }.
  * @param {string} scriptName - Nombre del archivo .py (se busca en scripts/python/)
  * @param {Array} args - Argumentos para pasar al script
- * @param {Object} opts - Opciones: {pythonExec, timeout}
+ * @param {Object} opts - Opciones: {pythonExec, timeout, input} (input: Buffer que se escribe en stdin)
  * @returns {Promise<{code, stdout, stderr, json}>}
  */
 function executeScript(scriptName, args = [], opts = {}) {
@@ -30,6 +30,12 @@ function executeScript(scriptName, args = [], opts = {}) {
         proc.stdout.on('data', (chunk) => { stdout += chunk.toString(); });
         proc.stderr.on('data', (chunk) => { stderr += chunk.toString(); });
 
+        // Datos de entrada (p. ej. una imagen) sin pasar por un archivo temporal
+        if (opts.input) {
+            proc.stdin.on('error', () => { /* el script terminó sin leer stdin */ });
+            proc.stdin.end(opts.input);
+        }
+
         proc.on('error', (err) => {
             console.error(`Error al ejecutar script Python (${scriptName}):`, err.message);
             return reject(new Error(`Python spawn error: ${err.message}`));
@@ -61,4 +67,16 @@ function executeScript(scriptName, args = [], opts = {}) {
     });
 }
 
-module.exports = { executeScript };
\ No newline at end of file
+/**
+ * Lanza un script Python de larga duración y devuelve el proceso hijo,
+ * para leer su salida línea a línea (sin timeout ni buffer completo).
+ * @param {string} scriptName - Nombre del archivo .py (se busca en scripts/python/)
+ * @param {Array} args - Argumentos para pasar al script
+ * @returns {import('child_process').ChildProcess}
+ */
+function spawnScript(scriptName, args = []) {
+    const scriptPath = path.join(__dirname, '..', '..', 'scripts', 'python', scriptName);
+    return spawn(PYTHON_COMMAND, ['-u', scriptPath, ...args], { windowsHide: true });
+}
+
+module.exports = { executeScript, spawnScript };
\ No newline at end of file
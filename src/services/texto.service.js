@@ -3,14 +3,25 @@
 
 const pythonService = require('./python.service');
 
-async function addTextToImage(imagePath, topText, bottomText) {
+/**
+ * Agrega texto arriba y abajo de una imagen.
+ * @param {Buffer|string} image - Bytes de la imagen o ruta al archivo
+ * @returns {Promise<{mimetype, data, filename}>} Imagen lista para `reply` (data en base64)
+ */
+async function addTextToImage(image, topText, bottomText) {
     try {
-        const result = await pythonService.executeScript('texto.py', [imagePath, topText, bottomText]);
+        // Con un Buffer la imagen viaja por stdin: sin archivos temporales
+        const isBuffer = Buffer.isBuffer(image);
+        const result = await pythonService.executeScript(
+            'texto.py',
+            [isBuffer ? '-' : image, topText, bottomText],
+            isBuffer ? { input: image } : {}
+        );
 
-        if (result.code !== 0) {
+        if (result.code !== 0 || !result.stdout) {
             throw new Error(result.stderr || 'Error al ejecutar texto.py');
         }
-        return result.stdout.trim();
+        return { mimetype: 'image/jpeg', data: result.stdout, filename: 'texto.jpg' };
     } catch (error) {
         console.error("Error en addTextToImage:", error.message);
         throw error;
@@ -19,4 +30,4 @@ async function addTextToImage(imagePath, topText, bottomText) {
 
 module.exports = {
     addTextToImage
-};
\ No newline at end of file
+};
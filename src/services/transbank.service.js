@@ -11,7 +11,6 @@ let lastUpdate = 0;
 const CACHE_TTL = 5 * 60 * 1000; // 5 minutos (Transbank no suele cambiar de estado tan rápido)
 
 let monitoringInterval = null;
-let lastAlertState = false; // Para evitar spam de alertas repetidas
 
 async function getTransbankStatus() {
     // 1. Revisar caché
@@ -51,7 +50,7 @@ async function getTransbankStatus() {
 
 /**
  * Inicia el monitoreo automático de Transbank.
- * Revisa cada 10 minutos si hay caídas masivas.
+ * Revisa cada 10 minutos si hay caídas masivas nuevas.
  */
 function startTransbankMonitoring(client) {
     if (monitoringInterval) clearInterval(monitoringInterval);
@@ -62,28 +61,28 @@ function startTransbankMonitoring(client) {
             // Pedimos JSON puro para analizar
             const result = await pythonService.executeScript(TRANSBANK_SCRIPT, ['--json']);
             
-            if (result.code === 0 && result.json) {
-                const data = result.json;
-                const criticalServices = [];
-
-                for (const [service, status] of Object.entries(data)) {
-                    if (status === 'Major Outage') {
-                        criticalServices.push(service);
-                    }
-                }
+            if (result.code !== 0 || !result.json) return;
+
+            // El script solo informa las transiciones desde la consulta anterior
+            // (y las persiste), así que una caída se alerta una sola vez.
+            const { cambios = [], caidos = [] } = result.json;
+            if (cambios.length === 0) return;
+
+            // El estado cambió: el texto en caché ya no sirve
+            transbankCache = null;
+
+            const nuevasCaidas = cambios
+                .filter(c => c.actual === 'Major Outage')
+                .map(c => c.servicio);
+
+            if (nuevasCaidas.length > 0) {
+                const msg = `🚨 *ALERTA TRANSBANK* 🚨\n\nSe reporta CAÍDA MASIVA (Major Outage) en:\n- ${caidos.join('\n- ')}\n\nPosiblemente no se puedan realizar pagos.`;
 
-                if (criticalServices.length > 0 && !lastAlertState) {
-                    lastAlertState = true;
-                    const msg = `🚨 *ALERTA TRANSBANK* 🚨\n\nSe reporta CAÍDA MASIVA (Major Outage) en:\n- ${criticalServices.join('\n- ')}\n\nPosiblemente no se puedan realizar pagos.`;
-                    
-                    // Enviar a todos los grupos
-                    const chats = await client.getChats();
-                    const groups = chats.filter(c => c.isGroup);
-                    for (const group of groups) {
-                        await client.sendMessage(group.id._serialized, msg);
-                    }
-                } else if (criticalServices.length === 0 && lastAlertState) {
-                    lastAlertState = false; // Resetear estado si ya se arregló
+                // Enviar a todos los grupos
+                const chats = await client.getChats();
+                const groups = chats.filter(c => c.isGroup);
+                for (const group of groups) {
+                    await client.sendMessage(group.id._serialized, msg);
                 }
             }
         } catch (e) {
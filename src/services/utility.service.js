@@ -3,9 +3,34 @@
 
 const pythonService = require('./python.service');
 
-async function getRandomInfo() {
+let isFillingQueue = false;
+
+/**
+ * Rellena en segundo plano la cola de contenido pre-descargado (cola_random.py).
+ * No se espera el resultado: la respuesta al usuario no depende del llenado.
+ */
+function refillRandomQueue() {
+    if (isFillingQueue) return;
+    isFillingQueue = true;
+    pythonService.executeScript('cola_random.py', ['llenar'], { timeout: 120000 })
+        .catch((e) => console.error("[ERROR utility.service] Error llenando cola random:", e.message))
+        .finally(() => { isFillingQueue = false; });
+}
+
+/**
+ * @param {string} [chatId] - Chat que pide el dato; cada chat recorre su propio ciclo de términos geek
+ */
+async function getRandomInfo(chatId = 'global') {
     try {
-        const result = await pythonService.executeScript('random_info.py');
+        // 1. Intentar con un ítem ya listo de la cola (sin red)
+        const queued = await pythonService.executeScript('cola_random.py', ['sacar', String(chatId)]);
+        refillRandomQueue();
+        if (queued.code === 0 && queued.json) {
+            return queued.json;
+        }
+
+        // 2. Cola vacía: consultar las fuentes en vivo
+        const result = await pythonService.executeScript('random_info.py', [String(chatId)]);
 
         if (result.code !== 0) {
             console.error("[ERROR utility.service] random_info.py falló:", result.stderr);
@@ -22,6 +47,29 @@ async function getRandomInfo() {
     }
 }
 
+/**
+ * Mantiene al día el índice local de farmacias de turno (farmacias.py).
+ * El listado del Minsal cambia a lo más una vez al día.
+ */
+const PHARMACY_REFRESH_INTERVAL = 6 * 60 * 60 * 1000; // 6 horas
+let pharmacyRefreshInterval = null;
+
+function refreshPharmacyDataset() {
+    pythonService.executeScript('farmacias.py', ['actualizar'], { timeout: 120000 })
+        .then((result) => {
+            if (result.code !== 0) console.error('(Farmacias) -> No se pudo actualizar el índice:', result.stderr);
+        })
+        .catch((e) => console.error('(Farmacias) -> Error actualizando el índice:', e.message));
+}
+
+function startPharmacyRefresh() {
+    if (pharmacyRefreshInterval) clearInterval(pharmacyRefreshInterval);
+    refreshPharmacyDataset();
+    pharmacyRefreshInterval = setInterval(refreshPharmacyDataset, PHARMACY_REFRESH_INTERVAL);
+}
+
 module.exports = {
-    getRandomInfo
-};
\ No newline at end of file
+    getRandomInfo,
+    refillRandomQueue,
+    startPharmacyRefresh
+};
@@ -39,6 +39,21 @@ const bot = new TelegramBot(process.env.TELEGRAM_BOT_TOKEN, {
 
 console.log('✅ ¡Bot de Telegram conectado y listo!');
 
+// --- HISTÓRICO LOCAL DE INDICADORES ---
+require('./src/services/economy.service').startIndicatorHistoryRefresh();
+
+// --- ALERTAS DE ÍNDICES Y DIVISAS ---
+require('./src/services/alert.service').startAlertMonitoring(bot);
+
+// --- SEGUIMIENTO DE PARTIDOS EN VIVO ---
+require('./src/services/match-tracker.service').startMatchTracking(bot);
+
+// --- ÍNDICE LOCAL DE FARMACIAS DE TURNO ---
+require('./src/services/utility.service').startPharmacyRefresh();
+
+// --- DATASET LOCAL DE PRECIOS DE BENCINA ---
+require('./src/services/external.service').startBencinaRefresh();
+
 // --- RATE LIMITING GLOBAL ---
 const messageTimestamps = new Map();
 const GLOBAL_COOLDOWN_MS = botConfig.rateLimiting?.globalCooldownMs || 0;
@@ -79,6 +94,8 @@ bot.on('message', async (msg) => {
                 if (text && text.mimetype && text.data) {
                     const media = text;
                     const fileBuffer = Buffer.from(media.data, 'base64');
+                    const captionOptions = { caption: options.caption || '' };
+                    if (options.parse_mode) captionOptions.parse_mode = options.parse_mode;
                     
                     // Determinar qué método usar según el mimetype
                     if (media.mimetype.startsWith('audio/')) {
@@ -95,19 +112,19 @@ bot.on('message', async (msg) => {
                         // Enviar como foto
                         return await bot.sendPhoto(chatId, fileBuffer, {
                             reply_to_message_id: msg.message_id,
-                            caption: options.caption || ''
+                            ...captionOptions
                         });
                     } else if (media.mimetype.startsWith('video/')) {
                         // Enviar como video
                         return await bot.sendVideo(chatId, fileBuffer, {
                             reply_to_message_id: msg.message_id,
-                            caption: options.caption || ''
+                            ...captionOptions
                         });
                     } else {
                         // Enviar como documento genérico
                         return await bot.sendDocument(chatId, fileBuffer, {
                             reply_to_message_id: msg.message_id,
-                            caption: options.caption || ''
+                            ...captionOptions
                         }, {
                             filename: media.filename,
                             contentType: media.mimetype
@@ -263,6 +280,34 @@ bot.on('message', async (msg) => {
     }
 });
 
+// --- UBICACIONES: FARMACIAS DE TURNO CERCANAS ---
+// Solo en chats privados o como respuesta a un mensaje de este bot, para no
+// responder a cada ubicación que se comparte en un grupo.
+let botInfoPromise = null;
+function getBotInfo() {
+    if (!botInfoPromise) {
+        botInfoPromise = bot.getMe().catch((error) => {
+            botInfoPromise = null;
+            throw error;
+        });
+    }
+    return botInfoPromise;
+}
+
+bot.on('location', async (msg) => {
+    try {
+        const repliedFrom = msg.reply_to_message && msg.reply_to_message.from;
+        const isReplyToBot = Boolean(repliedFrom) && repliedFrom.id === (await getBotInfo()).id;
+        if (msg.chat.type !== 'private' && !isReplyToBot) return;
+
+        const { handleFarmaciasCercanas } = require('./src/handlers/utility.handler');
+        const text = await handleFarmaciasCercanas(msg.location.latitude, msg.location.longitude);
+        await bot.sendMessage(msg.chat.id, text, { parse_mode: 'Markdown', reply_to_message_id: msg.message_id });
+    } catch (error) {
+        console.error('❌ Error en el manejador de ubicaciones:', error);
+    }
+});
+
 // --- MANEJADOR DE CALLBACK QUERY (para botones inline) ---
 const callbackHandler = require('./src/handlers/callback.handler');
 